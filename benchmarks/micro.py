@@ -0,0 +1,368 @@
+"""Microbenchmarks of the response parsing and model building hot paths.
+
+Synthetic Steam API payloads at realistic sizes: a small game (30 achievements), a large game (5000 achievements)
+and a 10k games library. Each case measures the time per operation and the memory allocated by one operation
+(tracemalloc peak). The user achievements are handled for a hidden game, then for the displayed game whose
+locked achievements are listed. Results are stored by snat version so a run can be compared with a previous release.
+
+Usage:
+    python benchmarks/micro.py [--filter NAME] [--repeat 5] [--save] [--baseline VERSION] [--max-regression 20]
+
+Exit status is 1 if the median of a case exceeds the baseline median by more than the allowed regression (percent).
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import dataclass
+from functools import partial
+from pathlib import Path
+from typing import Any, Callable
+
+ROOT = Path(__file__).resolve().parent.parent
+RESULTS_PATH = Path(__file__).resolve().parent / "micro_results.json"
+SMALL_GAME = 30
+LARGE_GAME = 5000
+LIBRARY = 10000
+CHUNK_SIZE = 16 * 1024
+MIN_SAMPLE_TIME = 0.05
+
+sys.path.insert(0, str(ROOT))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+TEMP_DIR = tempfile.TemporaryDirectory()
+os.environ["XDG_CACHE_HOME"] = TEMP_DIR.name
+
+from PyQt6 import QtCore, QtWidgets  # noqa: E402
+
+from snat import __version__  # noqa: E402
+from snat.achievement_list import AchievementList, UserAchievementsCache  # noqa: E402
+from snat.cache import load_cache, save_cache  # noqa: E402
+from snat.friends import FriendCache, FriendLoader  # noqa: E402
+from snat.game_list import Achievement, Game, GameList, GameListBar, SchemaCache  # noqa: E402
+from snat.json_stream import JsonArrayStream  # noqa: E402
+from snat.settings import Settings  # noqa: E402
+from snat.steam_api import SteamApi  # noqa: E402
+
+
+@dataclass
+class Case:
+    """Benchmark case
+
+    Fields:
+        name (str): Case name
+        operation (Callable[[], Any]): Measured operation
+        setup (Callable[[], Any] | None): Unmeasured preparation run before each operation, None if not needed
+    """
+
+    name: str
+    operation: Callable[[], Any]
+    setup: Callable[[], Any] | None = None
+
+
+def schema_payload(app_id: int, achievements: int) -> bytes:
+    """Build a GetSchemaForGame response.
+
+    Args:
+        app_id (int): app_id of the game
+        achievements (int): Number of achievements
+
+    Returns:
+        bytes: JSON response
+    """
+    return json.dumps({"game": {"gameName": f"Game {app_id}", "availableGameStats": {"achievements": [
+        {
+            "name": f"ACH_{app_id}_{index}",
+            "defaultvalue": 0,
+            "displayName": f"Achievement {index} of game {app_id}",
+            "hidden": index % 4 == 0,
+            "description": f"Complete the objective number {index} without failing",
+            "icon": f"https://steamcdn-a.akamaihd.net/steamcommunity/public/images/apps/{app_id}/{index:040x}.jpg",
+            "icongray": f"https://steamcdn-a.akamaihd.net/steamcommunity/public/images/apps/{app_id}/{index:040d}.jpg",
+        }
+        for index in range(achievements)
+    ]}}}).encode()
+
+
+def user_achievements_payload(app_id: int, achievements: int) -> bytes:
+    """Build a GetPlayerAchievements response with one achievement out of three unlocked.
+
+    Args:
+        app_id (int): app_id of the game
+        achievements (int): Number of achievements
+
+    Returns:
+        bytes: JSON response
+    """
+    unlocked = [
+        {"apiname": f"ACH_{app_id}_{index}", "achieved": int(index % 3 == 0),
+         "unlocktime": 1700000000 + index * 3600 if index % 3 == 0 else 0}
+        for index in range(achievements)
+    ]
+    return json.dumps({"playerstats": {"steamID": "0" * 17, "gameName": f"Game {app_id}", "success": True,
+                                       "achievements": unlocked}}).encode()
+
+
+def owned_games_payload(games: int) -> bytes:
+    """Build a GetOwnedGames response.
+
+    Args:
+        games (int): Number of games
+
+    Returns:
+        bytes: JSON response
+    """
+    return json.dumps({"response": {"game_count": games, "games": [
+        {"appid": app_id, "name": f"Game {app_id:05d}", "playtime_forever": 60 + app_id % 1000,
+         "img_icon_url": f"{app_id:040x}", "has_community_visible_stats": True,
+         "playtime_windows_forever": 60, "playtime_mac_forever": 0, "playtime_linux_forever": 0,
+         "rtime_last_played": 1700000000 + app_id}
+        for app_id in range(1, games + 1)
+    ]}}).encode()
+
+
+def schema_cache(games: int, achievements: int) -> SchemaCache:
+    """Build a schema cache.
+
+    Args:
+        games (int): Number of games
+        achievements (int): Number of achievements per game
+
+    Returns:
+        SchemaCache: Schemas of the app_ids 1 to games
+    """
+    return {
+        app_id: Game(f"Game {app_id:05d}", {
+            f"ACH_{app_id}_{index}": Achievement(f"Achievement {index} of game {app_id}",
+                                                 f"https://steamcdn-a.akamaihd.net/{app_id}/{index:040x}.jpg")
+            for index in range(achievements)
+        })
+        for app_id in range(1, games + 1)
+    }
+
+
+def stream_owned_games(payload: bytes, handle: Callable[[Any, None], None] | None = None) -> None:
+    """Feed an owned games response to an array stream in network sized chunks.
+
+    Args:
+        payload (bytes): GetOwnedGames response
+        handle (Callable[[Any, None], None] | None): Function called on each game, None to only parse
+    """
+    stream = JsonArrayStream("games")
+    for start in range(0, len(payload), CHUNK_SIZE):
+        for element in stream.feed(payload[start:start + CHUNK_SIZE]):
+            if handle is not None:
+                handle(element, None)
+
+
+def create_cases(parent: QtWidgets.QWidget) -> list[Case]:
+    """Create the application objects and the benchmark cases.
+
+    The Steam API is marked unreachable, so no request leaves the process.
+
+    Args:
+        parent (PyQt6.QtWidgets.QWidget): Parent of the application objects, must outlive the cases
+
+    Returns:
+        list[Case]: Benchmark cases
+    """
+    settings = Settings(parent)
+    settings.setValue("steam_api_key", "0" * 32)
+    settings.setValue("steam_user_id", "0" * 17)
+    steam_api = SteamApi(parent, settings)
+    steam_api.unreachable = True
+
+    game_list: GameList = {}
+    schemas = schema_cache(LIBRARY, SMALL_GAME)
+    bar = GameListBar(steam_api, game_list, schemas, {}, parent)
+    user_achievements: UserAchievementsCache = {}
+    friends: FriendCache = {}
+    achievement_list = AchievementList(parent, steam_api, game_list, user_achievements, {},
+                                       FriendLoader(parent, steam_api, game_list, friends))
+    achievement_list.current_app_id = -2
+
+    def reset_bar() -> None:
+        bar.reset()
+        game_list.clear()
+        bar.game_combo_box.addItem("All Games")
+
+    def build_owned_games(payload: bytes) -> None:
+        stream_owned_games(payload, bar.handle_owned_game)
+        bar.handle_owned_games_response(None, None)
+
+    def add_game(app_id: int) -> None:
+        achievement_list.current_app_id = -2
+        game_list[app_id] = Game(f"Game {app_id}")
+
+    def display_game(app_id: int, parsed_schema: Any) -> None:
+        add_game(app_id)
+        bar.add_achievements(app_id, parsed_schema)
+        achievement_list.current_app_id = app_id
+
+    cases: list[Case] = []
+    for size in (SMALL_GAME, LARGE_GAME):
+        app_id = size
+        schema = schema_payload(app_id, size)
+        parsed_schema = json.loads(schema)
+        achievements = user_achievements_payload(app_id, size)
+        parsed_achievements = json.loads(achievements)
+        cases += [
+            Case(f"schema.parse[{size}]", partial(json.loads, schema)),
+            Case(f"schema.is_valid[{size}]", partial(GameListBar.is_game_schema_valid, parsed_schema)),
+            Case(f"schema.add_achievements[{size}]", partial(bar.add_achievements, app_id, parsed_schema),
+                 partial(add_game, app_id)),
+            Case(f"user_achievements.parse[{size}]", partial(json.loads, achievements)),
+            Case(f"user_achievements.handle[{size}]",
+                 partial(achievement_list.handle_user_achiev_response, parsed_achievements, app_id),
+                 partial(add_game, app_id)),
+            Case(f"user_achievements.display[{size}]",
+                 partial(achievement_list.handle_user_achiev_response, parsed_achievements, app_id),
+                 partial(display_game, app_id, parsed_schema)),
+        ]
+
+    owned_games = owned_games_payload(LIBRARY)
+    cases += [
+        Case(f"owned_games.stream[{LIBRARY}]", partial(stream_owned_games, owned_games)),
+        Case(f"owned_games.build[{LIBRARY}]", partial(build_owned_games, owned_games), reset_bar),
+        Case(f"schema_cache.save[{LIBRARY}]", partial(save_cache, "schema_cache", schemas)),
+        Case(f"schema_cache.load[{LIBRARY}]", partial(load_cache, "schema_cache", {}),
+             partial(save_cache, "schema_cache", schemas)),
+    ]
+    return cases
+
+
+def measure(case: Case, repeat: int) -> dict[str, float]:
+    """Measure the time per operation and the memory allocated by one operation.
+
+    Without setup, each sample runs the operation enough times to last MIN_SAMPLE_TIME.
+    With setup, each sample is one operation, the setup is not measured.
+
+    Args:
+        case (Case): Benchmark case
+        repeat (int): Number of samples
+
+    Returns:
+        dict[str, float]: Median and minimum time in seconds, allocated bytes
+    """
+    number = 1
+    if case.setup is None:
+        while True:
+            start = time.perf_counter()
+            for _ in range(number):
+                case.operation()
+            if time.perf_counter() - start >= MIN_SAMPLE_TIME:
+                break
+            number *= 2
+
+    samples = []
+    for _ in range(repeat):
+        if case.setup is not None:
+            case.setup()
+        start = time.perf_counter()
+        for _ in range(number):
+            case.operation()
+        samples.append((time.perf_counter() - start) / number)
+
+    if case.setup is not None:
+        case.setup()
+    tracemalloc.start()
+    case.operation()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"median": statistics.median(samples), "min": min(samples), "alloc": peak}
+
+
+def format_time(seconds: float) -> str:
+    """Format a duration with a suitable unit.
+
+    Args:
+        seconds (float): Duration in seconds
+
+    Returns:
+        str: Formatted duration
+    """
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:8.2f} {unit:<2}"
+    return f"{seconds / 1e-9:8.2f} ns"
+
+
+def load_results(path: Path) -> dict[str, Any]:
+    """Load the stored results.
+
+    Args:
+        path (Path): Results file
+
+    Returns:
+        dict[str, Any]: Results by snat version
+    """
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text())  # type: ignore[no-any-return]
+
+
+def parse_args() -> argparse.Namespace:
+    """Parse the command line arguments.
+
+    Returns:
+        argparse.Namespace: Parsed arguments
+    """
+    parser = argparse.ArgumentParser(description="Measure the snat parsing and model building hot paths")
+    parser.add_argument("--filter", default="", help="Only run the cases whose name contains this text")
+    parser.add_argument("--repeat", type=int, default=5, help="Number of samples per case")
+    parser.add_argument("--results", type=Path, default=RESULTS_PATH, help="Results file")
+    parser.add_argument("--save", action="store_true", help="Store the results under the current version")
+    parser.add_argument("--baseline", help="Version to compare with (default: last other stored version)")
+    parser.add_argument("--max-regression", type=float, default=20, help="Allowed slowdown of a median (%%)")
+    return parser.parse_args()
+
+
+def main() -> None:
+    """Run the cases, compare them with the baseline and store the results."""
+    args = parse_args()
+    app = QtWidgets.QApplication(sys.argv[:1])
+    QtCore.QSettings.setPath(QtCore.QSettings.Format.IniFormat, QtCore.QSettings.Scope.UserScope, TEMP_DIR.name)
+    QtCore.QSettings.setDefaultFormat(QtCore.QSettings.Format.IniFormat)
+    QtCore.QCoreApplication.setApplicationName("Snat")
+    QtCore.QCoreApplication.setOrganizationName("Theo Guerin")
+    # The displayed rows request their icons from the unreachable API, each failure would log a warning
+    logging.getLogger("snat").setLevel(logging.ERROR)
+
+    results = load_results(args.results)
+    baseline_version = args.baseline or next((version for version in reversed(results) if version != __version__),
+                                             None)
+    baseline = results.get(baseline_version, {}).get("cases", {}) if baseline_version else {}
+    print(f"snat {__version__}, Python {platform.python_version()}, baseline {baseline_version or 'none'}")
+
+    failed = False
+    measures = {}
+    parent = QtWidgets.QWidget()
+    for case in create_cases(parent):
+        if args.filter not in case.name:
+            continue
+        measures[case.name] = measure(case, args.repeat)
+        app.processEvents()
+        line = (f"{case.name:<32} median {format_time(measures[case.name]['median'])}  "
+                f"min {format_time(measures[case.name]['min'])}  alloc {measures[case.name]['alloc'] / 1024:10.1f} KiB")
+        if case.name in baseline:
+            change = (measures[case.name]["median"] / baseline[case.name]["median"] - 1) * 100
+            regression = change > args.max_regression
+            failed |= regression
+            line += f"  {change:+6.1f}%  {'REGRESSION' if regression else 'OK'}"
+        print(line)
+
+    if args.save:
+        stored = results.setdefault(__version__, {"cases": {}})
+        stored.update(python=platform.python_version(), timestamp=time.time())
+        stored["cases"].update(measures)
+        args.results.write_text(json.dumps(results, indent=2))
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
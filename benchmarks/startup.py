@@ -0,0 +1,134 @@
+"""Startup benchmark: time to first paint and time to interactive.
+
+Each run starts a fresh Python process on an offscreen platform with a synthetic cached library,
+so the measures include the Python and PyQt6 import time.
+
+Usage:
+    python benchmarks/startup.py [--games 5000] [--runs 5] [--max-first-paint 500] [--max-interactive 1500]
+
+Exit status is 1 if the median of a measure exceeds its threshold (in milliseconds).
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+CHILD = """
+import time
+start = time.perf_counter()
+
+import json
+import sys
+
+from PyQt6 import QtCore, QtWidgets
+
+from snat.__main__ import config_search_path
+from snat.cache import save_cache
+from snat.game_list import Achievement, Game
+
+QtCore.QSettings.setPath(QtCore.QSettings.Format.IniFormat, QtCore.QSettings.Scope.UserScope, sys.argv[1])
+QtCore.QSettings.setDefaultFormat(QtCore.QSettings.Format.IniFormat)
+QtCore.QCoreApplication.setApplicationName("Snat")
+QtCore.QCoreApplication.setOrganizationName("Theo Guerin")
+config_search_path()
+app = QtWidgets.QApplication(sys.argv[:1])
+
+if sys.argv[2] == "prepare":
+    games = int(sys.argv[3])
+    game_list = {
+        app_id: Game(f"Game {app_id}", {f"ACH_{i}": Achievement(f"Achievement {i}", f"https://cdn/{app_id}/{i}.jpg")
+                                        for i in range(30)})
+        for app_id in range(games)
+    }
+    settings = QtCore.QSettings()
+    settings.setValue("steam_api_key", "0" * 32)
+    settings.setValue("steam_user_id", "0" * 17)
+    settings.setValue("selected_game", -1)
+    save_cache("game_list_cache", game_list)
+    settings.setValue("game_names_cache", [[app_id, game.name] for app_id, game in game_list.items()])
+    settings.sync()
+    sys.exit(0)
+
+from snat.app import App
+
+measures = {}
+
+
+class FirstPaintFilter(QtCore.QObject):
+    def eventFilter(self, watched, event):
+        if event.type() == QtCore.QEvent.Type.Paint and "first_paint" not in measures:
+            measures["first_paint"] = (time.perf_counter() - start) * 1000
+        return False
+
+
+def on_started():
+    measures["interactive"] = (time.perf_counter() - start) * 1000
+    print(json.dumps(measures))
+    app.quit()
+
+
+window = App()
+paint_filter = FirstPaintFilter()
+window.dashboard.installEventFilter(paint_filter)
+window.dashboard.started.connect(on_started)
+window.show()
+app.exec()
+"""
+
+
+def parse_args() -> argparse.Namespace:
+    """Parse the command line arguments.
+
+    Returns:
+        argparse.Namespace: Parsed arguments
+    """
+    parser = argparse.ArgumentParser(description="Measure the snat startup time")
+    parser.add_argument("--games", type=int, default=5000, help="Number of games in the cached library")
+    parser.add_argument("--runs", type=int, default=5, help="Number of measured runs")
+    parser.add_argument("--max-first-paint", type=float, default=500, help="Threshold of the median (ms)")
+    parser.add_argument("--max-interactive", type=float, default=1500, help="Threshold of the median (ms)")
+    return parser.parse_args()
+
+
+def run_child(settings_dir: str, *args: str) -> str:
+    """Run the child script in a fresh process.
+
+    Args:
+        settings_dir (str): Directory of the temporary settings and caches
+        args (str): Extra arguments
+
+    Returns:
+        str: Standard output of the child
+    """
+    env = dict(os.environ, QT_QPA_PLATFORM="offscreen", PYTHONPATH=str(ROOT), XDG_CACHE_HOME=settings_dir)
+    result = subprocess.run([sys.executable, "-c", CHILD, settings_dir, *args],
+                            env=env, capture_output=True, text=True, check=True)
+    return result.stdout
+
+
+def main() -> None:
+    """Prepare the synthetic library, run the measures and check the thresholds."""
+    args = parse_args()
+    with tempfile.TemporaryDirectory() as settings_dir:
+        run_child(settings_dir, "prepare", str(args.games))
+        runs = [json.loads(run_child(settings_dir, "run").splitlines()[-1]) for _ in range(args.runs)]
+
+    failed = False
+    for measure, threshold in (("first_paint", args.max_first_paint), ("interactive", args.max_interactive)):
+        values = [run[measure] for run in runs]
+        median = statistics.median(values)
+        status = "OK" if median <= threshold else "REGRESSION"
+        failed |= median > threshold
+        print(f"{measure:<12} median {median:8.1f} ms  min {min(values):8.1f} ms  "
+              f"max {max(values):8.1f} ms  threshold {threshold:8.1f} ms  {status}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,56 @@
 import argparse
+import atexit
 import logging
+import queue
 import sys
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from pathlib import Path
 
 from PyQt6 import QtCore, QtWidgets
 
 from . import __version__
-from .app import App
+from .instance import InstanceServer, forward_to_running_instance, is_instance_running
+from .utils import configure_application, data_dir
+
+LOG_FORMAT = "[%(asctime)s] [%(levelname)s] [%(name)s:%(lineno)d] %(message)s"
+LOG_FILE_NAME = "snat.log"
+LOG_MAX_BYTES = 1024 * 1024
+LOG_BACKUP_COUNT = 3
+
+
+class LogQueueHandler(QueueHandler):
+    """Queue handler that leaves the formatting to the listener thread."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """Merge the arguments into the message so they can change once queued.
+
+        Args:
+            record (logging.LogRecord): Log record
+
+        Returns:
+            logging.LogRecord: Record to queue, formatted by the listener handlers
+        """
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+def log_level(value: str) -> tuple[str, int]:
+    """Parse a module log level argument.
+
+    Args:
+        value (str): Argument formatted as MODULE=LEVEL
+
+    Raises:
+        argparse.ArgumentTypeError: If the argument is invalid
+
+    Returns:
+        tuple[str, int]: Logger name and level
+    """
+    name, _, level = value.partition("=")
+    if not name or not isinstance(logging.getLevelName(level.upper()), int):
+        raise argparse.ArgumentTypeError(f"invalid module level {value!r}, expected MODULE=LEVEL")
+    return name, logging.getLevelName(level.upper())
 
 
 def parse_args() -> argparse.Namespace:
@@ -17,27 +61,58 @@ def parse_args() -> argparse.Namespace:
     """
     parser = argparse.ArgumentParser(description="Track your Steam achievements", epilog="Made by Theo Guerin")
     parser.add_argument("-d", "--debug", action="store_true", help="Enable debug logging")
+    parser.add_argument("--log-level", type=log_level, action="append", default=[], metavar="MODULE=LEVEL",
+                        help="Set the log level of a module, e.g. snat.steam_api=DEBUG (repeatable)")
     parser.add_argument("-v", "--version", action="version", version=f"%(prog)s {__version__}")
+    commands = parser.add_subparsers(dest="command", title="commands")
+
+    serve_parser = commands.add_parser("serve", help="Serve the cached library as a read-only JSON API")
+    serve_parser.add_argument("--host", default="127.0.0.1", help="Host to listen on (default: %(default)s)")
+    serve_parser.add_argument("--port", type=int, default=8765, help="Port to listen on (default: %(default)s)")
+    serve_parser.add_argument("--profile", help="Steam ID of the profile to serve (default: current profile)")
+
+    cache_parser = commands.add_parser("cache", help="Export or import the caches shared by all profiles")
+    cache_commands = cache_parser.add_subparsers(dest="cache_command", title="cache commands", required=True)
+    export_parser = cache_commands.add_parser("export", help="Pack the game schemas, games without achievements, "
+                                              "rarities and icons in a compressed archive")
+    export_parser.add_argument("path", type=Path, help="Archive to write")
+    import_parser = cache_commands.add_parser("import", help="Merge an archive into the caches")
+    import_parser.add_argument("path", type=Path, help="Archive to read")
     return parser.parse_args()
 
 
-def configure_logging(debug: bool) -> None:
+def configure_logging(debug: bool, levels: list[tuple[str, int]], log_file: bool) -> None:
     """Configure the logging system.
 
+    Log calls only put the records in a queue, a listener thread formats and writes them to the console and to
+    a rotating file in the data directory, so the GUI thread never waits on file I/O.
+
     Args:
         debug (bool): Whether to enable debug logging
+        levels (list[tuple[str, int]]): Level of each module logger, overriding the default level
+        log_file (bool): Whether to write the rotating file, only the GUI does so that concurrent commands
+            never race on its rollover
     """
     stream_handler = logging.StreamHandler()
     stream_handler.setLevel(logging.DEBUG if debug else logging.WARNING)
-
-    file_handler = logging.FileHandler(Path(__file__).parent / "latest.log")
-    file_handler.setLevel(logging.INFO)
-
-    logging.basicConfig(
-        level=logging.DEBUG,
-        format="[%(asctime)s] [%(levelname)s] [%(filename)s:%(lineno)d] %(message)s",
-        handlers=[stream_handler, file_handler]
-    )
+    handlers: list[logging.Handler] = [stream_handler]
+    if log_file:
+        handlers.append(RotatingFileHandler(data_dir() / LOG_FILE_NAME, maxBytes=LOG_MAX_BYTES,
+                                            backupCount=LOG_BACKUP_COUNT, encoding="utf-8", delay=True))
+    formatter = logging.Formatter(LOG_FORMAT)
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    log_queue: queue.SimpleQueue[logging.LogRecord] = queue.SimpleQueue()
+    listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+
+    root = logging.getLogger()
+    root.setLevel(logging.DEBUG if debug else logging.INFO)
+    root.addHandler(LogQueueHandler(log_queue))
+    for name, level in levels:
+        logging.getLogger(name).setLevel(level)
 
 
 def config_search_path() -> None:
@@ -46,17 +121,76 @@ def config_search_path() -> None:
 
 
 def start_app() -> None:
-    """Start the Qt application."""
+    """Start the Qt application and listen for the next launches.
+
+    If another launch won the race for the instance server, the arguments are forwarded to it instead.
+    The schema details records still queued in the thread pool are written before exiting.
+    """
     app = QtWidgets.QApplication(sys.argv[:1])
+    server = InstanceServer(app)
+    if not server.start() and forward_to_running_instance(sys.argv[1:]):
+        logging.info("Snat started meanwhile, arguments forwarded")
+        return
+
+    from .app import App
     window = App()
+    server.activated.connect(window.activate)
     window.show()
-    sys.exit(app.exec())
+    code = app.exec()
+    pool = QtCore.QThreadPool.globalInstance()
+    if pool is not None:
+        pool.waitForDone()
+    sys.exit(code)
+
+
+def start_server(host: str, port: int, user_id: str | None) -> None:
+    """Serve the cached library without starting the GUI nor contacting Steam.
+
+    Args:
+        host (str): Host to listen on
+        port (int): Port to listen on
+        user_id (str | None): Steam user ID of the profile, None for the current profile
+    """
+    from .server import serve
+    serve(host, port, user_id)
+
+
+def run_cache_command(command: str, path: Path) -> None:
+    """Export or import a cache archive without starting the GUI nor contacting Steam.
+
+    The import is refused while the application runs, it would overwrite the merged caches when saving its own.
+
+    Args:
+        command (str): "export" or "import"
+        path (Path): Archive path
+    """
+    from .cache_archive import describe, export_archive, import_archive
+    if command == "import" and is_instance_running():
+        sys.exit("Close Snat before importing a cache archive")
+
+    try:
+        counts = export_archive(path) if command == "export" else import_archive(path)
+    except (OSError, ValueError) as error:
+        sys.exit(f"Failed to {command} {path}: {error}")
+    print(f"{command.capitalize()}ed {describe(counts)}")
 
 
 def main() -> None:
     """Main entry point of the application."""
     args = parse_args()
-    configure_logging(args.debug)
+    configure_application()
+    configure_logging(args.debug, args.log_level, args.command is None)
+    if args.command == "serve":
+        start_server(args.host, args.port, args.profile)
+        return
+    if args.command == "cache":
+        run_cache_command(args.cache_command, args.path)
+        return
+
+    if forward_to_running_instance(sys.argv[1:]):
+        logging.info("Snat is already running, arguments forwarded")
+        return
+
     config_search_path()
     logging.info(f"Start Steam Achievement Tracker {__version__} with PyQt6 {QtCore.PYQT_VERSION_STR}")
     start_app()
@@ -1,28 +1,33 @@
 import logging
+import time
+from dataclasses import dataclass
 from typing import Any
 
-from PyQt6 import QtCore, QtGui, QtNetwork, QtWidgets
+from PyQt6 import QtCore, QtNetwork, QtWidgets
 
-from .game_list import Achievement, GameList
+from .friends import FriendLoader, compare_game, compare_library
+from .game_list import GameList
+from .icons import IconCache
+from .rarity import RARITY_RETRY_DELAY, GameRarity, RarityCache, SortOrder, library_index
 from .steam_api import SteamApi
 
+logger = logging.getLogger(__name__)
 
-class EmptyIcon(QtGui.QIcon):
-    """An icon that is empty and transparent"""
 
-    def __init__(self) -> None:
-        super().__init__()
-        self.addPixmap(self.load_pixmap())
+@dataclass
+class UserAchievements:
+    """Dataclass representing the cached user achievements of a game
+
+    Fields:
+        locked (list[str]): API names of the locked achievements
+        timestamp (float): Time of the download
+    """
+
+    locked: list[str]
+    timestamp: float
 
-    def load_pixmap(self) -> QtGui.QPixmap:
-        """Load the pixmap from the cache or create it if it doesn't exist"""
-        pixmap = QtGui.QPixmapCache.find("empty_icon")
-        if pixmap is None:
-            logging.debug("empty_icon not found in cache")
-            pixmap = QtGui.QPixmap(QtCore.QSize(64, 64))
-            pixmap.fill(QtGui.QColor("transparent"))
-            QtGui.QPixmapCache.insert("empty_icon", pixmap)
-        return pixmap
+
+UserAchievementsCache = dict[int, UserAchievements]
 
 
 class AchievementWidget(QtWidgets.QListWidgetItem):
@@ -30,90 +35,287 @@ class AchievementWidget(QtWidgets.QListWidgetItem):
 
     Attributes:
         icon_url (str): URL of the icon
+        app_id (int): app_id of the game
+        apiname (str): API name of the achievement
+        unlocked (bool): Whether the user unlocked the achievement
 
     Args:
         name (str): Name of the achievement
         icon_url (str): URL of the icon
-        steam_api (snat.steam_api.SteamApi): SteamApi instance
+        icons (snat.icons.IconCache): Icon cache
+        app_id (int): app_id of the game
+        apiname (str): API name of the achievement
+        unlocked (bool): Whether the user unlocked the achievement
     """
 
-    def __init__(self, name: str, icon_url: str, steam_api: SteamApi) -> None:
-        super().__init__(EmptyIcon(), name)
+    def __init__(self, name: str, icon_url: str, icons: IconCache, app_id: int, apiname: str,
+                 unlocked: bool = False) -> None:
+        super().__init__(name)
         self.icon_url = icon_url
-        self.load_icon(steam_api)
-
-    def load_icon(self, steam_api: SteamApi) -> None:
-        """Load the icon from the cache or request it if it doesn't exist
-
-        Args:
-            steam_api (snat.steam_api.SteamApi): SteamApi instance
-        """
-        pixmap = QtGui.QPixmapCache.find(self.icon_url)
-        if pixmap is not None:
-            self.setIcon(QtGui.QIcon(pixmap))
-        else:
-            steam_api.make_get_request(self.icon_url, self.handle_icon_response, self.handle_icon_error, True)
-
-    def handle_icon_response(self, icon: bytes, other: None) -> None:
-        """Load the icon from the response and add it to the cache
-
-        Args:
-            icon (bytes): Icon data
-            other (None): Unused
-        """
-        pixmap = QtGui.QPixmap()
-        pixmap.loadFromData(icon)
-        self.setIcon(QtGui.QIcon(pixmap))
-        QtGui.QPixmapCache.insert(self.icon_url, pixmap)
-
-    def handle_icon_error(self, error: QtNetwork.QNetworkReply.NetworkError, other: None) -> None:
-        """Leave the icon empty
-
-        Args:
-            error (QtNetwork.QNetworkReply.NetworkError): Network error
-            other (None): Unused
-        """
-        logging.warning("Failed to load icon")
+        self.app_id = app_id
+        self.apiname = apiname
+        self.unlocked = unlocked
+        icons.set_icon(self, icon_url)
 
 
 class AchievementList(QtWidgets.QListWidget):
     """A list that displays achievements
 
+    Signals:
+        loaded (): Emitted when the user achievements cache is updated
+        stale (float): Emitted with the cache timestamp when cached achievements are displayed
+        rarity_loaded (): Emitted when the rarity cache is updated
+        unlocked (int, list): Emitted with the app_id and the (API name, unlock time) of the unlocked achievements
+
     Constants:
         WELCOME_MESSAGE (str): Message that is displayed when no game is selected
         COMPLETED_MESSAGE (str): Message that is displayed when all achievements are completed
+        OFFLINE_MESSAGE (str): Message that is displayed when offline without cached achievements
+        LIBRARY_LIMIT (int): Maximum number of achievements displayed for All Games
+        FRIEND_LOADING_MESSAGE (str): Message that is displayed while the compared friend data is downloaded
+        FRIEND_PRIVATE_MESSAGE (str): Message that is displayed when the compared friend data is not visible
 
     Attributes:
         steam_api (snat.steam_api.SteamApi): SteamApi instance
         game_list (snat.game_list.GameList): GameList instance
+        user_achievements (UserAchievementsCache): User achievements cache
+        rarity (snat.rarity.RarityCache): Rarity cache
+        sort_order (snat.rarity.SortOrder): Order of the locked achievements
+        current_app_id (int): app_id of the displayed game, -1 for All Games
+        current_locked (list[str] | None): Locked achievements of the displayed game, None if not loaded
+        library_pending (set[int]): app_ids of the rarity requests needed by the All Games list not answered yet
+        rarity_failures (dict[int, float]): Time of the last failed rarity request by app_id, retried after
+            RARITY_RETRY_DELAY
+        friend_loader (snat.friends.FriendLoader): Loader of the friends achievements
+        compare_with (str | None): Steam ID of the compared friend, None to display the locked achievements
+        icons (snat.icons.IconCache): Icons shared by the rows
 
     Args:
         parent (QtWidgets.QWidget): Parent widget
         steam_api (snat.steam_api.SteamApi): SteamApi instance
         game_list (snat.game_list.GameList): GameList instance
+        user_achievements (UserAchievementsCache): User achievements cache
+        rarity (snat.rarity.RarityCache): Rarity cache
+        friend_loader (snat.friends.FriendLoader): Loader of the friends achievements
     """
 
+    loaded = QtCore.pyqtSignal()
+    stale = QtCore.pyqtSignal(float)
+    rarity_loaded = QtCore.pyqtSignal()
+    unlocked = QtCore.pyqtSignal(int, list)
+
     WELCOME_MESSAGE = "Select a game to view its achievements"
     COMPLETED_MESSAGE = "You've completed all achievements for this game!"
+    OFFLINE_MESSAGE = "You are offline and this game has no cached achievements"
+    LIBRARY_LIMIT = 200
+    FRIEND_LOADING_MESSAGE = "Loading the achievements of {}..."
+    FRIEND_PRIVATE_MESSAGE = "The achievements of {} are not available"
 
-    def __init__(self, parent: QtWidgets.QWidget, steam_api: SteamApi, game_list: GameList) -> None:
+    def __init__(self, parent: QtWidgets.QWidget, steam_api: SteamApi, game_list: GameList,
+                 user_achievements: UserAchievementsCache, rarity: RarityCache, friend_loader: FriendLoader) -> None:
         super().__init__(parent)
         self.steam_api = steam_api
         self.game_list = game_list
+        self.user_achievements = user_achievements
+        self.rarity = rarity
+        self.sort_order = SortOrder.DEFAULT
+        self.current_app_id = -1
+        self.current_locked: list[str] | None = None
+        self.library_pending: set[int] = set()
+        self.rarity_failures: dict[int, float] = {}
+        self.friend_loader = friend_loader
+        self.compare_with: str | None = None
+        self.icons = IconCache(self, steam_api)
+
+        self.friend_loader.progress_received.connect(self.on_friend_progress)
+        self.friend_loader.achievements_received.connect(self.on_friend_achievements)
+
+    @staticmethod
+    def achievement_label(name: str, percent: float | None) -> str:
+        """Return the achievement name followed by its global unlock percentage, if known
 
-    def add_achievements(self, achievements: list[Achievement]) -> None:
-        """Add achievements to the list
+        Args:
+            name (str): Achievement name
+            percent (float | None): Global unlock percentage
+
+        Returns:
+            str: Achievement label
+        """
+        if percent is None:
+            return name
+        return f"{name} ({percent:.1f}%)"
+
+    def show_locked(self, app_id: int, locked: list[str]) -> None:
+        """Display the locked achievements of a game, sorted with the precomputed rarity index
 
         Args:
-            achievements (list[snat.game_list.Achievement]): Achievements to add
+            app_id (int): app_id of the game
+            locked (list[str]): Locked achievement API names
         """
-        if achievements:
-            self.setEnabled(True)
-            for achievement in achievements:
-                self.addItem(AchievementWidget(achievement.name, achievement.icon, self.steam_api))
-        else:
+        self.clear()
+        self.current_locked = locked
+        if self.compare_with is not None:
+            self.show_game_comparison(app_id, locked, self.compare_with)
+            return
+
+        game = self.game_list[app_id]
+        names = [name for name in locked if name in game.schema]
+        rarity = self.rarity.get(app_id)
+        if rarity is not None:
+            names = rarity.sort(names, self.sort_order)
+
+        if not names:
             self.setEnabled(False)
             self.addItem(self.COMPLETED_MESSAGE)
+            return
+
+        self.setEnabled(True)
+        for name in names:
+            achievement = game.schema[name]
+            percent = None if rarity is None else rarity.percents.get(name)
+            self.addItem(AchievementWidget(self.achievement_label(achievement.name, percent),
+                                           achievement.icon, self.icons, app_id, name))
+
+    def show_library(self, load_rarity: bool = True) -> None:
+        """Display the cached locked achievements of all games with a known rarity, sorted by rarity
+
+        Cached achievements missing from an older cached schema are skipped.
+
+        Args:
+            load_rarity (bool, optional): Whether to download the missing rarity, False to only display the cached one
+        """
+        self.clear()
+        if self.compare_with is not None:
+            self.show_library_comparison(self.compare_with)
+            return
+
+        if self.sort_order == SortOrder.DEFAULT:
+            self.setEnabled(False)
+            self.addItem(self.WELCOME_MESSAGE)
+            return
+
+        locked = {app_id: [name for name in cached.locked if name in self.game_list[app_id].schema]
+                  for app_id, cached in self.user_achievements.items() if app_id in self.game_list}
+        if load_rarity and not self.library_pending:
+            self.load_library_rarity(list(locked.keys()))
+
+        index = library_index(locked, self.rarity, self.sort_order)
+        self.setEnabled(bool(index))
+        for percent, app_id, name in index[:self.LIBRARY_LIMIT]:
+            game = self.game_list[app_id]
+            achievement = game.schema[name]
+            label = self.achievement_label(f"{game.name}: {achievement.name}", percent)
+            self.addItem(AchievementWidget(label, achievement.icon, self.icons, app_id, name))
+
+    def show_friend_message(self, user_id: str, loading: bool) -> None:
+        """Display that the compared friend data is loading or not available
+
+        Args:
+            user_id (str): Steam ID of the friend
+            loading (bool): Whether the data is being downloaded
+        """
+        friend = self.friend_loader.friends.get(user_id)
+        name = user_id if friend is None else friend.name
+        message = self.FRIEND_LOADING_MESSAGE if loading else self.FRIEND_PRIVATE_MESSAGE
+        self.setEnabled(False)
+        self.addItem(message.format(name))
+
+    def show_game_comparison(self, app_id: int, locked: list[str], user_id: str) -> None:
+        """Display side by side the achievements of a game locked by the user or the compared friend
+
+        Args:
+            app_id (int): app_id of the game
+            locked (list[str]): API names locked by the user
+            user_id (str): Steam ID of the friend
+        """
+        friend = self.friend_loader.friends.get(user_id)
+        if friend is None or not self.friend_loader.has_valid_achievements(user_id, app_id):
+            loading = (user_id, app_id) in self.friend_loader.achievements_pending
+            self.show_friend_message(user_id, loading)
+            return
+
+        game = self.game_list[app_id]
+        names = list(game.schema)
+        rarity = self.rarity.get(app_id)
+        if rarity is not None:
+            names = rarity.sort(names, self.sort_order)
+        rows = compare_game(names, locked, friend.locked[app_id])
+        if not rows:
+            self.setEnabled(False)
+            self.addItem(self.COMPLETED_MESSAGE)
+            return
+
+        self.setEnabled(True)
+        for name, mine, theirs in rows:
+            achievement = game.schema[name]
+            label = f"{achievement.name}  —  You: {'✓' if mine else '✗'}  |  {friend.name}: {'✓' if theirs else '✗'}"
+            self.addItem(AchievementWidget(label, achievement.icon, self.icons, app_id, name, mine))
+
+    def show_library_comparison(self, user_id: str) -> None:
+        """Display side by side the achievements progress of the user and the compared friend, game by game
+
+        Args:
+            user_id (str): Steam ID of the friend
+        """
+        friend = self.friend_loader.friends.get(user_id)
+        rows = [] if friend is None else compare_library(self.game_list, friend)
+        if friend is None or not rows:
+            self.show_friend_message(user_id, user_id in self.friend_loader.progress_pending)
+            return
+
+        self.setEnabled(True)
+        for app_id, mine, theirs in rows[:self.LIBRARY_LIMIT]:
+            game = self.game_list[app_id]
+            total = len(game.schema)
+            self.addItem(f"{game.name}  —  You: {mine}/{total}  |  {friend.name}: {theirs}/{total}")
+
+    def set_compare_with(self, user_id: str | None) -> None:
+        """Change the compared friend, download its missing data and display the current view again
+
+        Args:
+            user_id (str | None): Steam ID of the friend, None to stop comparing
+        """
+        self.compare_with = user_id
+        if user_id is not None:
+            self.friend_loader.load_progress(user_id)
+            if self.current_app_id != -1:
+                self.friend_loader.load_achievements(user_id, self.current_app_id)
+        self.refresh_view()
+
+    def on_friend_progress(self, user_id: str) -> None:
+        """Update the library comparison as the progress chunks of the compared friend arrive
+
+        Args:
+            user_id (str): Steam ID of the friend
+        """
+        if user_id == self.compare_with and self.current_app_id == -1:
+            self.refresh_view()
+
+    def on_friend_achievements(self, user_id: str, app_id: int) -> None:
+        """Display the game comparison once the achievements of the compared friend arrive
+
+        Args:
+            user_id (str): Steam ID of the friend
+            app_id (int): app_id of the game
+        """
+        if user_id == self.compare_with and app_id == self.current_app_id:
+            self.refresh_view()
+
+    def set_sort_order(self, sort_order: SortOrder) -> None:
+        """Change the sort order and display the current achievements again, without network access
+
+        Args:
+            sort_order (snat.rarity.SortOrder): New sort order
+        """
+        self.sort_order = sort_order
+        self.refresh_view()
+
+    def refresh_view(self) -> None:
+        """Display the current achievements again"""
+        if self.current_app_id == -1:
+            self.show_library()
+        elif self.current_locked is not None and self.current_app_id in self.game_list:
+            self.show_locked(self.current_app_id, self.current_locked)
 
     def load_user_achievements(self, app_id: int | None) -> None:
         """Load the user achievements for the given app_id
@@ -122,12 +324,116 @@ class AchievementList(QtWidgets.QListWidget):
             app_id (int | None): The app_id to load the achievements for
         """
         self.clear()
-        if app_id is None or app_id == -1:
+        self.current_app_id = -1 if app_id is None else app_id
+        self.current_locked = None
+        if self.current_app_id == -1:
+            self.show_library()
+            return
+
+        if self.compare_with is not None:
+            self.friend_loader.load_achievements(self.compare_with, self.current_app_id)
+        if self.steam_api.is_online():
+            self.load_rarity(self.current_app_id)
+            self.steam_api.get_user_achievements(
+                self.current_app_id, self.handle_user_achiev_response, self.handle_user_achiev_error)
+        else:
+            self.load_cached_user_achievements(self.current_app_id)
+
+    def load_rarity(self, app_id: int) -> bool:
+        """Download the global unlock percentages of a game if they are not cached or expired
+
+        A game whose last request failed is not requested again before RARITY_RETRY_DELAY.
+
+        Args:
+            app_id (int): app_id of the game
+
+        Returns:
+            bool: True if a request was made
+        """
+        rarity = self.rarity.get(app_id)
+        if rarity is not None and not rarity.is_expired():
+            return False
+        if time.time() - self.rarity_failures.get(app_id, 0) < RARITY_RETRY_DELAY:
+            return False
+        self.steam_api.get_global_achievement_percentages(app_id, self.handle_rarity_response,
+                                                          self.handle_rarity_error)
+        return True
+
+    def load_library_rarity(self, app_ids: list[int]) -> None:
+        """Download the missing global unlock percentages needed by the All Games list
+
+        Args:
+            app_ids (list[int]): app_ids of the games with cached locked achievements
+        """
+        if not self.steam_api.is_online():
+            return
+        for app_id in app_ids:
+            if self.load_rarity(app_id):
+                self.library_pending.add(app_id)
+
+    def handle_rarity_response(self, data: Any, app_id: int) -> None:
+        """Cache the global unlock percentages and display the current achievements again
+
+        Args:
+            data (Any): Response data
+            app_id (int): app_id of the game
+        """
+        try:
+            self.rarity[app_id] = GameRarity.from_response(data)
+            self.rarity_failures.pop(app_id, None)
+        except (KeyError, TypeError, ValueError):
+            logger.warning("Invalid global achievement percentages for app_id %d", app_id)
+            self.rarity_failures[app_id] = time.time()
+        self.finish_rarity_request(app_id)
+
+    def handle_rarity_error(self, error: QtNetwork.QNetworkReply.NetworkError, app_id: int) -> None:
+        """Keep the current order, the percentages are optional and requested again after RARITY_RETRY_DELAY
+
+        Args:
+            error (QtNetwork.QNetworkReply.NetworkError): Network error
+            app_id (int): app_id of the game
+        """
+        logger.warning("Failed to load global achievement percentages for app_id %d", app_id)
+        self.rarity_failures[app_id] = time.time()
+        self.finish_rarity_request(app_id)
+
+    def finish_rarity_request(self, app_id: int) -> None:
+        """Emit rarity_loaded and refresh the view once the rarity needed by the current view is received
+
+        The All Games list is displayed again without requesting the rarity still missing.
+
+        Args:
+            app_id (int): app_id of the game
+        """
+        if app_id in self.library_pending:
+            self.library_pending.discard(app_id)
+            if self.library_pending:
+                return
+            self.rarity_loaded.emit()
+            if self.current_app_id == -1:
+                self.show_library(load_rarity=False)
+            return
+
+        self.rarity_loaded.emit()
+        if app_id == self.current_app_id:
+            self.refresh_view()
+
+    def load_cached_user_achievements(self, app_id: int) -> None:
+        """Load the user achievements of the given app_id from the cache
+
+        Args:
+            app_id (int): The app_id to load the achievements for
+        """
+        self.clear()
+        game = self.game_list.get(app_id)
+        cached = self.user_achievements.get(app_id)
+        if game is None or cached is None:
             self.setEnabled(False)
-            self.addItem(self.WELCOME_MESSAGE)
+            self.addItem(self.OFFLINE_MESSAGE)
             return
 
-        self.steam_api.get_user_achievements(app_id, self.handle_user_achiev_response, self.handle_user_achiev_error)
+        self.show_locked(app_id, cached.locked)
+        self.stale.emit(cached.timestamp)
 
     def handle_user_achiev_response(self, data: Any, app_id: int) -> None:
         """Load the user achievements from the response
@@ -138,23 +444,39 @@ class AchievementList(QtWidgets.QListWidget):
         """
         game = self.game_list.get(app_id)
         if game is None:
-            logging.error(f"Failed to load schema for app_id {app_id}")
+            logger.error(f"Failed to load schema for app_id {app_id}")
             return
 
-        achievements: list[Achievement] = []
+        locked: list[str] = []
+        unlocked: list[tuple[str, int]] = []
         for raw_achievement in data["playerstats"]["achievements"]:
             if not raw_achievement["achieved"]:
-                achievements.append(game.schema[raw_achievement["apiname"]])
-        self.add_achievements(achievements)
+                locked.append(raw_achievement["apiname"])
+            elif raw_achievement.get("unlocktime"):
+                unlocked.append((raw_achievement["apiname"], raw_achievement["unlocktime"]))
+        game.unlocked = len(data["playerstats"]["achievements"]) - len(locked)
+        if app_id == self.current_app_id:
+            self.show_locked(app_id, locked)
 
-    def handle_user_achiev_error(self, error: QtNetwork.QNetworkReply.NetworkError, other: None) -> None:
-        """Display an error message and disable the list
+        self.user_achievements[app_id] = UserAchievements(locked, time.time())
+        self.loaded.emit()
+        self.unlocked.emit(app_id, unlocked)
+
+    def handle_user_achiev_error(self, error: QtNetwork.QNetworkReply.NetworkError, app_id: int) -> None:
+        """Fall back to the cache when offline, otherwise display an error message and disable the list
 
         Args:
             error (QtNetwork.QNetworkReply.NetworkError): Network error
-            other (None): Unused
+            app_id (int): app_id of the game
         """
+        if app_id != self.current_app_id:
+            return
+
+        if not self.steam_api.is_online():
+            self.load_cached_user_achievements(app_id)
+            return
+
         self.setEnabled(False)
         QtWidgets.QMessageBox.critical(self, "Error", "Failed to load achievements!\n"
                                        "(You can try to change the game)")
-        logging.error("Failed to load achievements")
+        logger.error("Failed to load achievements")
@@ -1,66 +1,367 @@
+import logging
+import time
+
 from PyQt6 import QtCore, QtGui, QtWidgets
 
-from . import __version__
-from .achievement_list import AchievementList
-from .game_list import GameListBar
+from .achievement_list import AchievementList, UserAchievementsCache
+from .cache import CacheStats, cache_dir, load_cache, profile_cache, remove_cache, save_cache
+from .detail_pane import DetailPane
+from .friends import FriendCache, FriendLoader
+from .game_list import (Game, GameList, GameListBar, LibraryCache, NoAchievementsCache, SchemaCache, evict_schemas,
+                        join_library, schema_size)
+from .history import UnlockHistory, profile_history_path
+from .rarity import RarityCache, SortOrder
+from .schema_details import details_dir
 from .settings import Settings
 from .steam_api import SteamApi
+from .utils import configure_application, data_dir, format_timestamp
+from .watcher import UnlockWatcher
+
+logger = logging.getLogger(__name__)
 
 
 class GameDashboard(QtWidgets.QWidget):
     """Widget that displays the game list and the achievement list
 
+    Only the cached game names are loaded before the first paint, see start for the deferred initialization.
+    Game schemas, rarity and games without achievements are shared by all profiles,
+    the owned games progress, the user achievements, the friends and the unlock history belong to the current profile.
+
+    Signals:
+        status_changed (str): Emitted with the new status message
+        started (): Emitted when the deferred initialization is done
+
     Attributes:
         settings (snat.settings.Settings): Settings instance
+        is_started (bool): Whether the deferred initialization is scheduled
         steam_api (snat.steam_api.SteamApi): SteamApi
-        game_list (snat.game_list.GameList): Game list
+        game_list (snat.game_list.GameList): Game list of the current profile
+        schemas (snat.game_list.SchemaCache): Game schemas shared by all profiles
+        user_achievements (snat.achievement_list.UserAchievementsCache): User achievements cache
+        no_achievements (snat.game_list.NoAchievementsCache): Games without achievements cache
+        rarity (snat.rarity.RarityCache): Global unlock percentages cache
+        history (snat.history.UnlockHistory): Unlock history
+        watcher (snat.watcher.UnlockWatcher): Watcher of the game currently played
+        friends (snat.friends.FriendCache): Friends of the current profile and their cached achievements
+        friend_loader (snat.friends.FriendLoader): Loader of the friends achievements
 
     Args:
         parent (PyQt6.QtWidgets.QWidget): Parent widget
         settings (snat.settings.Settings): Settings instance
+        steam_api (snat.steam_api.SteamApi): SteamApi, shared with the onboarding dialogs
     """
 
-    def __init__(self, parent: QtWidgets.QWidget, settings: Settings) -> None:
+    status_changed = QtCore.pyqtSignal(str)
+    started = QtCore.pyqtSignal()
+
+    def __init__(self, parent: QtWidgets.QWidget, settings: Settings, steam_api: SteamApi) -> None:
         super().__init__(parent)
         self.settings = settings
-        self.steam_api = SteamApi(self, self.settings)
-        self.game_list = self.settings.typedValue("game_list_cache", dict) or {}
+        self.is_started = False
+        self.steam_api = steam_api
+        self.game_list: GameList = {}
+        self.schemas: SchemaCache = {}
+        self.user_achievements: UserAchievementsCache = {}
+        self.no_achievements: NoAchievementsCache = {}
+        self.rarity: RarityCache = {}
+        self.history = UnlockHistory(profile_history_path(self.settings.user_id()))
+        self.watcher = UnlockWatcher(self, self.steam_api, self.game_list, self.user_achievements)
+        self.friends: FriendCache = {}
+        self.friend_loader = FriendLoader(self, self.steam_api, self.game_list, self.friends)
         self.init_ui()
+        self.apply_cache_budgets()
 
         self.game_list_bar.loaded.connect(self.on_games_loaded)
+        self.game_list_bar.progress_loaded.connect(self.on_progress_loaded)
         self.game_list_bar.selected.connect(self.on_game_selected)
+        self.achievement_list.loaded.connect(self.on_user_achievements_loaded)
+        self.achievement_list.stale.connect(self.on_stale_achievements)
+        self.achievement_list.rarity_loaded.connect(self.on_rarity_loaded)
+        self.achievement_list.unlocked.connect(self.history.record)
+        self.watcher.achievements_received.connect(self.achievement_list.handle_user_achiev_response)
+        self.sort_combo_box.currentIndexChanged.connect(self.on_sort_order_changed)
+        self.compare_combo_box.currentIndexChanged.connect(self.on_compare_changed)
+        self.friend_loader.friends_loaded.connect(self.update_compare_combo_box)
+        self.friend_loader.cache_changed.connect(self.on_friends_changed)
+        self.steam_api.online_changed.connect(self.on_online_changed)
+
+        self.show_cached_names()
+
+    def show_cached_names(self) -> None:
+        """Display the cached game names of the current profile before its caches are loaded"""
+        self.game_list_bar.add_game_names(self.settings.typedValue(self.settings.profile_key("game_names_cache"),
+                                                                   list, []))
+        self.game_list_bar.select_game(self.selected_game(), silent=True)
+
+    def selected_game(self) -> int:
+        """Return the stored selected game of the current profile
+
+        Returns:
+            int: app_id of the game, -1 for All Games
+        """
+        return self.settings.typedValue(self.settings.profile_key("selected_game"), int, -1)
+
+    def paintEvent(self, event: QtGui.QPaintEvent | None) -> None:
+        """Override the paint event to start the deferred initialization after the first paint"""
+        super().paintEvent(event)
+        if not self.is_started:
+            self.is_started = True
+            QtCore.QTimer.singleShot(0, self.start)
+
+    def start(self) -> None:
+        """Load the caches, set up the network and load the selected game achievements"""
+        self.settings.migrate_to_cache("game_list_cache")
+        self.settings.migrate_to_cache("user_achievements_cache")
+        self.migrate_to_profile()
+        self.schemas.update(load_cache("schema_cache", {}))
+        self.no_achievements.update(load_cache("no_achievements_cache", {}))
+        self.rarity.update(load_cache("rarity_cache", {}))
+        self.steam_api.start()
+        self.show_profile()
+        self.started.emit()
+
+    def migrate_to_profile(self) -> None:
+        """Split the caches of a version without profiles between the shared caches and the current profile"""
+        user_id = self.settings.user_id()
+        game_list: GameList | None = load_cache("game_list_cache", None)
+        if game_list is not None:
+            logger.info("Split game_list_cache into schema_cache and the library of profile %s", user_id)
+            save_cache("schema_cache", {app_id: Game(game.name, game.schema) for app_id, game in game_list.items()})
+            save_cache(profile_cache("library_cache", user_id),
+                       {app_id: game.unlocked for app_id, game in game_list.items()})
+            remove_cache("game_list_cache")
+
+        user_achievements: UserAchievementsCache | None = load_cache("user_achievements_cache", None)
+        if user_achievements is not None:
+            logger.info("Move user_achievements_cache to profile %s", user_id)
+            save_cache(profile_cache("user_achievements_cache", user_id), user_achievements)
+            remove_cache("user_achievements_cache")
+
+        legacy_history = data_dir() / "history.sqlite3"
+        if legacy_history.exists() and not self.history.path.exists():
+            logger.info("Move the unlock history to profile %s", user_id)
+            legacy_history.rename(self.history.path)
+
+    def show_profile(self) -> None:
+        """Load the caches of the current profile, display its game list and the selected game achievements"""
+        user_id = self.settings.user_id()
+        library: LibraryCache = load_cache(profile_cache("library_cache", user_id), {})
+        evict_schemas(self.schemas, library, self.game_list_bar.schema_stats)
+        self.game_list.update(join_library(self.schemas, library))
+        self.user_achievements.update(load_cache(profile_cache("user_achievements_cache", user_id), {}))
+        self.friends.update(load_cache(profile_cache("friends_cache", user_id), {}))
+        self.update_compare_combo_box()
+        if self.steam_api.is_online():
+            self.friend_loader.load_friends()
+        self.game_list_bar.start()
+        if self.game_list_bar.selected_app_id() == -1:
+            self.game_list_bar.select_game(self.selected_game(), silent=True)
+        self.status_changed.emit(self.status_message())
+        self.on_game_selected(self.game_list_bar.selected_app_id())
+        self.set_watching(self.settings.typedValue("watch_current_game", bool, False))
 
-        if self.game_list is not None:
-            selected_game = self.settings.typedValue("selected_game", int)
-            if selected_game is not None:
-                self.game_list_bar.select_game(selected_game)
+    def switch_profile(self, user_id: str) -> None:
+        """Display the library of another profile, its caches are loaded without network access
+
+        Args:
+            user_id (str): Steam user ID of the profile
+        """
+        if user_id == self.settings.user_id():
+            return
+
+        if self.watcher.active:
+            self.watcher.stop()
+        self.settings.add_profile(user_id)
+        self.settings.setValue("steam_user_id", user_id)
+        self.steam_api.set_user_id(user_id)
+        self.history.close()
+        self.history.path = profile_history_path(user_id)
+        self.game_list.clear()
+        self.user_achievements.clear()
+        self.friends.clear()
+        self.friend_loader.reset()
+        self.achievement_list.compare_with = None
+        self.game_list_bar.reset()
+        self.detail_pane.reset()
+        self.show_cached_names()
+        self.show_profile()
+
+    def apply_cache_budgets(self) -> None:
+        """Apply the cache budgets of the settings to the in-memory caches"""
+        QtGui.QPixmapCache.setCacheLimit(self.settings.cache_budget("pixmaps") // 1024)
+        self.achievement_list.icons.set_budget(self.settings.cache_budget("icons"))
+        self.game_list_bar.schema_stats.budget = self.settings.cache_budget("schemas")
+
+    def cache_stats(self) -> list[CacheStats]:
+        """Return the current usage of every cache
+
+        Returns:
+            list[snat.cache.CacheStats]: Usage counters, the unknown usages are measured now
+        """
+        schema_stats = self.game_list_bar.schema_stats
+        schema_stats.usage = sum(schema_size(game) for game in self.schemas.values())
+        disk_cache = self.steam_api.disk_cache
+        disk_stats = CacheStats("HTTP disk cache", self.steam_api.disk_budget, counted=False)
+        if disk_cache is not None:
+            disk_stats = disk_cache.stats
+            disk_stats.usage = disk_cache.cacheSize()
+        cache_files = sum(path.stat().st_size for path in cache_dir().glob("*.pickle"))
+        cache_files += sum(path.stat().st_size for path in details_dir().glob("*.json.z"))
+        return [
+            self.achievement_list.icons.stats,
+            CacheStats("Qt pixmaps", QtGui.QPixmapCache.cacheLimit() * 1024, counted=False),
+            schema_stats,
+            disk_stats,
+            CacheStats("Cache files", usage=cache_files, counted=False),
+        ]
+
+    def save_library(self) -> None:
+        """Cache the achievements progress of the current profile games"""
+        library: LibraryCache = {app_id: game.unlocked for app_id, game in self.game_list.items()}
+        save_cache(profile_cache("library_cache", self.settings.user_id()), library)
+
+    def set_watching(self, watching: bool) -> None:
+        """Start or stop watching the game currently played
+
+        Args:
+            watching (bool): Whether to watch
+        """
+        self.settings.setValue("watch_current_game", watching)
+        if watching and not self.watcher.active:
+            self.watcher.start()
+        elif not watching and self.watcher.active:
+            self.watcher.stop()
 
     def init_ui(self) -> None:
         """Create widgets and set the layout."""
         layout = QtWidgets.QVBoxLayout(self)
         self.setLayout(layout)
 
-        self.game_list_bar = GameListBar(self.steam_api, self.game_list, self)
+        self.game_list_bar = GameListBar(self.steam_api, self.game_list, self.schemas, self.no_achievements, self)
         layout.addWidget(self.game_list_bar)
 
-        self.achievement_list = AchievementList(self, self.steam_api, self.game_list)
+        options_layout = QtWidgets.QHBoxLayout()
+        layout.addLayout(options_layout)
+
+        self.sort_combo_box = QtWidgets.QComboBox(self)
+        for sort_order in SortOrder:
+            self.sort_combo_box.addItem(sort_order.value, sort_order)
+        options_layout.addWidget(self.sort_combo_box)
+
+        self.compare_combo_box = QtWidgets.QComboBox(self)
+        self.compare_combo_box.setToolTip("Compare with a friend")
+        self.compare_combo_box.addItem("No comparison")
+        options_layout.addWidget(self.compare_combo_box)
+
+        self.achievement_list = AchievementList(self, self.steam_api, self.game_list, self.user_achievements,
+                                                self.rarity, self.friend_loader)
         layout.addWidget(self.achievement_list)
 
+        self.detail_pane = DetailPane(self, self.steam_api, self.game_list)
+        self.achievement_list.currentItemChanged.connect(self.detail_pane.show_item)
+        layout.addWidget(self.detail_pane)
+
+        sort_order_name = self.settings.typedValue("sort_order", str, SortOrder.DEFAULT.name)
+        sort_order = SortOrder.__members__.get(sort_order_name, SortOrder.DEFAULT)
+        self.sort_combo_box.setCurrentIndex(self.sort_combo_box.findData(sort_order))
+        self.achievement_list.sort_order = sort_order
+
+    def status_message(self) -> str:
+        """Build the status message from the network state and the cache age
+
+        Returns:
+            str: Status message, empty when online
+        """
+        if self.steam_api.is_online():
+            return ""
+        cache_time_key = self.settings.profile_key("game_list_cache_time")
+        if not self.settings.contains(cache_time_key):
+            return "Offline - no cached library"
+        cache_time = self.settings.typedValue(cache_time_key, float, 0.0)
+        return f"Offline - library cached on {format_timestamp(cache_time)}"
+
     def on_games_loaded(self) -> None:
-        """Cache the game list"""
-        self.settings.setValue("game_list_cache", self.game_list)
+        """Cache the shared game schemas and the game list of the current profile"""
+        evict_schemas(self.schemas, self.game_list, self.game_list_bar.schema_stats)
+        save_cache("schema_cache", self.schemas)
+        save_cache("no_achievements_cache", self.no_achievements)
+        self.save_library()
+        self.settings.setValue(self.settings.profile_key("game_names_cache"), self.game_list_bar.game_names())
+        self.settings.setValue(self.settings.profile_key("game_list_cache_time"), time.time())
+
+    def on_progress_loaded(self) -> None:
+        """Cache the achievements progress"""
+        self.save_library()
 
     def on_game_selected(self, app_id: int) -> None:
         """Save the selected game and load the achievements"""
-        self.settings.setValue("selected_game", app_id)
+        self.settings.setValue(self.settings.profile_key("selected_game"), app_id)
+        self.status_changed.emit(self.status_message())
         self.achievement_list.load_user_achievements(app_id)
 
+    def on_user_achievements_loaded(self) -> None:
+        """Cache the user achievements and update the game progress"""
+        save_cache(profile_cache("user_achievements_cache", self.settings.user_id()), self.user_achievements)
+        self.save_library()
+        self.game_list_bar.update_labels()
+
+    def on_rarity_loaded(self) -> None:
+        """Cache the global unlock percentages"""
+        save_cache("rarity_cache", self.rarity)
+
+    def on_sort_order_changed(self, index: int) -> None:
+        """Save the sort order and sort the displayed achievements"""
+        sort_order: SortOrder = self.sort_combo_box.itemData(index)
+        self.settings.setValue("sort_order", sort_order.name)
+        self.achievement_list.set_sort_order(sort_order)
+
+    def update_compare_combo_box(self) -> None:
+        """Fill the comparison combo box with the friends sorted by name, keeping the compared friend"""
+        compared = self.achievement_list.compare_with
+        self.compare_combo_box.blockSignals(True)
+        self.compare_combo_box.clear()
+        self.compare_combo_box.addItem("No comparison")
+        for user_id, friend in sorted(self.friends.items(), key=lambda item: item[1].name.lower()):
+            self.compare_combo_box.addItem(f"Compare with {friend.name}", user_id)
+        index = self.compare_combo_box.findData(compared) if compared is not None else 0
+        self.compare_combo_box.setCurrentIndex(max(index, 0))
+        self.compare_combo_box.blockSignals(False)
+        if compared is not None and index == -1:
+            self.achievement_list.set_compare_with(None)
+
+    def on_compare_changed(self, index: int) -> None:
+        """Compare the achievements with the selected friend"""
+        self.achievement_list.set_compare_with(self.compare_combo_box.itemData(index))
+
+    def on_friends_changed(self) -> None:
+        """Cache the friends of the current profile"""
+        save_cache(profile_cache("friends_cache", self.settings.user_id()), self.friends)
+
+    def on_stale_achievements(self, timestamp: float) -> None:
+        """Show the age of the displayed achievements"""
+        self.status_changed.emit(f"Offline - achievements cached on {format_timestamp(timestamp)}")
+
+    def on_online_changed(self, online: bool) -> None:
+        """Update the status and synchronize the views when the connectivity returns"""
+        self.status_changed.emit(self.status_message())
+        if not online:
+            return
+
+        if not self.game_list:
+            self.game_list_bar.refresh_game_list()
+        else:
+            self.achievement_list.load_user_achievements(self.selected_game())
+
 
 class App(QtWidgets.QMainWindow):
     """The main application
 
     Attributes:
         settings (snat.settings.Settings): Settings instance
+        steam_api (snat.steam_api.SteamApi): SteamApi, created before the onboarding dialogs to share its connections
+        dashboard (GameDashboard): Central widget
+        tray_icon (PyQt6.QtWidgets.QSystemTrayIcon | None): Tray icon, None if the system has no tray
+        profile_menu (PyQt6.QtWidgets.QMenu | None): Menu listing the profiles
 
     Args:
         parent (PyQt6.QtWidgets.QWidget): Parent widget
@@ -70,15 +371,18 @@ class App(QtWidgets.QMainWindow):
         super().__init__(parent)
         self.configure()
         self.settings = Settings(self)
+        self.steam_api = SteamApi(self, self.settings)
+        self.settings.define_credentials(self.steam_api)
         self.restore()
         self.init_ui()
-        self.setCentralWidget(GameDashboard(self, self.settings))
+        self.dashboard = GameDashboard(self, self.settings, self.steam_api)
+        self.setCentralWidget(self.dashboard)
+        self.dashboard.watcher.unlocked.connect(self.notify_unlocks)
+        self.init_status_bar()
 
     def configure(self) -> None:
         """Configure the application informations"""
-        QtCore.QCoreApplication.setApplicationName("Snat")
-        QtCore.QCoreApplication.setOrganizationName("Theo Guerin")
-        QtCore.QCoreApplication.setApplicationVersion(__version__)
+        configure_application()
 
     def restore(self) -> None:
         """Restore the application state"""
@@ -91,10 +395,65 @@ class App(QtWidgets.QMainWindow):
             self.resize(stored_size)
 
     def init_ui(self) -> None:
-        """Set the window icon and create the menu bar"""
+        """Set the window icon, create the tray icon and the menu bar"""
         self.setWindowIcon(QtGui.QIcon("asset:icon.ico"))
+        self.tray_icon = self.create_tray_icon()
         self.init_menu_bar()
 
+    def create_tray_icon(self) -> QtWidgets.QSystemTrayIcon | None:
+        """Create the tray icon and its menu
+
+        Returns:
+            PyQt6.QtWidgets.QSystemTrayIcon | None: Tray icon, None if the system has no tray
+        """
+        if not QtWidgets.QSystemTrayIcon.isSystemTrayAvailable():
+            return None
+
+        tray_icon = QtWidgets.QSystemTrayIcon(self.windowIcon(), self)
+        tray_icon.setToolTip("Snat")
+        menu = QtWidgets.QMenu(self)
+        menu.addAction("&Show", self.activate)
+        menu.addAction("&Exit", QtWidgets.QApplication.quit)
+        tray_icon.setContextMenu(menu)
+        tray_icon.activated.connect(self.on_tray_activated)
+        tray_icon.show()
+        return tray_icon
+
+    def notify_unlocks(self, app_id: int, names: list[str]) -> None:
+        """Show a desktop notification for new unlocks, unless the game left the game list meanwhile
+
+        Args:
+            app_id (int): app_id of the game
+            names (list[str]): API names of the unlocked achievements
+        """
+        game = self.dashboard.game_list.get(app_id)
+        if self.tray_icon is None or game is None:
+            return
+        achievements = ", ".join(game.schema[name].name for name in names if name in game.schema)
+        self.tray_icon.showMessage(f"Achievement unlocked in {game.name}", achievements,
+                                   QtWidgets.QSystemTrayIcon.MessageIcon.Information)
+
+    def on_tray_activated(self, reason: QtWidgets.QSystemTrayIcon.ActivationReason) -> None:
+        """Show the window when the tray icon is clicked"""
+        if reason == QtWidgets.QSystemTrayIcon.ActivationReason.Trigger:
+            self.activate()
+
+    def activate(self) -> None:
+        """Show the window and bring it to the front"""
+        self.showNormal()
+        self.raise_()
+        self.activateWindow()
+
+    def init_status_bar(self) -> None:
+        """Create the status bar and display the dashboard status"""
+        status_bar = self.statusBar()
+        if status_bar is None:
+            raise RuntimeError("No status bar")
+
+        self.status_label = QtWidgets.QLabel(self.dashboard.status_message(), status_bar)
+        status_bar.addPermanentWidget(self.status_label)
+        self.dashboard.status_changed.connect(self.status_label.setText)
+
     def init_menu_bar(self) -> None:
         """Create the menu bar and its menus"""
         menu_bar = self.menuBar()
@@ -104,17 +463,98 @@ class App(QtWidgets.QMainWindow):
         file_menu = menu_bar.addMenu("&File")
         if file_menu is None:
             raise RuntimeError("No file menu")
-        file_menu.addAction("&Exit", "Ctrl+Q", self.close)
+        close_to_tray = file_menu.addAction("Close to &tray")
+        if close_to_tray is None:
+            raise RuntimeError("No close to tray action")
+        close_to_tray.setCheckable(True)
+        close_to_tray.setChecked(self.settings.typedValue("close_to_tray", bool, False))
+        close_to_tray.setEnabled(self.tray_icon is not None)
+        close_to_tray.toggled.connect(lambda checked: self.settings.setValue("close_to_tray", checked))
+        file_menu.addAction("&Forget games without achievements", self.forget_no_achievements)
+        file_menu.addAction("&Exit", "Ctrl+Q", QtWidgets.QApplication.quit)
+
+        self.profile_menu = menu_bar.addMenu("&Profile")
+        if self.profile_menu is None:
+            raise RuntimeError("No profile menu")
+        self.update_profile_menu()
+
+        view_menu = menu_bar.addMenu("&View")
+        if view_menu is None:
+            raise RuntimeError("No view menu")
+        view_menu.addAction("&History", self.open_history)
+        watch = view_menu.addAction("&Watch current game")
+        if watch is None:
+            raise RuntimeError("No watch action")
+        watch.setCheckable(True)
+        watch.setChecked(self.settings.typedValue("watch_current_game", bool, False))
+        watch.toggled.connect(lambda checked: self.dashboard.set_watching(checked))
 
         help_menu = menu_bar.addMenu("&Help")
         if help_menu is None:
             raise RuntimeError("No help menu")
+        help_menu.addAction("&Diagnostics", self.open_diagnostics)
         help_menu.addAction("&About", self.open_about)
 
+    def update_profile_menu(self) -> None:
+        """Fill the profile menu with one action per profile, the first nine have a shortcut"""
+        if self.profile_menu is None:
+            return
+        self.profile_menu.clear()
+        group = QtGui.QActionGroup(self.profile_menu)
+        current = self.settings.user_id()
+        for index, user_id in enumerate(self.settings.profiles()):
+            action = self.profile_menu.addAction(user_id)
+            if action is None:
+                raise RuntimeError("No profile action")
+            action.setCheckable(True)
+            action.setChecked(user_id == current)
+            if index < 9:
+                action.setShortcut(f"Ctrl+{index + 1}")
+            action.triggered.connect(lambda checked, user_id=user_id: self.switch_profile(user_id))
+            group.addAction(action)
+        self.profile_menu.addSeparator()
+        self.profile_menu.addAction("&Add profile...", self.add_profile)
+
+    def switch_profile(self, user_id: str) -> None:
+        """Switch to another profile
+
+        Args:
+            user_id (str): Steam user ID of the profile
+        """
+        self.dashboard.switch_profile(user_id)
+        QtCore.QTimer.singleShot(0, self.update_profile_menu)
+
+    def add_profile(self) -> None:
+        """Prompt for a Steam ID and switch to its new profile"""
+        dialog = self.settings.steam_user_id_dialog_factory(self.steam_api)
+        if dialog.exec() == QtWidgets.QDialog.DialogCode.Accepted:
+            self.switch_profile(dialog.input.text())
+
+    def forget_no_achievements(self) -> None:
+        """Check again the games without achievements, the emptied cache is saved even if the refresh fails"""
+        self.dashboard.game_list_bar.forget_no_achievements()
+        save_cache("no_achievements_cache", self.dashboard.no_achievements)
+
+    def open_history(self) -> None:
+        from .history_dialog import HistoryDialog
+        HistoryDialog(self, self.dashboard.history, self.dashboard.game_list).exec()
+
+    def open_diagnostics(self) -> None:
+        from .diagnostics_dialog import DiagnosticsDialog
+        DiagnosticsDialog(self, self.dashboard.cache_stats).exec()
+
     def open_about(self) -> None:
         from .about import AboutDialog
         AboutDialog(self).exec()
 
+    def closeEvent(self, event: QtGui.QCloseEvent | None) -> None:
+        """Override the close event to hide the window in the tray if enabled"""
+        if event is not None and self.tray_icon is not None and self.settings.typedValue("close_to_tray", bool, False):
+            event.ignore()
+            self.hide()
+            return
+        super().closeEvent(event)
+
     def moveEvent(self, event: QtGui.QMoveEvent | None) -> None:
         """Override the move event to save the position"""
         super().moveEvent(event)
@@ -0,0 +1,119 @@
+import logging
+import pickle
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, TypeVar
+
+from PyQt6 import QtCore
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+def cache_dir() -> Path:
+    """Return the cache directory of the application, create it if needed.
+
+    Returns:
+        Path: Cache directory
+    """
+    location = QtCore.QStandardPaths.writableLocation(QtCore.QStandardPaths.StandardLocation.CacheLocation)
+    path = Path(location)
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def load_cache(name: str, default: T) -> T:
+    """Load a cache file.
+
+    Caches are kept out of the settings file because QSettings parses the whole file when opened.
+
+    Args:
+        name (str): Cache name
+        default (T): Value returned if the cache does not exist or is corrupted
+
+    Returns:
+        T: Cached value or default value
+    """
+    path = cache_dir() / f"{name}.pickle"
+    try:
+        with path.open("rb") as file:
+            return pickle.load(file)  # type: ignore[no-any-return]
+    except FileNotFoundError:
+        return default
+    except Exception:
+        logger.exception("Failed to load cache %s", name)
+        return default
+
+
+def save_cache(name: str, value: Any) -> None:
+    """Save a cache file atomically.
+
+    Args:
+        name (str): Cache name
+        value (Any): Value to cache
+    """
+    file = QtCore.QSaveFile(str(cache_dir() / f"{name}.pickle"))
+    if not file.open(QtCore.QIODevice.OpenModeFlag.WriteOnly):
+        logger.error("Failed to open cache %s: %s", name, file.errorString())
+        return
+    file.write(pickle.dumps(value, pickle.HIGHEST_PROTOCOL))
+    if not file.commit():
+        logger.error("Failed to save cache %s: %s", name, file.errorString())
+
+
+def remove_cache(name: str) -> None:
+    """Remove a cache file if it exists.
+
+    Args:
+        name (str): Cache name
+    """
+    (cache_dir() / f"{name}.pickle").unlink(missing_ok=True)
+
+
+def profile_cache(name: str, user_id: str) -> str:
+    """Return the name of a cache specific to a profile.
+
+    Args:
+        name (str): Cache name
+        user_id (str): Steam user ID of the profile
+
+    Returns:
+        str: Profile cache name
+    """
+    return f"{name}_{user_id}"
+
+
+@dataclass
+class CacheStats:
+    """Usage counters of a cache, displayed in the diagnostics dialog.
+
+    Fields:
+        name (str): Displayed name
+        budget (int | None): Budget in bytes, None if the cache has no budget
+        usage (int | None): Estimated size in bytes, None if unknown
+        counted (bool): Whether the lookups and evictions are counted
+        evictions_counted (bool): Whether the evictions are counted, when the lookups are
+        hits (int): Lookups answered by the cache
+        misses (int): Lookups that had to load the value
+        evictions (int): Entries evicted to respect the budget
+    """
+
+    name: str
+    budget: int | None = None
+    usage: int | None = None
+    counted: bool = True
+    evictions_counted: bool = True
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+
+    def hit_rate(self) -> float | None:
+        """Return the ratio of lookups answered by the cache.
+
+        Returns:
+            float | None: Hit rate, None if there was no counted lookup
+        """
+        if not self.counted or self.hits + self.misses == 0:
+            return None
+        return self.hits / (self.hits + self.misses)
@@ -0,0 +1,489 @@
+import hashlib
+import json
+import logging
+import struct
+import zlib
+from collections import Counter
+from enum import IntEnum
+from pathlib import Path
+from typing import Any, BinaryIO, Callable, Iterator
+
+from PyQt6 import QtCore, QtNetwork
+
+from .cache import load_cache, save_cache
+from .game_list import Achievement, Game, NoAchievementsCache, SchemaCache
+from .rarity import GameRarity, RarityCache
+from .schema_details import details_dir, details_path, load_details
+from .settings import Settings
+from .steam_api import BudgetDiskCache
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"SNATCACHE"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<9sH")
+RECORD_HEADER = struct.Struct("<BI")
+UINT32 = struct.Struct("<I")
+DIGEST_SIZE = hashlib.sha256().digest_size
+CHUNK_SIZE = 64 * 1024
+
+
+class RecordKind(IntEnum):
+    """Kind of an archive record, the value is stored in the record header"""
+
+    SCHEMA = 1
+    NO_ACHIEVEMENTS = 2
+    RARITY = 3
+    DETAILS = 4
+    ICON = 5
+
+
+RECORD_LABELS = {
+    RecordKind.SCHEMA: "game schemas",
+    RecordKind.NO_ACHIEVEMENTS: "games without achievements",
+    RecordKind.RARITY: "game rarities",
+    RecordKind.DETAILS: "schema details",
+    RecordKind.ICON: "icons",
+}
+
+
+def encode(value: Any) -> bytes:
+    """Encode a record payload as compact JSON
+
+    Args:
+        value (Any): Payload
+
+    Returns:
+        bytes: Encoded payload
+    """
+    return json.dumps(value, separators=(",", ":")).encode()
+
+
+def describe(counts: Counter[RecordKind]) -> str:
+    """Describe the number of records of each kind
+
+    Args:
+        counts (Counter[RecordKind]): Number of records by kind
+
+    Returns:
+        str: Description, e.g. "120 game schemas, 0 games without achievements, ..."
+    """
+    return ", ".join(f"{counts[kind]} {label}" for kind, label in RECORD_LABELS.items())
+
+
+class ArchiveWriter:
+    """Write records to an archive
+
+    The archive is the header (magic and format version), the records compressed as one zlib stream,
+    then the SHA-256 digest of everything before it. Each record is its kind, its length and its payload.
+
+    Attributes:
+        file (BinaryIO): Archive file
+        compressor (zlib._Compress): Compressor of the records stream
+        digest (hashlib._Hash): Digest of the bytes written
+        counts (Counter[RecordKind]): Number of records written by kind
+
+    Args:
+        file (BinaryIO): Archive file, opened for writing
+    """
+
+    def __init__(self, file: BinaryIO) -> None:
+        self.file = file
+        self.compressor = zlib.compressobj(9)
+        self.digest = hashlib.sha256()
+        self.counts: Counter[RecordKind] = Counter()
+        self.write(HEADER.pack(MAGIC, FORMAT_VERSION))
+
+    def write(self, data: bytes) -> None:
+        """Write bytes covered by the digest
+
+        Args:
+            data (bytes): Bytes to write
+        """
+        self.digest.update(data)
+        self.file.write(data)
+
+    def add(self, kind: RecordKind, payload: bytes) -> None:
+        """Compress and write a record
+
+        Args:
+            kind (RecordKind): Record kind
+            payload (bytes): Record payload
+        """
+        self.write(self.compressor.compress(RECORD_HEADER.pack(kind, len(payload))))
+        self.write(self.compressor.compress(payload))
+        self.counts[kind] += 1
+
+    def close(self) -> None:
+        """Flush the compressed stream and write the digest"""
+        self.write(self.compressor.flush())
+        self.file.write(self.digest.digest())
+
+
+def icon_payload(disk_cache: QtNetwork.QNetworkDiskCache, url: str) -> bytes | None:
+    """Encode a cached icon response with the metadata needed to insert it in another HTTP cache
+
+    Args:
+        disk_cache (PyQt6.QtNetwork.QNetworkDiskCache): HTTP disk cache
+        url (str): URL of the icon
+
+    Returns:
+        bytes | None: Metadata length, JSON metadata and icon data, None if the icon is not cached
+    """
+    meta_data = disk_cache.metaData(QtCore.QUrl(url))
+    if not meta_data.isValid():
+        return None
+    device = disk_cache.data(QtCore.QUrl(url))
+    if device is None:
+        return None
+    data = device.readAll().data()
+    device.close()
+
+    attributes = meta_data.attributes()
+    meta = {
+        "url": url,
+        "headers": [[name.data().decode("latin-1"), value.data().decode("latin-1")]
+                    for name, value in meta_data.rawHeaders()],
+        "last_modified": (meta_data.lastModified().toMSecsSinceEpoch()
+                          if meta_data.lastModified().isValid() else None),
+        "expiration": (meta_data.expirationDate().toMSecsSinceEpoch()
+                       if meta_data.expirationDate().isValid() else None),
+        "status": attributes.get(QtNetwork.QNetworkRequest.Attribute.HttpStatusCodeAttribute),
+        "reason": attributes.get(QtNetwork.QNetworkRequest.Attribute.HttpReasonPhraseAttribute),
+    }
+    encoded = encode(meta)
+    return UINT32.pack(len(encoded)) + encoded + data
+
+
+def export_archive(path: Path) -> Counter[RecordKind]:
+    """Pack the caches shared by all profiles in an archive
+
+    The game schemas, games without achievements, rarities, schema details records and the icons of
+    the HTTP disk cache are exported, profile caches are not. The archive is written next to its path then renamed.
+
+    Args:
+        path (Path): Archive path
+
+    Returns:
+        Counter[RecordKind]: Number of records written by kind
+    """
+    schemas: SchemaCache = load_cache("schema_cache", {})
+    no_achievements: NoAchievementsCache = load_cache("no_achievements_cache", {})
+    rarity: RarityCache = load_cache("rarity_cache", {})
+    disk_cache = BudgetDiskCache(None, Settings().cache_budget("disk"))
+    icon_urls: dict[str, None] = {}
+
+    part = path.with_name(f"{path.name}.part")
+    try:
+        with part.open("wb") as file:
+            writer = ArchiveWriter(file)
+            for app_id, game in schemas.items():
+                schema = [[name, achievement.name, achievement.icon] for name, achievement in game.schema.items()]
+                writer.add(RecordKind.SCHEMA, encode([app_id, game.name, schema]))
+                icon_urls.update(dict.fromkeys(achievement.icon for achievement in game.schema.values()))
+            for app_id, timestamp in no_achievements.items():
+                writer.add(RecordKind.NO_ACHIEVEMENTS, encode([app_id, timestamp]))
+            for app_id, game_rarity in rarity.items():
+                writer.add(RecordKind.RARITY, encode([app_id, game_rarity.timestamp, game_rarity.percents]))
+            for record in sorted(details_dir().glob("*.json.z")):
+                app_id = int(record.name.removesuffix(".json.z"))
+                writer.add(RecordKind.DETAILS, UINT32.pack(app_id) + record.read_bytes())
+                game_details = load_details(app_id) or {}
+                icon_urls.update(dict.fromkeys(achievement.icon_gray for achievement in game_details.values()
+                                               if achievement.icon_gray))
+            for url in icon_urls:
+                payload = icon_payload(disk_cache, url)
+                if payload is not None:
+                    writer.add(RecordKind.ICON, payload)
+            writer.close()
+        part.replace(path)
+    except BaseException:
+        part.unlink(missing_ok=True)
+        raise
+    return writer.counts
+
+
+def read_chunks(file: BinaryIO, size: int) -> Iterator[bytes]:
+    """Read a file region in chunks
+
+    Args:
+        file (BinaryIO): File, positioned at the start of the region
+        size (int): Size of the region
+
+    Raises:
+        ValueError: If the file ends before the region
+
+    Yields:
+        bytes: Chunks of at most CHUNK_SIZE bytes
+    """
+    while size > 0:
+        chunk = file.read(min(CHUNK_SIZE, size))
+        if not chunk:
+            raise ValueError("Truncated archive")
+        size -= len(chunk)
+        yield chunk
+
+
+def read_header(file: BinaryIO) -> bytes:
+    """Read and check the header of an archive
+
+    Args:
+        file (BinaryIO): Archive file, positioned at its start
+
+    Raises:
+        ValueError: If the file is not an archive or its version is not supported
+
+    Returns:
+        bytes: Header
+    """
+    header = file.read(HEADER.size)
+    if len(header) < HEADER.size or not header.startswith(MAGIC):
+        raise ValueError("Not a Snat cache archive")
+    _, version = HEADER.unpack(header)
+    if version > FORMAT_VERSION:
+        raise ValueError(f"Archive format {version} is not supported, update Snat to import it")
+    return header
+
+
+def verify_archive(path: Path) -> None:
+    """Check the header and the digest of an archive, reading it in chunks
+
+    Args:
+        path (Path): Archive path
+
+    Raises:
+        ValueError: If the file is not an archive, its version is not supported, or it is truncated or corrupted
+    """
+    size = path.stat().st_size
+    with path.open("rb") as file:
+        digest = hashlib.sha256(read_header(file))
+        if size < HEADER.size + DIGEST_SIZE:
+            raise ValueError("Truncated archive")
+        for chunk in read_chunks(file, size - HEADER.size - DIGEST_SIZE):
+            digest.update(chunk)
+        if file.read(DIGEST_SIZE) != digest.digest():
+            raise ValueError("Checksum mismatch, the archive is corrupted")
+
+
+def pop_records(buffer: bytearray) -> Iterator[tuple[int, bytes]]:
+    """Extract the complete records at the start of a buffer, the incomplete record is left in it
+
+    Args:
+        buffer (bytearray): Decompressed bytes
+
+    Yields:
+        tuple[int, bytes]: Record kind and payload
+    """
+    offset = 0
+    while len(buffer) - offset >= RECORD_HEADER.size:
+        kind, length = RECORD_HEADER.unpack_from(buffer, offset)
+        start = offset + RECORD_HEADER.size
+        if len(buffer) - start < length:
+            break
+        yield kind, bytes(buffer[start:start + length])
+        offset = start + length
+    del buffer[:offset]
+
+
+def read_records(path: Path) -> Iterator[tuple[int, bytes]]:
+    """Decompress the records of an archive as they are read
+
+    Args:
+        path (Path): Archive path, its digest should be verified first
+
+    Raises:
+        ValueError: If the file is not an archive, its version is not supported or a record is truncated
+
+    Yields:
+        tuple[int, bytes]: Record kind and payload
+    """
+    size = path.stat().st_size
+    with path.open("rb") as file:
+        read_header(file)
+        decompressor = zlib.decompressobj()
+        buffer = bytearray()
+        try:
+            for chunk in read_chunks(file, size - HEADER.size - DIGEST_SIZE):
+                buffer += decompressor.decompress(chunk)
+                yield from pop_records(buffer)
+            buffer += decompressor.flush()
+        except zlib.error as error:
+            raise ValueError(f"Corrupted archive: {error}") from error
+        yield from pop_records(buffer)
+        if buffer or not decompressor.eof:
+            raise ValueError("Truncated archive")
+
+
+class CacheMerger:
+    """Merge archive records into the caches shared by all profiles
+
+    Local entries are kept, except timestamped entries older than the archived ones.
+    Schema details records and icons are written as they are read, the pickled caches are saved at the end.
+
+    Attributes:
+        schemas (snat.game_list.SchemaCache): Game schemas cache
+        no_achievements (snat.game_list.NoAchievementsCache): Games without achievements cache
+        rarity (snat.rarity.RarityCache): Rarity cache
+        disk_cache (snat.steam_api.BudgetDiskCache): HTTP disk cache receiving the icons
+        counts (Counter[RecordKind]): Number of merged records by kind
+    """
+
+    def __init__(self) -> None:
+        self.schemas: SchemaCache = load_cache("schema_cache", {})
+        self.no_achievements: NoAchievementsCache = load_cache("no_achievements_cache", {})
+        self.rarity: RarityCache = load_cache("rarity_cache", {})
+        self.disk_cache = BudgetDiskCache(None, Settings().cache_budget("disk"))
+        self.counts: Counter[RecordKind] = Counter()
+
+    def merge(self, kind: int, payload: bytes) -> None:
+        """Merge a record, records of an unknown kind are skipped
+
+        Args:
+            kind (int): Record kind
+            payload (bytes): Record payload
+        """
+        handlers: dict[int, Callable[[bytes], bool]] = {
+            RecordKind.SCHEMA: self.merge_schema,
+            RecordKind.NO_ACHIEVEMENTS: self.merge_no_achievements,
+            RecordKind.RARITY: self.merge_rarity,
+            RecordKind.DETAILS: self.merge_details,
+            RecordKind.ICON: self.merge_icon,
+        }
+        handler = handlers.get(kind)
+        if handler is None:
+            logger.warning("Skip record of unknown kind %d", kind)
+            return
+        if handler(payload):
+            self.counts[RecordKind(kind)] += 1
+
+    def merge_schema(self, payload: bytes) -> bool:
+        """Add a game schema unless the game is already cached or known without achievements
+
+        Args:
+            payload (bytes): app_id, game name and achievements (API name, name, icon URL)
+
+        Returns:
+            bool: Whether the schema was added
+        """
+        app_id, name, schema = json.loads(payload)
+        if app_id in self.schemas or app_id in self.no_achievements:
+            return False
+        self.schemas[app_id] = Game(name, {apiname: Achievement(title, icon) for apiname, title, icon in schema})
+        return True
+
+    def merge_no_achievements(self, payload: bytes) -> bool:
+        """Add a game without achievements unless its schema is cached, or refresh its timestamp
+
+        Args:
+            payload (bytes): app_id and time at which the game was found without achievements
+
+        Returns:
+            bool: Whether the entry was added or refreshed
+        """
+        app_id, timestamp = json.loads(payload)
+        if app_id in self.schemas or self.no_achievements.get(app_id, 0) >= timestamp:
+            return False
+        self.no_achievements[app_id] = timestamp
+        return True
+
+    def merge_rarity(self, payload: bytes) -> bool:
+        """Add the rarity of a game unless a more recent one is cached
+
+        Args:
+            payload (bytes): app_id, time of the download and unlock percentage by API name
+
+        Returns:
+            bool: Whether the rarity was added or replaced
+        """
+        app_id, timestamp, percents = json.loads(payload)
+        cached = self.rarity.get(app_id)
+        if cached is not None and cached.timestamp >= timestamp:
+            return False
+        self.rarity[app_id] = GameRarity(percents, timestamp)
+        return True
+
+    def merge_details(self, payload: bytes) -> bool:
+        """Write a schema details record unless the game has one
+
+        Args:
+            payload (bytes): app_id and compressed record
+
+        Returns:
+            bool: Whether the record was written
+        """
+        (app_id,) = UINT32.unpack_from(payload)
+        path = details_path(app_id)
+        if path.exists():
+            return False
+        file = QtCore.QSaveFile(str(path))
+        if not file.open(QtCore.QIODevice.OpenModeFlag.WriteOnly):
+            logger.error("Failed to open schema details of app_id %d: %s", app_id, file.errorString())
+            return False
+        file.write(payload[UINT32.size:])
+        return file.commit()
+
+    def merge_icon(self, payload: bytes) -> bool:
+        """Insert an icon response in the HTTP disk cache unless it is cached
+
+        Args:
+            payload (bytes): Metadata length, JSON metadata and icon data
+
+        Returns:
+            bool: Whether the icon was inserted
+        """
+        (length,) = UINT32.unpack_from(payload)
+        meta = json.loads(payload[UINT32.size:UINT32.size + length])
+        url = QtCore.QUrl(meta["url"])
+        if self.disk_cache.metaData(url).isValid():
+            return False
+
+        meta_data = QtNetwork.QNetworkCacheMetaData()
+        meta_data.setUrl(url)
+        meta_data.setRawHeaders([(name.encode("latin-1"), value.encode("latin-1")) for name, value in meta["headers"]])
+        if meta["last_modified"] is not None:
+            meta_data.setLastModified(QtCore.QDateTime.fromMSecsSinceEpoch(meta["last_modified"]))
+        if meta["expiration"] is not None:
+            meta_data.setExpirationDate(QtCore.QDateTime.fromMSecsSinceEpoch(meta["expiration"]))
+        attributes = {}
+        if meta["status"] is not None:
+            attributes[QtNetwork.QNetworkRequest.Attribute.HttpStatusCodeAttribute] = meta["status"]
+        if meta["reason"] is not None:
+            attributes[QtNetwork.QNetworkRequest.Attribute.HttpReasonPhraseAttribute] = meta["reason"]
+        meta_data.setAttributes(attributes)
+        meta_data.setSaveToDisk(True)
+
+        device = self.disk_cache.prepare(meta_data)
+        if device is None:
+            return False
+        device.write(payload[UINT32.size + length:])
+        self.disk_cache.insert(device)
+        return True
+
+    def save(self) -> None:
+        """Save the merged pickled caches"""
+        save_cache("schema_cache", self.schemas)
+        save_cache("no_achievements_cache", self.no_achievements)
+        save_cache("rarity_cache", self.rarity)
+
+
+def import_archive(path: Path) -> Counter[RecordKind]:
+    """Merge an archive into the caches shared by all profiles
+
+    The digest is verified in a first pass, then the records are merged as they are decompressed,
+    so the archive is never loaded in memory.
+
+    Args:
+        path (Path): Archive path
+
+    Raises:
+        ValueError: If the archive is invalid, nothing is merged
+
+    Returns:
+        Counter[RecordKind]: Number of merged records by kind
+    """
+    verify_archive(path)
+    merger = CacheMerger()
+    for kind, payload in read_records(path):
+        merger.merge(kind, payload)
+    merger.save()
+    return merger.counts
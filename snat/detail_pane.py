@@ -0,0 +1,228 @@
+import logging
+from typing import Any
+
+from PyQt6 import QtCore, QtGui, QtNetwork, QtWidgets
+
+from .achievement_list import AchievementWidget
+from .game_list import GameList, GameListBar
+from .schema_details import GameDetails, load_details, parse_details, save_details
+from .steam_api import SteamApi
+
+logger = logging.getLogger(__name__)
+
+
+class DetailPane(QtWidgets.QFrame):
+    """A pane that displays the details of the selected achievement
+
+    The details are decompressed from the schema details record of the selected game only,
+    they are evicted when a row of another game is selected or the selection is cleared.
+    A missing record is downloaded when online.
+
+    Constants:
+        ICON_SIZE (int): Size of the displayed icon
+        LOADING_MESSAGE (str): Message that is displayed while the schema is downloaded
+        UNAVAILABLE_MESSAGE (str): Message that is displayed when the record is missing and cannot be downloaded
+        HIDDEN_MESSAGE (str): Message that is displayed for a hidden achievement without description
+
+    Attributes:
+        steam_api (snat.steam_api.SteamApi): SteamApi instance
+        game_list (snat.game_list.GameList): GameList instance
+        item (snat.achievement_list.AchievementWidget | None): Displayed row
+        app_id (int | None): app_id of the game whose details are loaded
+        details (snat.schema_details.GameDetails | None): Details of the loaded game, None if not loaded
+        pending (set[int]): app_ids of the schema requests not answered yet
+        icon_url (str): URL of the displayed icon
+
+    Args:
+        parent (PyQt6.QtWidgets.QWidget): Parent widget
+        steam_api (snat.steam_api.SteamApi): SteamApi instance
+        game_list (snat.game_list.GameList): GameList instance
+    """
+
+    ICON_SIZE = 64
+    LOADING_MESSAGE = "Loading the achievement details..."
+    UNAVAILABLE_MESSAGE = "The details of this achievement are not available"
+    HIDDEN_MESSAGE = "Hidden achievement, its description is revealed when it is unlocked"
+
+    def __init__(self, parent: QtWidgets.QWidget, steam_api: SteamApi, game_list: GameList) -> None:
+        super().__init__(parent)
+        self.steam_api = steam_api
+        self.game_list = game_list
+        self.item: AchievementWidget | None = None
+        self.app_id: int | None = None
+        self.details: GameDetails | None = None
+        self.pending: set[int] = set()
+        self.icon_url = ""
+        self.init_ui()
+        self.hide()
+
+    def init_ui(self) -> None:
+        """Create widgets and set the layout."""
+        self.setFrameShape(QtWidgets.QFrame.Shape.StyledPanel)
+        layout = QtWidgets.QHBoxLayout(self)
+        self.setLayout(layout)
+
+        self.icon_label = QtWidgets.QLabel(self)
+        self.icon_label.setFixedSize(self.ICON_SIZE, self.ICON_SIZE)
+        layout.addWidget(self.icon_label, alignment=QtCore.Qt.AlignmentFlag.AlignTop)
+
+        text_layout = QtWidgets.QVBoxLayout()
+        layout.addLayout(text_layout, 1)
+
+        self.name_label = QtWidgets.QLabel(self)
+        font = self.name_label.font()
+        font.setBold(True)
+        self.name_label.setFont(font)
+        text_layout.addWidget(self.name_label)
+
+        self.description_label = QtWidgets.QLabel(self)
+        self.description_label.setWordWrap(True)
+        text_layout.addWidget(self.description_label)
+
+        self.state_label = QtWidgets.QLabel(self)
+        text_layout.addWidget(self.state_label)
+        text_layout.addStretch()
+
+    def show_item(self, item: QtWidgets.QListWidgetItem | None) -> None:
+        """Display the details of a row, load the details of its game if another game is loaded
+
+        Args:
+            item (PyQt6.QtWidgets.QListWidgetItem | None): Selected row, messages and None clear the pane
+        """
+        if not isinstance(item, AchievementWidget) or item.app_id not in self.game_list:
+            self.clear()
+            return
+
+        self.item = item
+        if item.app_id != self.app_id:
+            self.load_game(item.app_id)
+        self.update_details()
+        self.show()
+
+    def clear(self) -> None:
+        """Hide the pane and evict the loaded details, the pending requests are kept so they are not sent again"""
+        self.item = None
+        self.app_id = None
+        self.details = None
+        self.icon_url = ""
+        self.hide()
+
+    def reset(self) -> None:
+        """Clear the pane and forget the pending requests, before switching to another profile
+
+        The requests of the previous profile are never answered.
+        """
+        self.clear()
+        self.pending.clear()
+
+    def load_game(self, app_id: int) -> None:
+        """Decompress the details of a game, evicting those of the previous game, or download its schema
+
+        Args:
+            app_id (int): app_id of the game
+        """
+        self.app_id = app_id
+        self.details = load_details(app_id)
+        if self.details is None and app_id not in self.pending and self.steam_api.is_online():
+            self.pending.add(app_id)
+            self.steam_api.get_game_schemas([app_id], self.handle_schema_response, self.handle_schema_error)
+
+    def update_details(self) -> None:
+        """Display the name, description, state and icon of the displayed row"""
+        if self.item is None:
+            return
+
+        game = self.game_list[self.item.app_id]
+        achievement = game.schema.get(self.item.apiname)
+        self.name_label.setText(self.item.apiname if achievement is None else achievement.name)
+        state = "Unlocked" if self.item.unlocked else "Locked"
+        details = None if self.details is None else self.details.get(self.item.apiname)
+        if details is None:
+            loading = self.item.app_id in self.pending
+            self.description_label.setText(self.LOADING_MESSAGE if loading else self.UNAVAILABLE_MESSAGE)
+            self.state_label.setText(f"{game.name} - {state}")
+            self.load_icon(self.item.icon_url)
+            return
+
+        if details.description:
+            self.description_label.setText(details.description)
+        else:
+            self.description_label.setText(self.HIDDEN_MESSAGE if details.hidden else "")
+        self.state_label.setText(f"{game.name} - {state}" + (" - Hidden" if details.hidden else ""))
+        unlocked = self.item.unlocked or not details.icon_gray
+        self.load_icon(self.item.icon_url if unlocked else details.icon_gray)
+
+    def load_icon(self, url: str) -> None:
+        """Download and display an icon, the HTTP cache answers the icons already displayed by the list
+
+        Args:
+            url (str): URL of the icon
+        """
+        if url == self.icon_url:
+            return
+        self.icon_url = url
+        self.icon_label.clear()
+        if url:
+            self.steam_api.make_get_request(url, self.handle_icon_response, self.handle_icon_error, True, url)
+
+    def handle_icon_response(self, data: bytes, url: str) -> None:
+        """Display the downloaded icon if it is still the icon of the displayed row
+
+        Args:
+            data (bytes): Encoded icon
+            url (str): URL of the icon
+        """
+        if url != self.icon_url:
+            return
+        pixmap = QtGui.QPixmap()
+        if not pixmap.loadFromData(data):
+            logger.warning("Failed to decode icon %s", url)
+            return
+        ratio = self.devicePixelRatioF()
+        pixmap = pixmap.scaled(int(self.ICON_SIZE * ratio), int(self.ICON_SIZE * ratio),
+                               QtCore.Qt.AspectRatioMode.KeepAspectRatio,
+                               QtCore.Qt.TransformationMode.SmoothTransformation)
+        pixmap.setDevicePixelRatio(ratio)
+        self.icon_label.setPixmap(pixmap)
+
+    def handle_icon_error(self, error: QtNetwork.QNetworkReply.NetworkError, url: str) -> None:
+        """Leave the icon empty, it is requested again when the row is displayed again
+
+        Args:
+            error (QtNetwork.QNetworkReply.NetworkError): Network error
+            url (str): URL of the icon
+        """
+        if url == self.icon_url:
+            self.icon_url = ""
+        logger.warning("Failed to load icon")
+
+    def handle_schema_response(self, data: Any, app_id: int) -> None:
+        """Save the details record of the downloaded schema and display its details if the game is still loaded
+
+        The details are parsed from the response, the record may not be written yet.
+
+        Args:
+            data (Any): JSON data from the Steam API response
+            app_id (int): app_id of the game
+        """
+        self.pending.discard(app_id)
+        details = None
+        if GameListBar.is_game_schema_valid(data):
+            raw_achievements = data["game"]["availableGameStats"]["achievements"]
+            save_details(app_id, raw_achievements, self.game_list)
+            details = parse_details(raw_achievements)
+        if app_id == self.app_id:
+            self.details = details
+            self.update_details()
+
+    def handle_schema_error(self, error: QtNetwork.QNetworkReply.NetworkError, app_id: int) -> None:
+        """Display that the details are unavailable
+
+        Args:
+            error (QtNetwork.QNetworkReply.NetworkError): Network error
+            app_id (int): app_id of the game
+        """
+        self.pending.discard(app_id)
+        logger.warning("Failed to load the schema details of app_id %d", app_id)
+        if app_id == self.app_id:
+            self.update_details()
@@ -0,0 +1,77 @@
+from typing import Callable
+
+from PyQt6 import QtCore, QtGui, QtWidgets
+
+from .cache import CacheStats
+from .utils import format_size
+
+
+class DiagnosticsDialog(QtWidgets.QDialog):
+    """Dialog that displays the usage, budget, hit rate and evictions of each cache.
+
+    Constants:
+        COLUMNS (tuple[str, ...]): Table headers
+
+    Attributes:
+        cache_stats (Callable[[], list[snat.cache.CacheStats]]): Function returning the current usage of the caches
+
+    Args:
+        parent (PyQt6.QtWidgets.QWidget): Parent widget
+        cache_stats (Callable[[], list[snat.cache.CacheStats]]): Function returning the current usage of the caches
+    """
+
+    COLUMNS = ("Cache", "Usage", "Budget", "Hit rate", "Hits", "Misses", "Evictions")
+
+    def __init__(self, parent: QtWidgets.QWidget, cache_stats: Callable[[], list[CacheStats]]) -> None:
+        super().__init__(parent)
+        self.cache_stats = cache_stats
+        self.init_ui()
+        self.refresh()
+
+    def init_ui(self) -> None:
+        """Configure the window, create widgets and set the layout."""
+        self.setWindowTitle("Diagnostics")
+        self.setWindowIcon(QtGui.QIcon("asset:icon.ico"))
+        self.resize(640, 240)
+
+        layout = QtWidgets.QVBoxLayout(self)
+        self.setLayout(layout)
+
+        self.table = QtWidgets.QTableWidget(0, len(self.COLUMNS), self)
+        self.table.setHorizontalHeaderLabels(self.COLUMNS)
+        self.table.setEditTriggers(QtWidgets.QAbstractItemView.EditTrigger.NoEditTriggers)
+        vertical_header = self.table.verticalHeader()
+        if vertical_header is None:
+            raise RuntimeError("No vertical header")
+        vertical_header.hide()
+        layout.addWidget(self.table)
+
+        button_box = QtWidgets.QDialogButtonBox(QtWidgets.QDialogButtonBox.StandardButton.Close, self)
+        refresh = button_box.addButton("&Refresh", QtWidgets.QDialogButtonBox.ButtonRole.ActionRole)
+        if refresh is None:
+            raise RuntimeError("No refresh button")
+        refresh.clicked.connect(self.refresh)
+        button_box.rejected.connect(self.reject)
+        layout.addWidget(button_box)
+
+    def refresh(self) -> None:
+        """Display the current usage of the caches."""
+        stats = self.cache_stats()
+        self.table.setRowCount(len(stats))
+        for row, cache in enumerate(stats):
+            hit_rate = cache.hit_rate()
+            values = (
+                cache.name,
+                "—" if cache.usage is None else format_size(cache.usage),
+                "—" if cache.budget is None else format_size(cache.budget),
+                "—" if hit_rate is None else f"{hit_rate:.0%}",
+                str(cache.hits) if cache.counted else "—",
+                str(cache.misses) if cache.counted else "—",
+                str(cache.evictions) if cache.counted and cache.evictions_counted else "—",
+            )
+            for column, value in enumerate(values):
+                item = QtWidgets.QTableWidgetItem(value)
+                if column > 0:
+                    item.setTextAlignment(QtCore.Qt.AlignmentFlag.AlignRight | QtCore.Qt.AlignmentFlag.AlignVCenter)
+                self.table.setItem(row, column, item)
+        self.table.resizeColumnsToContents()
@@ -0,0 +1,356 @@
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from functools import partial
+from typing import Any, Callable
+
+from PyQt6 import QtCore, QtNetwork
+
+from .game_list import GameList
+from .steam_api import SteamApi
+
+logger = logging.getLogger(__name__)
+
+FRIENDS_TTL = 24 * 60 * 60
+PRIVATE_ERRORS = (
+    QtNetwork.QNetworkReply.NetworkError.AuthenticationRequiredError,
+    QtNetwork.QNetworkReply.NetworkError.ContentAccessDenied,
+)
+
+
+@dataclass
+class Friend:
+    """Dataclass representing the cached achievements of a friend
+
+    Fields:
+        name (str): Persona name
+        progress (dict[int, int]): Number of unlocked achievements by app_id, for the games of the user library
+        locked (dict[int, list[str]]): API names of the locked achievements by app_id, for the compared games only
+        timestamp (float): Time of the last complete progress download, 0 if never downloaded
+        private (bool): Whether the friend achievements are not visible
+    """
+
+    name: str
+    progress: dict[int, int] = field(default_factory=dict)
+    locked: dict[int, list[str]] = field(default_factory=dict)
+    timestamp: float = 0.0
+    private: bool = False
+
+    def is_expired(self) -> bool:
+        """Check if the progress should be downloaded again
+
+        Returns:
+            bool: True if older than FRIENDS_TTL
+        """
+        return time.time() - self.timestamp > FRIENDS_TTL
+
+
+FriendCache = dict[str, Friend]
+
+
+def compare_game(names: list[str], my_locked: list[str], friend_locked: list[str]) -> list[tuple[str, bool, bool]]:
+    """Join the locked achievements of the user and a friend for one game
+
+    Args:
+        names (list[str]): Achievement API names, in display order
+        my_locked (list[str]): API names locked by the user
+        friend_locked (list[str]): API names locked by the friend
+
+    Returns:
+        list[tuple[str, bool, bool]]: API name, unlocked by the user and unlocked by the friend,
+            for the achievements locked by at least one of them, those only the friend unlocked first
+    """
+    mine = set(my_locked)
+    theirs = set(friend_locked)
+    rows = [(name, name not in mine, name not in theirs) for name in names if name in mine or name in theirs]
+    rows.sort(key=lambda row: row[1] or not row[2])
+    return rows
+
+
+def compare_library(game_list: GameList, friend: Friend) -> list[tuple[int, int, int]]:
+    """Join the achievements progress of the user and a friend for the games of the user library
+
+    Args:
+        game_list (snat.game_list.GameList): Game list of the user
+        friend (Friend): Friend
+
+    Returns:
+        list[tuple[int, int, int]]: app_id, unlocked by the user and unlocked by the friend,
+            for the games with both progress known, the largest friend lead first
+    """
+    rows = [
+        (app_id, game.unlocked, friend.progress[app_id])
+        for app_id, game in game_list.items()
+        if game.unlocked is not None and app_id in friend.progress
+    ]
+    rows.sort(key=lambda row: row[1] - row[2])
+    return rows
+
+
+class FriendLoader(QtCore.QObject):
+    """Load the friend list and the friends achievements with a bounded number of requests in flight
+
+    Requests are queued and at most MAX_IN_FLIGHT are sent at once, so comparing with many friends never floods
+    the connection pool. The library progress of a friend is batched like the user one (100 games per request),
+    the achievements of a friend are only requested for the compared game and reused while its progress matches.
+
+    Signals:
+        friends_loaded (): Emitted when the friend list is updated
+        progress_received (str): Emitted with the Steam ID of a friend when a chunk of its progress is answered
+        achievements_received (str, int): Emitted with the Steam ID of a friend and the app_id of the answered game
+        cache_changed (): Emitted when the friend cache is updated
+
+    Constants:
+        MAX_IN_FLIGHT (int): Maximum number of requests sent and not answered yet
+
+    Attributes:
+        steam_api (snat.steam_api.SteamApi): SteamApi instance
+        game_list (snat.game_list.GameList): Game list of the user
+        friends (FriendCache): Friend cache
+        queue (collections.deque[Callable[[], Any]]): Functions that send one request each, waiting for a slot
+        in_flight (int): Number of requests sent and not answered yet
+        progress_pending (dict[str, int]): Number of progress chunks not answered yet by friend
+        achievements_pending (set[tuple[str, int]]): Friends and app_ids of the achievements not answered yet
+
+    Args:
+        parent (PyQt6.QtCore.QObject): Parent object
+        steam_api (snat.steam_api.SteamApi): SteamApi instance
+        game_list (snat.game_list.GameList): Game list of the user
+        friends (FriendCache): Friend cache
+    """
+
+    friends_loaded = QtCore.pyqtSignal()
+    progress_received = QtCore.pyqtSignal(str)
+    achievements_received = QtCore.pyqtSignal(str, int)
+    cache_changed = QtCore.pyqtSignal()
+
+    MAX_IN_FLIGHT = 4
+
+    def __init__(self, parent: QtCore.QObject, steam_api: SteamApi, game_list: GameList,
+                 friends: FriendCache) -> None:
+        super().__init__(parent)
+        self.steam_api = steam_api
+        self.game_list = game_list
+        self.friends = friends
+        self.queue: deque[Callable[[], Any]] = deque()
+        self.in_flight = 0
+        self.progress_pending: dict[str, int] = {}
+        self.achievements_pending: set[tuple[str, int]] = set()
+
+    def reset(self) -> None:
+        """Forget the queued and pending requests, before switching to another profile"""
+        self.queue.clear()
+        self.in_flight = 0
+        self.progress_pending.clear()
+        self.achievements_pending.clear()
+
+    def schedule(self, send: Callable[[], Any]) -> None:
+        """Queue a request and send it as soon as a slot is free
+
+        Args:
+            send (Callable[[], Any]): Function that sends exactly one request whose callbacks call finish
+        """
+        self.queue.append(send)
+        self.send_next()
+
+    def send_next(self) -> None:
+        """Send the queued requests while slots are free"""
+        while self.queue and self.in_flight < self.MAX_IN_FLIGHT:
+            self.in_flight += 1
+            self.queue.popleft()()
+
+    def finish(self) -> None:
+        """Free the slot of an answered request"""
+        self.in_flight = max(self.in_flight - 1, 0)
+        self.send_next()
+
+    def load_friends(self) -> None:
+        """Download the friend list and the friends names"""
+        self.schedule(lambda: self.steam_api.get_friend_list(self.handle_friend_list_response,
+                                                             self.handle_friend_list_error))
+
+    def handle_friend_list_response(self, data: Any, other: None) -> None:
+        """Forget the removed friends and request the names of the others
+
+        Args:
+            data (Any): Response data
+            other (None): Unused
+        """
+        self.finish()
+        user_ids = [friend["steamid"] for friend in data.get("friendslist", {}).get("friends", [])]
+        for user_id in set(self.friends) - set(user_ids):
+            del self.friends[user_id]
+
+        for index in range(0, len(user_ids), SteamApi.BATCH_SIZE):
+            chunk = user_ids[index:index + SteamApi.BATCH_SIZE]
+            self.schedule(partial(self.steam_api.get_player_summaries, chunk,
+                                  self.handle_summaries_response, self.handle_summaries_error))
+        if not user_ids:
+            self.friends_loaded.emit()
+
+    def handle_friend_list_error(self, error: QtNetwork.QNetworkReply.NetworkError, other: None) -> None:
+        """Keep the cached friends, the friend list is private or the network is down
+
+        Args:
+            error (QtNetwork.QNetworkReply.NetworkError): Network error
+            other (None): Unused
+        """
+        self.finish()
+        logger.warning("Failed to load the friend list")
+
+    def handle_summaries_response(self, data: Any, user_ids: list[str]) -> None:
+        """Add the friends with their names
+
+        Args:
+            data (Any): Response data
+            user_ids (list[str]): Steam IDs of the chunk
+        """
+        self.finish()
+        for player in data["response"]["players"]:
+            friend = self.friends.setdefault(player["steamid"], Friend(player["personaname"]))
+            friend.name = player["personaname"]
+        self.friends_loaded.emit()
+        self.cache_changed.emit()
+
+    def handle_summaries_error(self, error: QtNetwork.QNetworkReply.NetworkError, user_ids: list[str]) -> None:
+        """Skip the friends of the chunk
+
+        Args:
+            error (QtNetwork.QNetworkReply.NetworkError): Network error
+            user_ids (list[str]): Steam IDs of the chunk
+        """
+        self.finish()
+        logger.warning("Failed to load the names of %d friends", len(user_ids))
+
+    def load_progress(self, user_id: str) -> None:
+        """Download the library progress of a friend if it is not cached or expired
+
+        Args:
+            user_id (str): Steam ID of the friend
+        """
+        friend = self.friends.get(user_id)
+        if friend is None or user_id in self.progress_pending or not friend.is_expired():
+            return
+
+        app_ids = list(self.game_list)
+        chunks = [app_ids[index:index + SteamApi.BATCH_SIZE] for index in range(0, len(app_ids), SteamApi.BATCH_SIZE)]
+        if not chunks:
+            return
+        self.progress_pending[user_id] = len(chunks)
+        for chunk in chunks:
+            self.schedule(partial(self.steam_api.get_achievements_progress, chunk,
+                                  partial(self.handle_progress_response, user_id),
+                                  partial(self.handle_progress_error, user_id), user_id))
+
+    def handle_progress_response(self, user_id: str, data: Any, app_ids: list[int]) -> None:
+        """Merge a chunk of the friend progress
+
+        Args:
+            user_id (str): Steam ID of the friend
+            data (Any): Response data
+            app_ids (list[int]): App IDs of the chunk
+        """
+        friend = self.friends.get(user_id)
+        if friend is not None:
+            friend.private = False
+            for progress in data["response"].get("achievement_progress", []):
+                friend.progress[progress["appid"]] = progress["unlocked"]
+        self.finish_progress_chunk(user_id)
+
+    def handle_progress_error(self, user_id: str, error: QtNetwork.QNetworkReply.NetworkError,
+                              app_ids: list[int]) -> None:
+        """Mark the friend as private if access is denied
+
+        Args:
+            user_id (str): Steam ID of the friend
+            error (QtNetwork.QNetworkReply.NetworkError): Network error
+            app_ids (list[int]): App IDs of the chunk
+        """
+        friend = self.friends.get(user_id)
+        if friend is not None and error in PRIVATE_ERRORS:
+            friend.private = True
+        logger.warning("Failed to load the progress of friend %s", user_id)
+        self.finish_progress_chunk(user_id)
+
+    def finish_progress_chunk(self, user_id: str) -> None:
+        """Free the slot, mark the progress as downloaded once all the chunks are answered and notify the views
+
+        Args:
+            user_id (str): Steam ID of the friend
+        """
+        self.finish()
+        self.progress_pending[user_id] = self.progress_pending.get(user_id, 1) - 1
+        if self.progress_pending[user_id] <= 0:
+            del self.progress_pending[user_id]
+            friend = self.friends.get(user_id)
+            if friend is not None:
+                friend.timestamp = time.time()
+            self.cache_changed.emit()
+        self.progress_received.emit(user_id)
+
+    def has_valid_achievements(self, user_id: str, app_id: int) -> bool:
+        """Check if the cached achievements of a friend match its known progress
+
+        Args:
+            user_id (str): Steam ID of the friend
+            app_id (int): app_id of the game
+
+        Returns:
+            bool: True if the cached achievements can be displayed without request
+        """
+        friend = self.friends.get(user_id)
+        game = self.game_list.get(app_id)
+        if friend is None or game is None or app_id not in friend.locked:
+            return False
+        unlocked = friend.progress.get(app_id)
+        return unlocked is None or unlocked == len(game.schema) - len(friend.locked[app_id])
+
+    def load_achievements(self, user_id: str, app_id: int) -> None:
+        """Download the achievements of a friend for one game if the cached ones are outdated
+
+        Args:
+            user_id (str): Steam ID of the friend
+            app_id (int): app_id of the game
+        """
+        if (user_id, app_id) in self.achievements_pending or self.has_valid_achievements(user_id, app_id):
+            return
+        self.achievements_pending.add((user_id, app_id))
+        self.schedule(partial(self.steam_api.get_user_achievements, app_id,
+                              partial(self.handle_achievements_response, user_id),
+                              partial(self.handle_achievements_error, user_id), user_id))
+
+    def handle_achievements_response(self, user_id: str, data: Any, app_id: int) -> None:
+        """Cache the locked achievements of the friend
+
+        Args:
+            user_id (str): Steam ID of the friend
+            data (Any): Response data
+            app_id (int): app_id of the game
+        """
+        self.finish()
+        self.achievements_pending.discard((user_id, app_id))
+        friend = self.friends.get(user_id)
+        if friend is not None:
+            achievements = data["playerstats"].get("achievements", [])
+            friend.locked[app_id] = [raw["apiname"] for raw in achievements if not raw["achieved"]]
+            friend.progress[app_id] = len(achievements) - len(friend.locked[app_id])
+            self.cache_changed.emit()
+        self.achievements_received.emit(user_id, app_id)
+
+    def handle_achievements_error(self, user_id: str, error: QtNetwork.QNetworkReply.NetworkError,
+                                  app_id: int) -> None:
+        """Mark the friend as private if access is denied, the game may also not be owned by the friend
+
+        Args:
+            user_id (str): Steam ID of the friend
+            error (QtNetwork.QNetworkReply.NetworkError): Network error
+            app_id (int): app_id of the game
+        """
+        self.finish()
+        self.achievements_pending.discard((user_id, app_id))
+        friend = self.friends.get(user_id)
+        if friend is not None and error in PRIVATE_ERRORS:
+            friend.private = True
+        logger.warning("Failed to load the achievements of friend %s for app_id %d", user_id, app_id)
+        self.achievements_received.emit(user_id, app_id)
@@ -1,12 +1,19 @@
+import bisect
 import logging
+import sys
+import time
 from dataclasses import dataclass, field
-from typing import Any
+from typing import Any, Collection
 
 from PyQt6 import QtCore, QtNetwork, QtWidgets
 
+from .cache import CacheStats
+from .schema_details import details_path, save_details
 from .steam_api import SteamApi
 from .utils import DotAnimationLabel
 
+logger = logging.getLogger(__name__)
+
 
 @dataclass
 class Achievement:
@@ -28,13 +35,85 @@ class Game:
     Fields:
         name (str): Game name
         schema (dict): Game achievements schema
+        unlocked (int | None): Number of unlocked achievements, None if unknown
     """
 
     name: str
     schema: dict[Any, Achievement] = field(default_factory=dict)
+    unlocked: int | None = None
+
+    def label(self) -> str:
+        """Return the name followed by the achievements progress, if known.
+
+        Returns:
+            str: Game label
+        """
+        if self.unlocked is None:
+            return self.name
+        return f"{self.name} ({self.unlocked}/{len(self.schema)})"
 
 
 GameList = dict[int, Game]
+NoAchievementsCache = dict[int, float]
+SchemaCache = dict[int, Game]
+LibraryCache = dict[int, int | None]
+
+
+def join_library(schemas: SchemaCache, library: LibraryCache) -> GameList:
+    """Build the game list of a profile from the shared schemas and the profile progress
+
+    Args:
+        schemas (SchemaCache): Shared game names and schemas, their unlocked field is unused
+        library (LibraryCache): Number of unlocked achievements by owned app_id
+
+    Returns:
+        GameList: Game list, the schemas are shared with the schema cache
+    """
+    return {
+        app_id: Game(schemas[app_id].name, schemas[app_id].schema, unlocked)
+        for app_id, unlocked in library.items()
+        if app_id in schemas
+    }
+
+
+def schema_size(game: Game) -> int:
+    """Estimate the memory used by a game name and schema
+
+    Args:
+        game (Game): Game
+
+    Returns:
+        int: Size in bytes of the game, its schema and their strings
+    """
+    size = sys.getsizeof(game) + sys.getsizeof(game.name) + sys.getsizeof(game.schema)
+    for apiname, achievement in game.schema.items():
+        size += sys.getsizeof(apiname) + sys.getsizeof(achievement)
+        size += sys.getsizeof(achievement.name) + sys.getsizeof(achievement.icon)
+    return size
+
+
+def evict_schemas(schemas: SchemaCache, owned: Collection[int], stats: CacheStats) -> None:
+    """Evict the oldest schemas of games not owned by the current profile until the schemas fit in the budget
+
+    The owned games schemas are never evicted, the game list shares them. The schema details records of the
+    evicted schemas are deleted with them. Updates the usage and evictions.
+
+    Args:
+        schemas (SchemaCache): Shared game schemas
+        owned (Collection[int]): app_ids owned by the current profile
+        stats (snat.cache.CacheStats): Usage counters of the schemas, with the memory budget in bytes
+    """
+    sizes = {app_id: schema_size(game) for app_id, game in schemas.items()}
+    usage = sum(sizes.values())
+    if stats.budget is not None and usage > stats.budget:
+        for app_id in [app_id for app_id in schemas if app_id not in owned]:
+            if usage <= stats.budget:
+                break
+            del schemas[app_id]
+            details_path(app_id).unlink(missing_ok=True)
+            usage -= sizes[app_id]
+            stats.evictions += 1
+    stats.usage = usage
 
 
 class GameListBar(QtWidgets.QWidget):
@@ -43,37 +122,92 @@ class GameListBar(QtWidgets.QWidget):
     Signals:
         selected (int): Emitted when a game is selected
         loaded (): Emitted when the game list is loaded
+        progress_loaded (): Emitted when the achievements progress of the game list is loaded
+
+    Constants:
+        NO_ACHIEVEMENTS_TTL (int): Seconds before a game without achievements is checked again
 
     Attributes:
         steam_api (snat.steam_api.SteamApi): Steam API instance
         game_list (snat.game_list.GameList): Game list instance
+        schemas (snat.game_list.SchemaCache): Game schemas shared by all profiles
+        no_achievements (snat.game_list.NoAchievementsCache): Time at which each game was found without achievements
         schema_downloaded_count (int): Number of downloaded schemas
         schema_downloaded_max (int): Maximum number of schemas to download
+        owned_games_loaded (bool): Whether the owned games list is completely received
+        sorted_names (list[str]): Lowercase names of the games in the combo box, in combo box order
+        progress_pending (int): Number of achievements progress requests not answered yet
+        emitted_app_id (int | None): Last app_id emitted by the selected signal
+        reuse_schemas (bool): Whether the owned games loading takes the schemas from the shared cache
+        schema_stats (snat.cache.CacheStats): Usage counters of the shared schemas
 
     Args:
         parent (PyQt6.QtWidgets.QWidget): Parent widget
         steam_api (snat.steam_api.SteamApi): Steam API instance
         game_list (snat.game_list.GameList): Game list instance
+        schemas (snat.game_list.SchemaCache): Game schemas shared by all profiles
+        no_achievements (snat.game_list.NoAchievementsCache): Games without achievements cache
     """
 
     selected = QtCore.pyqtSignal(int)
     loaded = QtCore.pyqtSignal()
+    progress_loaded = QtCore.pyqtSignal()
 
-    def __init__(self, steam_api: SteamApi, game_list: GameList, parent: QtWidgets.QWidget | None = None) -> None:
+    NO_ACHIEVEMENTS_TTL = 30 * 24 * 60 * 60
+
+    def __init__(self, steam_api: SteamApi, game_list: GameList, schemas: SchemaCache,
+                 no_achievements: NoAchievementsCache, parent: QtWidgets.QWidget | None = None) -> None:
         super().__init__(parent)
         self.steam_api = steam_api
         self.game_list = game_list
+        self.schemas = schemas
+        self.no_achievements = no_achievements
         self.schema_downloaded_count = 0
         self.schema_downloaded_max = 0
+        self.owned_games_loaded = False
+        self.sorted_names: list[str] = []
+        self.progress_pending = 0
+        self.emitted_app_id: int | None = None
+        self.reuse_schemas = True
+        self.schema_stats = CacheStats("Game schemas")
         self.init_ui()
 
-        if game_list:
-            self.add_games()
-        else:
+        self.game_combo_box.currentIndexChanged.connect(self.index_changed)
+        self.refresh.clicked.connect(lambda: self.refresh_game_list(reuse_schemas=False))
+        self.steam_api.online_changed.connect(self.refresh.setEnabled)
+
+    def start(self) -> None:
+        """Fill the game list widget from the game list or download the owned games if it is empty.
+
+        The owned games prefetched during the onboarding are dropped when they are not loaded now,
+        so a later refresh never adopts that outdated reply.
+        """
+        self.refresh.setEnabled(self.steam_api.is_online())
+        if self.game_list:
+            self.steam_api.drop_prefetched()
+            self.sync_game_names()
+            self.update_labels()
+            self.load_progress()
+        elif self.steam_api.is_online():
+            self.game_combo_box.clear()
+            self.sorted_names.clear()
             self.load_owned_games()
+        else:
+            self.steam_api.drop_prefetched()
+            self.sync_game_names()
 
-        self.game_combo_box.currentIndexChanged.connect(self.index_changed)
-        self.refresh.clicked.connect(self.refresh_game_list)
+    def reset(self) -> None:
+        """Empty the game list widget and forget the pending loadings, before switching to another profile."""
+        self.progress_dialog.close()
+        self.game_combo_box.blockSignals(True)
+        self.game_combo_box.clear()
+        self.game_combo_box.blockSignals(False)
+        self.sorted_names.clear()
+        self.schema_downloaded_count = 0
+        self.schema_downloaded_max = 0
+        self.owned_games_loaded = False
+        self.progress_pending = 0
+        self.emitted_app_id = None
 
     def init_ui(self) -> None:
         """Create widgets and set the layout."""
@@ -97,17 +231,121 @@ class GameListBar(QtWidgets.QWidget):
         self.progress_dialog.setLabel(DotAnimationLabel(self.progress_dialog))
         self.progress_dialog.close()
 
+    def sync_game_names(self) -> None:
+        """Rebuild the game list widget from the game list if the displayed game names do not match it.
+
+        The cached names of a profile are missing after an upgrade or outdated after a refresh that was not saved.
+        The selected game is kept if it is still in the game list.
+        """
+        app_ids = {self.game_combo_box.itemData(index) for index in range(1, self.game_combo_box.count())}
+        if self.game_combo_box.count() > 0 and app_ids == self.game_list.keys():
+            return
+        selected = self.selected_app_id()
+        self.game_combo_box.blockSignals(True)
+        self.game_combo_box.clear()
+        self.game_combo_box.blockSignals(False)
+        self.sorted_names.clear()
+        self.add_games()
+        self.select_game(selected, silent=True)
+
     def add_games(self) -> None:
         """Add games from games list to the game list widget."""
+        self.add_game_names([(app_id, game.name) for app_id, game in self.game_list.items()])
+
+    def add_game_names(self, names: list[tuple[int, str]]) -> None:
+        """Add games to the game list widget without their schemas.
+
+        The selected signal is not emitted, the stored selection is restored afterwards.
+
+        Args:
+            names (list[tuple[int, str]]): Game app_ids and names
+        """
+        self.game_combo_box.blockSignals(True)
         self.game_combo_box.addItem("All Games")
-        for app_id, game in sorted(self.game_list.items(), key=lambda game: game[1].name.lower()):
-            self.game_combo_box.addItem(game.name, app_id)
+        for app_id, name in sorted(names, key=lambda game: game[1].lower()):
+            self.game_combo_box.addItem(name, app_id)
+            self.sorted_names.append(name.lower())
+        self.game_combo_box.blockSignals(False)
+
+    def game_names(self) -> list[list[int | str]]:
+        """Return the app_ids and names of the game list, in alphabetical order.
+
+        Returns:
+            list[list[int | str]]: Game app_ids and names
+        """
+        app_ids = [self.game_combo_box.itemData(index) for index in range(1, self.game_combo_box.count())]
+        return [[app_id, self.game_list[app_id].name] for app_id in app_ids if app_id in self.game_list]
+
+    def update_labels(self) -> None:
+        """Update the game labels with their achievements progress and the library progress on All Games."""
+        unlocked = 0
+        total = 0
+        for index in range(1, self.game_combo_box.count()):
+            game = self.game_list.get(self.game_combo_box.itemData(index))
+            if game is None:
+                continue
+            self.game_combo_box.setItemText(index, game.label())
+            if game.unlocked is not None:
+                unlocked += game.unlocked
+                total += len(game.schema)
+
+        if total:
+            self.game_combo_box.setItemText(0, f"All Games ({unlocked}/{total}, {unlocked * 100 // total}%)")
+
+    def load_progress(self) -> None:
+        """Start the batched achievements progress downloading of the whole game list."""
+        if self.progress_pending or not self.game_list or not self.steam_api.is_online():
+            return
+        self.progress_pending = self.steam_api.get_achievements_progress(
+            list(self.game_list.keys()), self.handle_progress_response, self.handle_progress_error)
+
+    def handle_progress_response(self, data: Any, app_ids: list[int]) -> None:
+        """Merge the achievements progress into the game list.
+
+        Args:
+            data (Any): JSON data from the Steam API response
+            app_ids (list[int]): App IDs of the chunk
+        """
+        for progress in data["response"].get("achievement_progress", []):
+            game = self.game_list.get(progress["appid"])
+            if game is not None:
+                game.unlocked = progress["unlocked"]
+        self.finish_progress_chunk()
+
+    def handle_progress_error(self, error: QtNetwork.QNetworkReply.NetworkError, app_ids: list[int]) -> None:
+        """Log the error, the progress of the chunk games stays unchanged.
+
+        Args:
+            error (QtNetwork.QNetworkReply.NetworkError): Network error
+            app_ids (list[int]): App IDs of the chunk
+        """
+        logger.warning("Failed to load achievements progress of %d games", len(app_ids))
+        self.finish_progress_chunk()
 
-    def select_game(self, app_id: int) -> None:
+    def finish_progress_chunk(self) -> None:
+        """Update the labels and emit the progress_loaded signal once all the chunks are answered."""
+        self.progress_pending -= 1
+        if self.progress_pending == 0:
+            self.update_labels()
+            self.progress_loaded.emit()
+
+    def insert_game(self, app_id: int) -> None:
+        """Insert a game in the game list widget, keeping the alphabetical order.
+
+        Args:
+            app_id (int): Game app_id
+        """
+        name = self.game_list[app_id].name
+        index = bisect.bisect_right(self.sorted_names, name.lower())
+        self.sorted_names.insert(index, name.lower())
+        self.game_combo_box.insertItem(index + 1, self.game_list[app_id].label(), app_id)
+
+    def select_game(self, app_id: int, silent: bool = False) -> None:
         """Select a game in the game list widget.
 
         Args:
             app_id (int): Game app_id
+            silent (bool, optional): Whether to select the game without emitting the selected signal
         """
         if app_id == -1:
             index = 0
@@ -116,34 +354,94 @@ class GameListBar(QtWidgets.QWidget):
             if index == -1:
                 index = 0
 
+        self.game_combo_box.blockSignals(silent)
         self.game_combo_box.setCurrentIndex(index)
-        if index == 0:
+        self.game_combo_box.blockSignals(False)
+        if silent:
+            self.emitted_app_id = self.selected_app_id()
+        if index == 0 and not silent:
+            self.emitted_app_id = -1
             self.selected.emit(-1)
 
-    def load_owned_games(self) -> None:
-        """Start the owned games downloading and open the progress dialog."""
+    def selected_app_id(self) -> int:
+        """Return the selected game app_id.
+
+        Returns:
+            int: Selected game app_id, -1 for All Games
+        """
+        app_id = self.game_combo_box.currentData()
+        return -1 if app_id is None else app_id
+
+    def load_owned_games(self, reuse_schemas: bool = True) -> None:
+        """Start the owned games downloading and open the progress dialog.
+
+        Games are streamed, each game schema is taken from the shared cache or requested as soon as the game is
+        received, so a profile sharing games with another one downloads almost no schema.
+
+        Args:
+            reuse_schemas (bool, optional): Whether to take the schemas from the shared cache
+        """
         self.progress_dialog.setLabelText("Download owned games list")
+        self.progress_dialog.setMaximum(0)
         self.progress_dialog.setValue(0)
         self.progress_dialog.open()
         self.schema_downloaded_count = 0
-        self.steam_api.get_owned_games(self.handle_owned_games_response, self.handle_owned_games_error)
+        self.schema_downloaded_max = 0
+        self.owned_games_loaded = False
+        self.reuse_schemas = reuse_schemas
+        if self.game_combo_box.count() == 0:
+            self.game_combo_box.addItem("All Games")
+        self.steam_api.get_owned_games(
+            self.handle_owned_game, self.handle_owned_games_response, self.handle_owned_games_error)
 
-    def handle_owned_games_response(self, data: Any, other: None) -> None:
-        """Add owned games to the game list and start the schemas downloading.
+    def handle_owned_game(self, owned_game: Any, other: None) -> None:
+        """Add an owned game to the game list and start its schema downloading.
 
         Args:
-            data (Any): JSON data from the Steam API
+            owned_game (Any): JSON data of the owned game
             other (None): Unused
         """
-        for owned_game in data["response"]["games"]:
-            if owned_game["playtime_forever"] > 0:
-                self.game_list[owned_game["appid"]] = Game(owned_game["name"])
+        if self.schema_downloaded_count == -1 or owned_game["playtime_forever"] == 0:
+            return
 
-        self.schema_downloaded_max = len(self.game_list)
-        self.progress_dialog.setLabelText("Download games schemas")
+        app_id = owned_game["appid"]
+        if time.time() - self.no_achievements.get(app_id, 0) < self.NO_ACHIEVEMENTS_TTL:
+            return
+
+        cached = self.schemas.get(app_id)
+        if self.reuse_schemas and cached is not None:
+            self.schema_stats.hits += 1
+            self.game_list[app_id] = Game(owned_game["name"], cached.schema)
+            self.insert_game(app_id)
+            return
+
+        if self.reuse_schemas:
+            self.schema_stats.misses += 1
+        self.game_list[app_id] = Game(owned_game["name"])
+        self.schema_downloaded_max += 1
         self.progress_dialog.setMaximum(self.schema_downloaded_max)
-        app_ids = list(self.game_list.keys())
-        self.steam_api.get_game_schemas(app_ids, self.handle_game_schemas_response, self.handle_game_schemas_error)
+        self.steam_api.get_game_schemas([app_id], self.handle_game_schemas_response, self.handle_game_schemas_error)
+
+    def handle_owned_games_response(self, data: None, other: None) -> None:
+        """Mark the owned games list as received.
+
+        Args:
+            data (None): Unused, games are processed by handle_owned_game
+            other (None): Unused
+        """
+        if self.schema_downloaded_count == -1:
+            return
+
+        self.owned_games_loaded = True
+        self.progress_dialog.setLabelText("Download games schemas")
+        self.check_loaded()
+
+    def check_loaded(self) -> None:
+        """Emit the loaded signal and close the progress dialog if all schemas are downloaded."""
+        if self.owned_games_loaded and self.schema_downloaded_count == self.schema_downloaded_max:
+            self.loaded.emit()
+            self.progress_dialog.close()
+            self.load_progress()
 
     def handle_owned_games_error(self, error: QtNetwork.QNetworkReply.NetworkError, other: None) -> None:
         """Show an error message.
@@ -152,10 +450,14 @@ class GameListBar(QtWidgets.QWidget):
             error (QtNetwork.QNetworkReply.NetworkError): Network error
             other (None): Unused
         """
+        self.schema_downloaded_count = -1
         self.progress_dialog.close()
+        if not self.steam_api.is_online():
+            logger.warning("Offline, owned games not loaded")
+            return
         QtWidgets.QMessageBox.critical(self, "Error", "Failed to load owned games!\n"
                                        "(You can try to refresh the game list or restart the application)")
-        logging.error("Failed to load owned games")
+        logger.error("Failed to load owned games")
 
     @staticmethod
     def is_game_schema_valid(schema: Any) -> bool:
@@ -189,8 +491,9 @@ class GameListBar(QtWidgets.QWidget):
         """Process the game schema data.
 
         Check if the downloading failed.
-        Add the achievements to the game schema, if the schema is invalid, remove the game from the game list.
-        If all schemas are downloaded, add the games to the game list widget and emit the loaded signal.
+        Add the achievements to the game schema and the game to the game list widget,
+        if the schema is invalid, remove the game from the game list and remember it in the no achievements cache.
+        If all schemas are downloaded, emit the loaded signal.
 
         Args:
             data (Any): JSON data from the Steam API response
@@ -201,16 +504,19 @@ class GameListBar(QtWidgets.QWidget):
 
         if self.is_game_schema_valid(data):
             self.add_achievements(app_id, data)
+            self.schemas[app_id] = Game(self.game_list[app_id].name, self.game_list[app_id].schema)
+            save_details(app_id, data["game"]["availableGameStats"]["achievements"], self.schemas)
+            self.insert_game(app_id)
+            self.no_achievements.pop(app_id, None)
         else:
             del self.game_list[app_id]
-            logging.info("Invalid schema for app_id %d", app_id)
+            self.schemas.pop(app_id, None)
+            self.no_achievements[app_id] = time.time()
+            logger.info("Invalid schema for app_id %d", app_id)
 
         self.schema_downloaded_count += 1
         self.progress_dialog.setValue(self.schema_downloaded_count)
-        if self.schema_downloaded_count == self.schema_downloaded_max:
-            self.add_games()
-            self.loaded.emit()
-            self.progress_dialog.close()
+        self.check_loaded()
 
     def handle_game_schemas_error(self, error: QtNetwork.QNetworkReply.NetworkError, app_id: int) -> None:
         """Stop the schemas downloading and show an error message.
@@ -224,24 +530,44 @@ class GameListBar(QtWidgets.QWidget):
 
         self.schema_downloaded_count = -1
         self.progress_dialog.close()
+        if not self.steam_api.is_online():
+            logger.warning("Offline, %d schema not loaded", app_id)
+            return
         QtWidgets.QMessageBox.critical(self, "Error", "Failed to load games schemas!\n"
                                        "(You can try to refresh the game list or restart the application)")
-        logging.error("Failed to load %d schema", app_id)
+        logger.error("Failed to load %d schema", app_id)
 
     def index_changed(self, index: int) -> None:
         """Emit the selected signal with the selected game app_id.
 
+        Games inserted while loading shift the current index, the signal is only emitted if the game changed.
+
         Args:
             index (int): Selected game index
         """
         app_id = self.game_combo_box.itemData(index)
         if app_id is None:
-            self.selected.emit(-1)
-        else:
+            app_id = -1
+        if app_id != self.emitted_app_id:
+            self.emitted_app_id = app_id
             self.selected.emit(app_id)
 
-    def refresh_game_list(self) -> None:
-        """Clear the game list and reload the owned games."""
+    def forget_no_achievements(self) -> None:
+        """Clear the no achievements cache and reload the owned games."""
+        self.no_achievements.clear()
+        self.refresh_game_list()
+
+    def refresh_game_list(self, reuse_schemas: bool = True) -> None:
+        """Clear the game list and reload the owned games, the cached list is kept while offline.
+
+        Args:
+            reuse_schemas (bool, optional): Whether to take the schemas from the shared cache
+        """
+        if not self.steam_api.is_online():
+            logger.info("Offline, keep the cached game list")
+            return
+
         self.game_combo_box.clear()
+        self.sorted_names.clear()
         self.game_list.clear()
-        self.load_owned_games()
+        self.load_owned_games(reuse_schemas)
@@ -0,0 +1,117 @@
+import logging
+import sqlite3
+from pathlib import Path
+
+from .utils import data_dir
+
+logger = logging.getLogger(__name__)
+
+WEEK = 7 * 24 * 60 * 60
+FIRST_MONDAY = 4 * 24 * 60 * 60
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS unlocks (
+    app_id INTEGER NOT NULL,
+    apiname TEXT NOT NULL,
+    unlocktime INTEGER NOT NULL,
+    PRIMARY KEY (app_id, apiname, unlocktime)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS unlocks_time ON unlocks (unlocktime);
+"""
+
+
+def profile_history_path(user_id: str) -> Path:
+    """Return the database path of a profile
+
+    Args:
+        user_id (str): Steam user ID of the profile
+
+    Returns:
+        pathlib.Path: history_<user_id>.sqlite3 in the data directory
+    """
+    return data_dir() / f"history_{user_id}.sqlite3"
+
+
+class UnlockHistory:
+    """Append-only store of the achievement unlocks, backed by SQLite
+
+    Unlocks are keyed by (app_id, apiname, unlocktime) and indexed by unlocktime,
+    so time range queries never scan the whole history.
+    The database is opened on first use to keep it off the startup path.
+
+    Attributes:
+        path (pathlib.Path): Database path
+        connection (sqlite3.Connection | None): Database connection, None until first use
+
+    Args:
+        path (pathlib.Path | None): Database path, history.sqlite3 in the data directory by default
+    """
+
+    def __init__(self, path: Path | None = None) -> None:
+        self.path = path or data_dir() / "history.sqlite3"
+        self.connection: sqlite3.Connection | None = None
+
+    def connect(self) -> sqlite3.Connection:
+        """Open the database and create the schema if needed
+
+        Returns:
+            sqlite3.Connection: Database connection
+        """
+        if self.connection is None:
+            self.connection = sqlite3.connect(self.path)
+            self.connection.executescript(SCHEMA)
+            logger.debug("Unlock history opened at %s", self.path)
+        return self.connection
+
+    def record(self, app_id: int, unlocks: list[tuple[str, int]]) -> None:
+        """Append unlocks, the already known ones are ignored
+
+        Args:
+            app_id (int): app_id of the game
+            unlocks (list[tuple[str, int]]): Achievement API names and unlock times
+        """
+        if not unlocks:
+            return
+        connection = self.connect()
+        with connection:
+            connection.executemany("INSERT OR IGNORE INTO unlocks VALUES (?, ?, ?)",
+                                   [(app_id, apiname, unlocktime) for apiname, unlocktime in unlocks])
+
+    def unlocks_between(self, start: int, end: int) -> list[tuple[int, str, int]]:
+        """Return the unlocks of a time range, the oldest first
+
+        Args:
+            start (int): Start of the range, POSIX timestamp included
+            end (int): End of the range, POSIX timestamp excluded
+
+        Returns:
+            list[tuple[int, str, int]]: app_id, achievement API name and unlock time
+        """
+        cursor = self.connect().execute(
+            "SELECT app_id, apiname, unlocktime FROM unlocks WHERE unlocktime >= ? AND unlocktime < ? "
+            "ORDER BY unlocktime", (start, end))
+        return cursor.fetchall()
+
+    def unlocks_per_week(self, start: int, end: int) -> list[tuple[int, int]]:
+        """Count the unlocks of a time range per week
+
+        Weeks start on Monday 00:00 UTC.
+
+        Args:
+            start (int): Start of the range, POSIX timestamp included
+            end (int): End of the range, POSIX timestamp excluded
+
+        Returns:
+            list[tuple[int, int]]: Start of the week as a POSIX timestamp and number of unlocks, the oldest first
+        """
+        cursor = self.connect().execute(
+            "SELECT (unlocktime - ?) / ? * ? + ? AS week, COUNT(*) FROM unlocks "
+            "WHERE unlocktime >= ? AND unlocktime < ? GROUP BY week ORDER BY week",
+            (FIRST_MONDAY, WEEK, WEEK, FIRST_MONDAY, start, end))
+        return cursor.fetchall()
+
+    def close(self) -> None:
+        """Close the database if it is open"""
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
@@ -0,0 +1,114 @@
+from PyQt6 import QtCore, QtGui, QtWidgets
+
+from .game_list import GameList
+from .history import WEEK, UnlockHistory
+from .utils import format_timestamp
+
+
+class HistoryDialog(QtWidgets.QDialog):
+    """Dialog that displays the unlock history.
+
+    Constants:
+        WEEKS (int): Number of weeks displayed in the weekly tab
+
+    Attributes:
+        history (snat.history.UnlockHistory): Unlock history
+        game_list (snat.game_list.GameList): Game list
+
+    Args:
+        parent (PyQt6.QtWidgets.QWidget): Parent widget
+        history (snat.history.UnlockHistory): Unlock history
+        game_list (snat.game_list.GameList): Game list
+    """
+
+    WEEKS = 52
+
+    def __init__(self, parent: QtWidgets.QWidget, history: UnlockHistory, game_list: GameList) -> None:
+        super().__init__(parent)
+        self.history = history
+        self.game_list = game_list
+        self.init_ui()
+        self.load_month(self.month_edit.date())
+        self.load_weeks()
+
+    def init_ui(self) -> None:
+        """Configure the window, create widgets and set the layout."""
+        self.setWindowTitle("History")
+        self.setWindowIcon(QtGui.QIcon("asset:icon.ico"))
+        self.resize(480, 400)
+
+        layout = QtWidgets.QVBoxLayout(self)
+        self.setLayout(layout)
+
+        tabs = QtWidgets.QTabWidget(self)
+        tabs.addTab(self.create_month_tab(), "Month")
+        self.week_list = QtWidgets.QListWidget(self)
+        tabs.addTab(self.week_list, "Weekly")
+        layout.addWidget(tabs)
+
+        button_box = QtWidgets.QDialogButtonBox(QtWidgets.QDialogButtonBox.StandardButton.Close, self)
+        button_box.rejected.connect(self.reject)
+        layout.addWidget(button_box)
+
+    def create_month_tab(self) -> QtWidgets.QWidget:
+        """Create the month tab with the month selector and the unlock list.
+
+        Returns:
+            PyQt6.QtWidgets.QWidget: Month tab
+        """
+        tab = QtWidgets.QWidget(self)
+        layout = QtWidgets.QVBoxLayout(tab)
+
+        self.month_edit = QtWidgets.QDateEdit(QtCore.QDate.currentDate(), tab)
+        self.month_edit.setDisplayFormat("MMMM yyyy")
+        self.month_edit.dateChanged.connect(self.load_month)
+        layout.addWidget(self.month_edit)
+
+        self.month_list = QtWidgets.QListWidget(tab)
+        layout.addWidget(self.month_list)
+        return tab
+
+    def unlock_label(self, app_id: int, apiname: str, unlocktime: int) -> str:
+        """Return the label of an unlock.
+
+        Args:
+            app_id (int): app_id of the game
+            apiname (str): Achievement API name
+            unlocktime (int): Unlock time
+
+        Returns:
+            str: Unlock label
+        """
+        game = self.game_list.get(app_id)
+        if game is None:
+            return f"{format_timestamp(unlocktime)}  {app_id}: {apiname}"
+        achievement = game.schema.get(apiname)
+        name = apiname if achievement is None else achievement.name
+        return f"{format_timestamp(unlocktime)}  {game.name}: {name}"
+
+    def load_month(self, date: QtCore.QDate) -> None:
+        """Display the unlocks of the month of the given date.
+
+        Args:
+            date (PyQt6.QtCore.QDate): Any date of the month
+        """
+        first_day = QtCore.QDate(date.year(), date.month(), 1)
+        start = QtCore.QDateTime(first_day, QtCore.QTime(0, 0)).toSecsSinceEpoch()
+        end = QtCore.QDateTime(first_day.addMonths(1), QtCore.QTime(0, 0)).toSecsSinceEpoch()
+
+        self.month_list.clear()
+        for unlock in self.history.unlocks_between(start, end):
+            self.month_list.addItem(self.unlock_label(*unlock))
+        if self.month_list.count() == 0:
+            self.month_list.addItem("No unlock recorded this month")
+
+    def load_weeks(self) -> None:
+        """Display the number of unlocks of the last weeks."""
+        end = QtCore.QDateTime.currentSecsSinceEpoch()
+        weeks = self.history.unlocks_per_week(end - self.WEEKS * WEEK, end)
+        self.week_list.clear()
+        for week, count in reversed(weeks):
+            date = QtCore.QDateTime.fromSecsSinceEpoch(week, QtCore.QTimeZone.utc()).toString("yyyy-MM-dd")
+            self.week_list.addItem(f"{date}  {'█' * min(count, 40)} {count}")
+        if self.week_list.count() == 0:
+            self.week_list.addItem("No unlock recorded these last weeks")
@@ -0,0 +1,201 @@
+import logging
+from collections import OrderedDict
+
+from PyQt6 import QtCore, QtGui, QtNetwork, QtWidgets, sip
+
+from .cache import CacheStats
+from .steam_api import SteamApi
+
+logger = logging.getLogger(__name__)
+
+
+class EmptyIcon(QtGui.QIcon):
+    """An icon that is empty and transparent
+
+    Args:
+        size (PyQt6.QtCore.QSize): Icon size
+    """
+
+    def __init__(self, size: QtCore.QSize) -> None:
+        super().__init__()
+        pixmap = QtGui.QPixmap(size)
+        pixmap.fill(QtGui.QColor("transparent"))
+        self.addPixmap(pixmap)
+
+
+class IconDecoder(QtCore.QRunnable):
+    """Decode an icon in a worker thread, scaled to the displayed size while decoding
+
+    Only a QImage is built here, pixmaps can only be created on the GUI thread.
+
+    Attributes:
+        icons (IconCache): Icon cache notified with the decoded image
+        url (str): URL of the icon
+        data (bytes): Encoded icon
+        size (PyQt6.QtCore.QSize): Maximum size in device pixels
+
+    Args:
+        icons (IconCache): Icon cache notified with the decoded image
+        url (str): URL of the icon
+        data (bytes): Encoded icon
+        size (PyQt6.QtCore.QSize): Maximum size in device pixels
+    """
+
+    def __init__(self, icons: "IconCache", url: str, data: bytes, size: QtCore.QSize) -> None:
+        super().__init__()
+        self.icons = icons
+        self.url = url
+        self.data = data
+        self.size = size
+
+    def run(self) -> None:
+        """Decode the icon and emit the decoded signal, queued to the GUI thread"""
+        buffer = QtCore.QBuffer()
+        buffer.setData(self.data)
+        reader = QtGui.QImageReader(buffer)
+        source_size = reader.size()
+        if source_size.isValid() and (source_size.width() > self.size.width()
+                                      or source_size.height() > self.size.height()):
+            reader.setScaledSize(source_size.scaled(self.size, QtCore.Qt.AspectRatioMode.KeepAspectRatio))
+        image = reader.read()
+        if image.isNull():
+            logger.warning("Failed to decode icon %s: %s", self.url, reader.errorString())
+        self.icons.decoded.emit(self.url, image)
+
+
+class IconCache(QtCore.QObject):
+    """Download, decode and share the achievement icons
+
+    Each URL is downloaded and decoded once, decoding runs in the global thread pool and every row displaying
+    the same URL shares one QIcon. The most recently used icons are kept within the memory budget.
+
+    Signals:
+        decoded (str, PyQt6.QtGui.QImage): Emitted from a worker thread with the URL and the decoded image
+
+    Attributes:
+        steam_api (snat.steam_api.SteamApi): SteamApi instance
+        view (PyQt6.QtWidgets.QAbstractItemView): View displaying the icons, gives the decoding size
+        empty_icon (EmptyIcon): Icon shared by the rows whose icon is not decoded yet
+        icons (collections.OrderedDict[str, PyQt6.QtGui.QIcon]): Icons by URL, the least recently used first
+        sizes (dict[str, int]): Size in bytes of each icon pixmap
+        pending (dict[str, list[PyQt6.QtWidgets.QListWidgetItem]]): Rows waiting for each icon being loaded
+        stats (snat.cache.CacheStats): Usage counters, its budget is the memory budget in bytes
+
+    Args:
+        view (PyQt6.QtWidgets.QAbstractItemView): View displaying the icons, also the parent object
+        steam_api (snat.steam_api.SteamApi): SteamApi instance
+    """
+
+    decoded = QtCore.pyqtSignal(str, QtGui.QImage)
+
+    def __init__(self, view: QtWidgets.QAbstractItemView, steam_api: SteamApi) -> None:
+        super().__init__(view)
+        self.steam_api = steam_api
+        self.view = view
+        self.empty_icon = EmptyIcon(self.icon_size())
+        self.icons: OrderedDict[str, QtGui.QIcon] = OrderedDict()
+        self.sizes: dict[str, int] = {}
+        self.pending: dict[str, list[QtWidgets.QListWidgetItem]] = {}
+        self.stats = CacheStats("Achievement icons", usage=0)
+        self.decoded.connect(self.handle_decoded)
+
+    def icon_size(self) -> QtCore.QSize:
+        """Return the size at which the view draws the icons
+
+        Returns:
+            PyQt6.QtCore.QSize: Icon size in device independent pixels
+        """
+        size = self.view.iconSize()
+        if size.isValid():
+            return size
+        style = self.view.style()
+        extent = 16 if style is None else style.pixelMetric(QtWidgets.QStyle.PixelMetric.PM_SmallIconSize)
+        return QtCore.QSize(extent, extent)
+
+    def set_icon(self, item: QtWidgets.QListWidgetItem, url: str) -> None:
+        """Display the icon of a URL in a row, download and decode it if it is not loaded
+
+        Args:
+            item (PyQt6.QtWidgets.QListWidgetItem): Row
+            url (str): URL of the icon
+        """
+        icon = self.icons.get(url)
+        if icon is not None:
+            self.icons.move_to_end(url)
+            self.stats.hits += 1
+            item.setIcon(icon)
+            return
+
+        self.stats.misses += 1
+        item.setIcon(self.empty_icon)
+        if url in self.pending:
+            self.pending[url].append(item)
+            return
+        self.pending[url] = [item]
+        self.steam_api.make_get_request(url, self.handle_icon_response, self.handle_icon_error, True, url)
+
+    def handle_icon_response(self, data: bytes, url: str) -> None:
+        """Decode the icon in a worker thread
+
+        Args:
+            data (bytes): Encoded icon
+            url (str): URL of the icon
+        """
+        ratio = self.view.devicePixelRatioF()
+        size = self.icon_size() * ratio
+        pool = QtCore.QThreadPool.globalInstance()
+        if pool is None:
+            raise RuntimeError("No thread pool")
+        pool.start(IconDecoder(self, url, data, size))
+
+    def handle_icon_error(self, error: QtNetwork.QNetworkReply.NetworkError, url: str) -> None:
+        """Leave the icon empty, it is requested again by the next row displaying it
+
+        Args:
+            error (QtNetwork.QNetworkReply.NetworkError): Network error
+            url (str): URL of the icon
+        """
+        self.pending.pop(url, None)
+        logger.warning("Failed to load icon")
+
+    def handle_decoded(self, url: str, image: QtGui.QImage) -> None:
+        """Convert the decoded image to a shared icon on the GUI thread and display it in the waiting rows
+
+        Args:
+            url (str): URL of the icon
+            image (PyQt6.QtGui.QImage): Decoded image, null if decoding failed
+        """
+        items = self.pending.pop(url, [])
+        if image.isNull():
+            return
+
+        pixmap = QtGui.QPixmap.fromImage(image)
+        pixmap.setDevicePixelRatio(self.view.devicePixelRatioF())
+        icon = QtGui.QIcon(pixmap)
+        self.icons[url] = icon
+        self.sizes[url] = image.sizeInBytes()
+        self.evict()
+        for item in items:
+            if not sip.isdeleted(item):
+                item.setIcon(icon)
+
+    def set_budget(self, budget: int) -> None:
+        """Set the memory budget and evict the icons exceeding it
+
+        Args:
+            budget (int): Budget in bytes
+        """
+        self.stats.budget = budget
+        self.evict()
+
+    def evict(self) -> None:
+        """Evict the least recently used icons until the pixmaps fit in the budget
+
+        Rows keep displaying an evicted icon, it is only loaded again for new rows.
+        """
+        usage = sum(self.sizes.values())
+        while self.stats.budget is not None and len(self.icons) > 1 and usage > self.stats.budget:
+            url, _ = self.icons.popitem(last=False)
+            usage -= self.sizes.pop(url)
+            self.stats.evictions += 1
+        self.stats.usage = usage
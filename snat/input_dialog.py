@@ -1,16 +1,15 @@
 import logging
 from abc import abstractmethod
-from string import Template
+from typing import Any
 
 from PyQt6 import QtCore, QtNetwork, QtWidgets
 
+from .steam_api import CONNECTION_ERRORS, SteamApi
 from .utils import ABCQtMeta, LinkLabel
 
+logger = logging.getLogger(__name__)
+
 API_KEY_URL = "https://steamcommunity.com/dev/apikey"
-TEST_STEAM_API_KEY_URL = Template("https://api.steampowered.com/ISteamWebAPIUtil/GetSupportedAPIList/v1"
-                                  "?key=$api_key")
-TEST_STEAM_ID_URL = Template("https://api.steampowered.com/ISteamUser/GetPlayerSummaries/v2"
-                             "?key=$api_key&steamids=$steam_id")
 
 
 class AbstractInputDialog(QtWidgets.QDialog, metaclass=ABCQtMeta):
@@ -72,12 +71,12 @@ class AbstractInputDialog(QtWidgets.QDialog, metaclass=ABCQtMeta):
         """Override to validate the input before accepting."""
         if self.input.text() == "":
             QtWidgets.QMessageBox.critical(self, "Error", f"No {self.INPUT_NAME} provided")
-            logging.warning(f"No {self.INPUT_NAME} provided")
+            logger.warning(f"No {self.INPUT_NAME} provided")
             return
 
         if not self.validate(self.input.text()):
             QtWidgets.QMessageBox.critical(self, "Error", f"Invalid {self.INPUT_NAME}")
-            logging.warning(f"Invalid {self.INPUT_NAME}")
+            logger.warning(f"Invalid {self.INPUT_NAME}")
             return
 
         super().accept()
@@ -86,6 +85,8 @@ class AbstractInputDialog(QtWidgets.QDialog, metaclass=ABCQtMeta):
 class AbstractRequestInputDialog(AbstractInputDialog):
     """Override AbstractInputDialog to make a request after validating the input.
 
+    The request goes through the SteamApi connection pool, so the application requests reuse its connection.
+
     Abstract constants:
         TITLE (str): Title of the dialog
         TEXT (str): Text to display above the input box
@@ -93,76 +94,87 @@ class AbstractRequestInputDialog(AbstractInputDialog):
 
     Abstract methods:
         validate: Validates the input
-        url: Returns the URL to request
-        validate_reply: Validates the reply from the request
+        send_request: Sends the request
+        validate_response: Validates the response of the request
 
     Attributes:
-        manager (PyQt6.QtNetwork.QNetworkAccessManager): Network access manager
+        steam_api (snat.steam_api.SteamApi): SteamApi instance
 
     Args:
         settings (PyQt6.QtCore.QSettings): Settings instance
+        steam_api (snat.steam_api.SteamApi): SteamApi instance
         parent (PyQt6.QtWidgets.QWidget | None): Parent widget
     """
 
-    def __init__(self, settings: QtCore.QSettings, parent: QtWidgets.QWidget | None = None) -> None:
+    def __init__(self, settings: QtCore.QSettings, steam_api: SteamApi,
+                 parent: QtWidgets.QWidget | None = None) -> None:
         super().__init__(settings, parent)
-        self.manager = QtNetwork.QNetworkAccessManager(self)
-        self.manager.finished.connect(self.handle_response)
+        self.steam_api = steam_api
 
     @abstractmethod
-    def url(self, text: str) -> str:
-        """Returns the URL to request.
+    def send_request(self, text: str) -> None:
+        """Sends the request, answered by handle_response or handle_error.
 
         Args:
             text (str): The input text
-
-        Returns:
-            str: The URL
         """
-        return "Error"
 
     @abstractmethod
-    def validate_reply(self, reply: QtNetwork.QNetworkReply) -> bool:
-        """Validates the reply from the request.
+    def validate_response(self, data: Any) -> bool:
+        """Validates the response of the request.
 
         Args:
-            reply (PyQt6.QtNetwork.QNetworkReply): The reply from the request
+            data (Any): The JSON response
 
         Returns:
-            bool: Reply is valid
+            bool: Response is valid
         """
         return False
 
     def make_request(self) -> None:
         """Makes the GET request."""
         self.setDisabled(True)
-        url = QtCore.QUrl(self.url(self.input.text()))
-        request = QtNetwork.QNetworkRequest(url)
-        self.manager.get(request)
+        self.send_request(self.input.text())
 
-    def handle_response(self, reply: QtNetwork.QNetworkReply) -> None:
-        """Handles the response from the request.
+    def handle_response(self, data: Any, other: None) -> None:
+        """Handles the response of the request.
 
         Args:
-            reply (PyQt6.QtNetwork.QNetworkReply): The reply from the request
+            data (Any): The JSON response
+            other (None): Unused
         """
-        if self.validate_reply(reply):
+        self.setDisabled(False)
+        if self.validate_response(data):
             super().accept()
         else:
             QtWidgets.QMessageBox.critical(self, "Error", "Invalid input")
-            logging.warning("Invalid input")
+            logger.warning("Invalid input")
+
+    def handle_error(self, error: QtNetwork.QNetworkReply.NetworkError, other: None) -> None:
+        """Handles a failed request.
+
+        Args:
+            error (PyQt6.QtNetwork.QNetworkReply.NetworkError): Network error
+            other (None): Unused
+        """
         self.setDisabled(False)
+        if error in CONNECTION_ERRORS or error == QtNetwork.QNetworkReply.NetworkError.OperationCanceledError:
+            QtWidgets.QMessageBox.critical(self, "Error", "Steam API unreachable")
+            logger.warning("Steam API unreachable")
+        else:
+            QtWidgets.QMessageBox.critical(self, "Error", "Invalid input")
+            logger.warning("Invalid input")
 
     def accept(self) -> None:
         """Override to validate the input before accepting."""
         if self.input.text() == "":
             QtWidgets.QMessageBox.critical(self, "Error", f"No {self.INPUT_NAME} provided")
-            logging.warning(f"No {self.INPUT_NAME} provided")
+            logger.warning(f"No {self.INPUT_NAME} provided")
             return
 
         if not self.validate(self.input.text()):
             QtWidgets.QMessageBox.critical(self, "Error", f"Invalid {self.INPUT_NAME}")
-            logging.warning(f"Invalid {self.INPUT_NAME}")
+            logger.warning(f"Invalid {self.INPUT_NAME}")
             return
 
         self.make_request()
@@ -178,11 +190,11 @@ class SteamAPIKeyDialog(AbstractRequestInputDialog):
     def validate(self, text: str) -> bool:
         return len(text) == 32 and text.isalnum()
 
-    def url(self, text: str) -> str:
-        return TEST_STEAM_API_KEY_URL.substitute(api_key=text)
+    def send_request(self, text: str) -> None:
+        self.steam_api.validate_credentials(text, "", self.handle_response, self.handle_error)
 
-    def validate_reply(self, reply: QtNetwork.QNetworkReply) -> bool:
-        return reply.error() == QtNetwork.QNetworkReply.NetworkError.NoError
+    def validate_response(self, data: Any) -> bool:
+        return True
 
 
 class SteamUserIdDialog(AbstractRequestInputDialog):
@@ -192,18 +204,12 @@ class SteamUserIdDialog(AbstractRequestInputDialog):
     TEXT = "Please enter your Steam ID:"
     INPUT_NAME = "Steam ID"
 
-    def __init__(self, settings: QtCore.QSettings) -> None:
-        super().__init__(settings)
-        self.api_key = settings.value("steam_api_key", type=str)
-
     def validate(self, text: str) -> bool:
         return len(text) == 17 and text.isnumeric()
 
-    def url(self, text: str) -> str:
-        return TEST_STEAM_ID_URL.substitute(api_key=self.api_key, steam_id=text)
+    def send_request(self, text: str) -> None:
+        self.steam_api.validate_credentials(self.steam_api.api_key, text, self.handle_response, self.handle_error)
 
-    def validate_reply(self, reply: QtNetwork.QNetworkReply) -> bool:
-        if reply.error() != QtNetwork.QNetworkReply.NetworkError.NoError:
-            return False
-        text = reply.readAll().data().decode()
-        return text != "{\"response\":{\"players\":[]}}"
+    def validate_response(self, data: Any) -> bool:
+        response = data.get("response") if isinstance(data, dict) else None
+        return isinstance(response, dict) and bool(response.get("players"))
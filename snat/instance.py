@@ -0,0 +1,116 @@
+import getpass
+import json
+import logging
+
+from PyQt6 import QtCore, QtNetwork
+
+logger = logging.getLogger(__name__)
+
+SERVER_NAME = f"snat-{getpass.getuser()}"
+CONNECT_TIMEOUT = 500
+
+
+def forward_to_running_instance(arguments: list[str]) -> bool:
+    """Send the arguments to the running instance, if any, which only logs them and raises its window.
+
+    Args:
+        arguments (list[str]): Command line arguments
+
+    Returns:
+        bool: True if an instance received the arguments, False if no instance is running
+    """
+    socket = QtNetwork.QLocalSocket()
+    socket.connectToServer(SERVER_NAME)
+    if not socket.waitForConnected(CONNECT_TIMEOUT):
+        return False
+
+    socket.write(json.dumps(arguments).encode())
+    socket.waitForBytesWritten(CONNECT_TIMEOUT)
+    socket.disconnectFromServer()
+    return True
+
+
+def is_instance_running() -> bool:
+    """Check if an instance is running, without activating it.
+
+    Returns:
+        bool: True if an instance accepted the connection
+    """
+    socket = QtNetwork.QLocalSocket()
+    socket.connectToServer(SERVER_NAME)
+    if not socket.waitForConnected(CONNECT_TIMEOUT):
+        return False
+
+    socket.disconnectFromServer()
+    return True
+
+
+class InstanceServer(QtNetwork.QLocalServer):
+    """Local server that receives the arguments of the next launches.
+
+    A new launch only raises the window of the running instance, its arguments are logged and otherwise ignored.
+
+    Signals:
+        activated (): Emitted when a new launch forwarded its arguments
+
+    Args:
+        parent (PyQt6.QtCore.QObject | None): Parent object
+    """
+
+    activated = QtCore.pyqtSignal()
+
+    def __init__(self, parent: QtCore.QObject | None = None) -> None:
+        super().__init__(parent)
+        self.setSocketOptions(QtNetwork.QLocalServer.SocketOption.UserAccessOption)
+        self.newConnection.connect(self.handle_connection)
+
+    def start(self) -> bool:
+        """Listen for the next launches, remove the server left by a crashed instance if needed.
+
+        The running instance is checked first: with socket options, listen replaces an existing socket file,
+        so a racing launch would take over the socket of the live instance.
+
+        Returns:
+            bool: True if the server is listening, False if another instance is running or listening failed
+        """
+        if is_instance_running():
+            logger.warning("Another instance started meanwhile, the instance server is not started")
+            return False
+        if self.listen(SERVER_NAME):
+            return True
+
+        QtNetwork.QLocalServer.removeServer(SERVER_NAME)
+        if self.listen(SERVER_NAME):
+            return True
+
+        logger.warning("Failed to start the instance server: %s", self.errorString())
+        return False
+
+    def handle_connection(self) -> None:
+        """Read the arguments once the new launch disconnects."""
+        socket = self.nextPendingConnection()
+        if socket is None:
+            return
+        if socket.state() == QtNetwork.QLocalSocket.LocalSocketState.UnconnectedState:
+            self.handle_disconnected(socket)
+        else:
+            socket.disconnected.connect(lambda: self.handle_disconnected(socket))
+
+    def handle_disconnected(self, socket: QtNetwork.QLocalSocket) -> None:
+        """Decode and log the arguments, then emit the activated signal, connections without message are only probes.
+
+        Args:
+            socket (PyQt6.QtNetwork.QLocalSocket): Socket of the new launch
+        """
+        socket.deleteLater()
+        message = socket.readAll().data()
+        if not message:
+            return
+        try:
+            arguments = json.loads(message)
+        except ValueError:
+            logger.warning("Invalid message from a new instance")
+            return
+
+        logger.info("New launch forwarded with arguments %s", arguments)
+        self.activated.emit()
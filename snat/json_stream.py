@@ -0,0 +1,130 @@
+import json
+import re
+from typing import Any
+
+STRUCTURE_TOKEN = re.compile(rb'["\[\]{}]')
+STRING_TOKEN = re.compile(rb'["\\]')
+
+
+class JsonArrayStream:
+    """Incrementally extract the elements of a JSON array from a byte stream
+
+    Only the bytes of the element being received are buffered.
+    Complete elements are parsed directly from the byte buffer, they must be objects or arrays.
+
+    Attributes:
+        marker (re.Pattern[bytes]): Pattern matching the key and the array opening bracket
+        buffer (bytearray): Bytes not consumed yet
+        position (int): Scan position in the buffer
+        start (int): Start of the current element in the buffer
+        depth (int): Nesting depth inside the array, 0 between elements
+        in_string (bool): Whether the scan position is inside a string
+        started (bool): Whether the array opening bracket was found
+        finished (bool): Whether the array closing bracket was found
+
+    Args:
+        key (str): Key of the array to extract, the first occurrence is used
+    """
+
+    def __init__(self, key: str) -> None:
+        self.marker = re.compile(rb'"' + re.escape(key.encode()) + rb'"\s*:\s*\[')
+        self.buffer = bytearray()
+        self.position = 0
+        self.start = 0
+        self.depth = 0
+        self.in_string = False
+        self.started = False
+        self.finished = False
+
+    def feed(self, chunk: bytes) -> list[Any]:
+        """Add a chunk to the stream
+
+        Args:
+            chunk (bytes): Received bytes
+
+        Returns:
+            list[Any]: Elements completed by this chunk
+        """
+        if self.finished:
+            return []
+
+        self.buffer += chunk
+        if not self.started and not self.find_array():
+            return []
+
+        elements = self.scan()
+        self.compact()
+        return elements
+
+    def find_array(self) -> bool:
+        """Drop the bytes before the array, keep a tail in case the key is split between two chunks
+
+        Returns:
+            bool: Whether the array opening bracket was found
+        """
+        match = self.marker.search(self.buffer)
+        if match is None:
+            del self.buffer[:-len(self.marker.pattern)]
+            return False
+
+        del self.buffer[:match.end()]
+        self.started = True
+        return True
+
+    def scan(self) -> list[Any]:
+        """Scan the buffer from the current position and parse the completed elements
+
+        Returns:
+            list[Any]: Completed elements
+        """
+        elements: list[Any] = []
+        buffer = self.buffer
+        while True:
+            if self.in_string:
+                match = STRING_TOKEN.search(buffer, self.position)
+                if match is None:
+                    self.position = len(buffer)
+                    return elements
+                if match.group() == b'"':
+                    self.in_string = False
+                    self.position = match.end()
+                elif match.end() == len(buffer):
+                    self.position = match.start()
+                    return elements
+                else:
+                    self.position = match.end() + 1
+                continue
+
+            match = STRUCTURE_TOKEN.search(buffer, self.position)
+            if match is None:
+                self.position = len(buffer)
+                return elements
+
+            token = match.group()
+            self.position = match.end()
+            if token == b'"':
+                self.in_string = True
+            elif token in (b"[", b"{"):
+                if self.depth == 0:
+                    self.start = match.start()
+                self.depth += 1
+            elif self.depth == 0:
+                self.finished = True
+                return elements
+            else:
+                self.depth -= 1
+                if self.depth == 0:
+                    elements.append(json.loads(buffer[self.start:self.position]))
+
+    def compact(self) -> None:
+        """Drop the consumed bytes from the buffer"""
+        if self.finished:
+            self.buffer.clear()
+            self.position = 0
+        elif self.depth == 0:
+            del self.buffer[:self.position]
+            self.position = 0
+        else:
+            del self.buffer[:self.start]
+            self.position -= self.start
+            self.start = 0
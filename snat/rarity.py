@@ -0,0 +1,98 @@
+import time
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any
+
+RARITY_TTL = 7 * 24 * 60 * 60
+RARITY_RETRY_DELAY = 60 * 60
+
+
+class SortOrder(Enum):
+    """Order of the locked achievements, the value is displayed to the user"""
+
+    DEFAULT = "Default order"
+    COMMON = "Most common first"
+    RARE = "Rarest first"
+
+
+@dataclass
+class GameRarity:
+    """Dataclass representing the global unlock percentages of a game achievements
+
+    Fields:
+        percents (dict[str, float]): Unlock percentage by achievement API name
+        timestamp (float): Time of the download
+        rank (dict[str, int]): Precomputed position by achievement API name, from the most to the least unlocked
+    """
+
+    percents: dict[str, float]
+    timestamp: float
+    rank: dict[str, int] = field(init=False)
+
+    def __post_init__(self) -> None:
+        ordered = sorted(self.percents, key=self.percents.__getitem__, reverse=True)
+        self.rank = {name: index for index, name in enumerate(ordered)}
+
+    @classmethod
+    def from_response(cls, data: Any) -> "GameRarity":
+        """Create the rarity from a GetGlobalAchievementPercentagesForApp response
+
+        Args:
+            data (Any): JSON data from the Steam API response
+
+        Returns:
+            GameRarity: Game rarity
+        """
+        achievements = data["achievementpercentages"]["achievements"]
+        return cls({achievement["name"]: float(achievement["percent"]) for achievement in achievements}, time.time())
+
+    def is_expired(self) -> bool:
+        """Check if the percentages should be downloaded again
+
+        Returns:
+            bool: True if older than RARITY_TTL
+        """
+        return time.time() - self.timestamp > RARITY_TTL
+
+    def sort(self, names: list[str], order: SortOrder) -> list[str]:
+        """Sort achievement API names with the precomputed rank
+
+        Args:
+            names (list[str]): Achievement API names
+            order (SortOrder): Sort order
+
+        Returns:
+            list[str]: Sorted API names, unknown names last
+        """
+        if order == SortOrder.DEFAULT:
+            return names
+        unknown = len(self.rank)
+        if order == SortOrder.COMMON:
+            return sorted(names, key=lambda name: self.rank.get(name, unknown))
+        return sorted(names, key=lambda name: -self.rank.get(name, -1))
+
+
+RarityCache = dict[int, GameRarity]
+
+
+def library_index(locked: dict[int, list[str]], rarity: RarityCache, order: SortOrder) -> list[tuple[float, int, str]]:
+    """Join the locked achievements of many games with their rarity and sort them
+
+    Args:
+        locked (dict[int, list[str]]): Locked achievement API names by app_id
+        rarity (RarityCache): Rarity cache
+        order (SortOrder): Sort order, DEFAULT keeps the games order
+
+    Returns:
+        list[tuple[float, int, str]]: Percentage, app_id and API name of the achievements with a known rarity
+    """
+    index = [
+        (game_rarity.percents[name], app_id, name)
+        for app_id, names in locked.items()
+        if (game_rarity := rarity.get(app_id)) is not None
+        for name in names
+        if name in game_rarity.percents
+    ]
+    if order != SortOrder.DEFAULT:
+        index.sort(key=lambda entry: entry[0], reverse=order == SortOrder.COMMON)
+    return index
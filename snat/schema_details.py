@@ -0,0 +1,154 @@
+import json
+import logging
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Container
+
+from PyQt6 import QtCore
+
+from .cache import cache_dir
+
+logger = logging.getLogger(__name__)
+
+DETAILS_VERSION = 1
+
+
+@dataclass
+class AchievementDetails:
+    """Dataclass representing the schema fields of an achievement only needed by the detail pane
+
+    Fields:
+        description (str): Achievement description, often empty for hidden achievements
+        hidden (bool): Whether Steam hides the achievement until it is unlocked
+        icon_gray (str): Locked achievement icon url
+    """
+
+    description: str
+    hidden: bool
+    icon_gray: str
+
+
+GameDetails = dict[str, AchievementDetails]
+
+
+def details_dir() -> Path:
+    """Return the directory of the schema details records, create it if needed
+
+    Returns:
+        Path: Records directory
+    """
+    path = cache_dir() / "schema_details"
+    path.mkdir(exist_ok=True)
+    return path
+
+
+def details_path(app_id: int) -> Path:
+    """Return the path of the schema details record of a game
+
+    Args:
+        app_id (int): app_id of the game
+
+    Returns:
+        Path: Record path
+    """
+    return details_dir() / f"{app_id}.json.z"
+
+
+def parse_details(raw_achievements: list[Any]) -> GameDetails:
+    """Extract the details of the achievements of a schema response
+
+    Args:
+        raw_achievements (list[Any]): Achievements of the GetSchemaForGame response
+
+    Returns:
+        GameDetails: Details by achievement API name
+    """
+    return {
+        raw["name"]: AchievementDetails(raw.get("description", ""), bool(raw.get("hidden")), raw.get("icongray", ""))
+        for raw in raw_achievements
+    }
+
+
+class DetailsWriter(QtCore.QRunnable):
+    """Compress and save a schema details record atomically in a worker thread
+
+    The schema may be evicted while the writer is queued, the record is then skipped or deleted once committed.
+
+    Attributes:
+        app_id (int): app_id of the game
+        raw_achievements (list[Any]): Achievements of the GetSchemaForGame response
+        cached (Container[int]): app_ids of the cached schemas, only read
+
+    Args:
+        app_id (int): app_id of the game
+        raw_achievements (list[Any]): Achievements of the GetSchemaForGame response
+        cached (Container[int]): app_ids of the cached schemas, only read
+    """
+
+    def __init__(self, app_id: int, raw_achievements: list[Any], cached: Container[int]) -> None:
+        super().__init__()
+        self.app_id = app_id
+        self.raw_achievements = raw_achievements
+        self.cached = cached
+
+    def run(self) -> None:
+        """Build the record and commit it with a QSaveFile, a reader sees either the previous or the new record"""
+        if self.app_id not in self.cached:
+            return
+        record = {
+            "version": DETAILS_VERSION,
+            "achievements": {
+                raw["name"]: [raw.get("description", ""), bool(raw.get("hidden")), raw.get("icongray", "")]
+                for raw in self.raw_achievements
+            },
+        }
+        file = QtCore.QSaveFile(str(details_path(self.app_id)))
+        if not file.open(QtCore.QIODevice.OpenModeFlag.WriteOnly):
+            logger.error("Failed to open schema details of app_id %d: %s", self.app_id, file.errorString())
+            return
+        file.write(zlib.compress(json.dumps(record, separators=(",", ":")).encode()))
+        if not file.commit():
+            logger.error("Failed to save schema details of app_id %d: %s", self.app_id, file.errorString())
+        elif self.app_id not in self.cached:
+            details_path(self.app_id).unlink(missing_ok=True)
+
+
+def save_details(app_id: int, raw_achievements: list[Any], cached: Container[int]) -> None:
+    """Save the details of the achievements of a schema response in the thread pool
+
+    The GUI thread only queues the write, the record is missing until the worker commits it.
+
+    Args:
+        app_id (int): app_id of the game
+        raw_achievements (list[Any]): Achievements of the GetSchemaForGame response, not modified afterwards
+        cached (Container[int]): app_ids of the cached schemas, the record is not kept if its schema is evicted
+    """
+    pool = QtCore.QThreadPool.globalInstance()
+    if pool is None:
+        raise RuntimeError("No thread pool")
+    pool.start(DetailsWriter(app_id, raw_achievements, cached))
+
+
+def load_details(app_id: int) -> GameDetails | None:
+    """Decompress the schema details record of a game
+
+    Args:
+        app_id (int): app_id of the game
+
+    Returns:
+        GameDetails | None: Details by achievement API name, None if the record is missing, outdated or corrupted
+    """
+    try:
+        record = json.loads(zlib.decompress(details_path(app_id).read_bytes()))
+    except FileNotFoundError:
+        return None
+    except Exception:
+        logger.exception("Failed to load schema details of app_id %d", app_id)
+        return None
+    if record.get("version") != DETAILS_VERSION:
+        return None
+    return {
+        apiname: AchievementDetails(description, hidden, icon_gray)
+        for apiname, (description, hidden, icon_gray) in record["achievements"].items()
+    }
@@ -0,0 +1,342 @@
+import gzip
+import hashlib
+import json
+import logging
+import threading
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+from urllib.parse import parse_qs, urlsplit
+
+from PyQt6 import QtCore
+
+from .achievement_list import UserAchievementsCache
+from .cache import cache_dir, load_cache, profile_cache
+from .game_list import Game, GameList, join_library
+from .rarity import RarityCache
+
+logger = logging.getLogger(__name__)
+
+SHARED_CACHE_NAMES = ("schema_cache", "rarity_cache")
+PROFILE_CACHE_NAMES = ("library_cache", "user_achievements_cache")
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 1000
+GZIP_MIN_SIZE = 1024
+MAX_RESPONSES = 256
+
+
+class Snapshot:
+    """Read-only view of the caches written by the application
+
+    Attributes:
+        version (str): Identifier of the cache files state, used in the ETags
+        game_list (snat.game_list.GameList): Game list of the profile
+        user_achievements (snat.achievement_list.UserAchievementsCache): User achievements cache
+        rarity (snat.rarity.RarityCache): Rarity cache
+        app_ids (list[int]): app_ids sorted by game name
+        responses (dict[str, bytes]): Encoded responses by request target, up to MAX_RESPONSES
+        compressed_responses (dict[str, bytes]): Gzip compressed responses by request target, up to MAX_RESPONSES
+
+    Args:
+        version (str): Identifier of the cache files state
+        user_id (str): Steam user ID of the profile
+    """
+
+    def __init__(self, version: str, user_id: str) -> None:
+        self.version = version
+        self.game_list: GameList = join_library(load_cache("schema_cache", {}),
+                                                load_cache(profile_cache("library_cache", user_id), {}))
+        self.user_achievements: UserAchievementsCache = load_cache(
+            profile_cache("user_achievements_cache", user_id), {})
+        self.rarity: RarityCache = load_cache("rarity_cache", {})
+        self.app_ids = sorted(self.game_list, key=lambda app_id: self.game_list[app_id].name.lower())
+        self.responses: dict[str, bytes] = {}
+        self.compressed_responses: dict[str, bytes] = {}
+
+    @staticmethod
+    def current_version(user_id: str) -> str:
+        """Return the identifier of the current cache files state
+
+        Args:
+            user_id (str): Steam user ID of the profile
+
+        Returns:
+            str: Modification times and sizes of the cache files
+        """
+        parts = []
+        names = SHARED_CACHE_NAMES + tuple(profile_cache(name, user_id) for name in PROFILE_CACHE_NAMES)
+        for name in names:
+            path = cache_dir() / f"{name}.pickle"
+            stat = path.stat() if path.exists() else None
+            parts.append("-" if stat is None else f"{stat.st_mtime_ns}:{stat.st_size}")
+        return hashlib.sha1("/".join(parts).encode()).hexdigest()[:16]
+
+    def compress(self, target: str, body: bytes) -> bytes:
+        """Return the gzip compressed response of a request target, compressed once per snapshot
+
+        Args:
+            target (str): Request target
+            body (bytes): Encoded response
+
+        Returns:
+            bytes: Compressed response
+        """
+        compressed = self.compressed_responses.get(target)
+        if compressed is None:
+            compressed = gzip.compress(body, compresslevel=5)
+            if len(self.compressed_responses) < MAX_RESPONSES:
+                self.compressed_responses[target] = compressed
+        return compressed
+
+    def game_summary(self, app_id: int, game: Game) -> dict[str, Any]:
+        """Return the summary of a game
+
+        Args:
+            app_id (int): app_id of the game
+            game (snat.game_list.Game): Game
+
+        Returns:
+            dict[str, Any]: JSON serializable summary
+        """
+        total = len(game.schema)
+        return {
+            "app_id": app_id,
+            "name": game.name,
+            "achievements": total,
+            "unlocked": game.unlocked,
+            "completion": None if game.unlocked is None or not total else game.unlocked / total,
+        }
+
+    def game_achievements(self, app_id: int, game: Game) -> list[dict[str, Any]]:
+        """Return the achievements of a game with their state and rarity
+
+        Args:
+            app_id (int): app_id of the game
+            game (snat.game_list.Game): Game
+
+        Returns:
+            list[dict[str, Any]]: JSON serializable achievements, locked is None if unknown
+        """
+        cached = self.user_achievements.get(app_id)
+        locked = None if cached is None else set(cached.locked)
+        rarity = self.rarity.get(app_id)
+        return [
+            {
+                "apiname": apiname,
+                "name": achievement.name,
+                "icon": achievement.icon,
+                "locked": None if locked is None else apiname in locked,
+                "percent": None if rarity is None else rarity.percents.get(apiname),
+            }
+            for apiname, achievement in game.schema.items()
+        ]
+
+    def find_game(self, app_id: str) -> Game | None:
+        """Return the game of an app_id path segment
+
+        Args:
+            app_id (str): app_id from the request path
+
+        Returns:
+            snat.game_list.Game | None: Game, None if the app_id is invalid or unknown
+        """
+        return self.game_list.get(int(app_id)) if app_id.isdigit() else None
+
+    def stats(self) -> dict[str, Any]:
+        """Return the library completion stats
+
+        Returns:
+            dict[str, Any]: JSON serializable stats
+        """
+        known = [game for game in self.game_list.values() if game.unlocked is not None]
+        unlocked = sum(game.unlocked or 0 for game in known)
+        total = sum(len(game.schema) for game in known)
+        return {
+            "games": len(self.game_list),
+            "games_with_progress": len(known),
+            "achievements": sum(len(game.schema) for game in self.game_list.values()),
+            "unlocked": unlocked,
+            "completion": unlocked / total if total else None,
+            "perfect_games": sum(1 for game in known if game.schema and game.unlocked == len(game.schema)),
+        }
+
+    def route(self, path: str, query: dict[str, list[str]]) -> Any:
+        """Return the JSON data of a request
+
+        Args:
+            path (str): Request path
+            query (dict[str, list[str]]): Query parameters
+
+        Raises:
+            LookupError: If the resource does not exist
+            ValueError: If a parameter is invalid
+
+        Returns:
+            Any: JSON serializable data
+        """
+        parts = [part for part in path.split("/") if part]
+        match parts:
+            case ["stats"]:
+                return self.stats()
+            case ["games"]:
+                items = [self.game_summary(app_id, self.game_list[app_id]) for app_id in self.app_ids]
+                return paginate(items, query)
+            case ["games", app_id] if (game := self.find_game(app_id)) is not None:
+                return self.game_summary(int(app_id), game) | {"schema": self.game_achievements(int(app_id), game)}
+            case ["games", app_id, "achievements"] if (game := self.find_game(app_id)) is not None:
+                achievements = self.game_achievements(int(app_id), game)
+                state = query.get("state", ["all"])[0]
+                if state not in ("all", "locked", "unlocked"):
+                    raise ValueError(f"Invalid state {state}")
+                if state != "all":
+                    achievements = [item for item in achievements if item["locked"] is (state == "locked")]
+                return paginate(achievements, query)
+        raise LookupError(path)
+
+
+def paginate(items: list[Any], query: dict[str, list[str]]) -> dict[str, Any]:
+    """Return a page of items
+
+    Args:
+        items (list[Any]): All items
+        query (dict[str, list[str]]): Query parameters, offset and limit are used
+
+    Raises:
+        ValueError: If offset or limit are invalid
+
+    Returns:
+        dict[str, Any]: Page with the total number of items
+    """
+    offset = int(query.get("offset", ["0"])[0])
+    limit = int(query.get("limit", [str(DEFAULT_LIMIT)])[0])
+    if offset < 0 or not 0 < limit <= MAX_LIMIT:
+        raise ValueError("Invalid offset or limit")
+    return {"total": len(items), "offset": offset, "limit": limit, "items": items[offset:offset + limit]}
+
+
+class ApiServer(ThreadingHTTPServer):
+    """HTTP server that answers from the cache files, one thread per client
+
+    The snapshot is reloaded when the application rewrites a cache file, responses are encoded once per snapshot.
+
+    Attributes:
+        user_id (str): Steam user ID of the served profile
+        snapshot (Snapshot): Current snapshot
+        lock (threading.Lock): Lock of the snapshot reloading
+
+    Args:
+        address (tuple[str, int]): Host and port
+        user_id (str): Steam user ID of the served profile
+    """
+
+    daemon_threads = True
+
+    def __init__(self, address: tuple[str, int], user_id: str) -> None:
+        super().__init__(address, RequestHandler)
+        self.user_id = user_id
+        self.lock = threading.Lock()
+        self.snapshot = Snapshot(Snapshot.current_version(user_id), user_id)
+
+    def current_snapshot(self) -> Snapshot:
+        """Return the snapshot of the current cache files, reload it if they changed
+
+        Returns:
+            Snapshot: Current snapshot
+        """
+        version = Snapshot.current_version(self.user_id)
+        if version != self.snapshot.version:
+            with self.lock:
+                if version != self.snapshot.version:
+                    logger.info("Cache files changed, reload snapshot %s", version)
+                    self.snapshot = Snapshot(version, self.user_id)
+        return self.snapshot
+
+
+class RequestHandler(BaseHTTPRequestHandler):
+    """Handle the read-only JSON API requests"""
+
+    server: ApiServer
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self) -> None:
+        """Answer a GET request with ETag and gzip support
+
+        The gzip and identity representations have their own ETag, both vary with Accept-Encoding.
+        """
+        snapshot = self.server.current_snapshot()
+        body = snapshot.responses.get(self.path)
+        if body is None:
+            url = urlsplit(self.path)
+            try:
+                data = snapshot.route(url.path, parse_qs(url.query))
+            except LookupError:
+                self.send_error_json(HTTPStatus.NOT_FOUND, "Not found")
+                return
+            except ValueError as error:
+                self.send_error_json(HTTPStatus.BAD_REQUEST, str(error))
+                return
+            body = json.dumps(data, separators=(",", ":")).encode()
+            if len(snapshot.responses) < MAX_RESPONSES:
+                snapshot.responses[self.path] = body
+
+        compressed = len(body) >= GZIP_MIN_SIZE and "gzip" in self.headers.get("Accept-Encoding", "")
+        etag = f'"{snapshot.version}-gz"' if compressed else f'"{snapshot.version}"'
+        if etag in self.headers.get("If-None-Match", ""):
+            self.send_body(HTTPStatus.NOT_MODIFIED, b"", etag)
+            return
+        if compressed:
+            body = snapshot.compress(self.path, body)
+        self.send_body(HTTPStatus.OK, body, etag, compressed)
+
+    def send_error_json(self, status: HTTPStatus, message: str) -> None:
+        """Send an error as JSON
+
+        Args:
+            status (http.HTTPStatus): Status code
+            message (str): Error message
+        """
+        self.send_body(status, json.dumps({"error": message}).encode())
+
+    def send_body(self, status: HTTPStatus, body: bytes, etag: str | None = None, compressed: bool = False) -> None:
+        """Send the response
+
+        Args:
+            status (http.HTTPStatus): Status code
+            body (bytes): JSON body
+            etag (str | None): ETag header, the response then varies with Accept-Encoding
+            compressed (bool): Whether the body is gzip compressed
+        """
+        self.send_response(status)
+        if etag is not None:
+            self.send_header("ETag", etag)
+            self.send_header("Vary", "Accept-Encoding")
+        if compressed:
+            self.send_header("Content-Encoding", "gzip")
+        if status != HTTPStatus.NOT_MODIFIED:
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if status != HTTPStatus.NOT_MODIFIED:
+            self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        """Route the access log to the logging module"""
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+
+def serve(host: str, port: int, user_id: str | None = None) -> None:
+    """Serve the cached library of a profile until interrupted
+
+    Args:
+        host (str): Host to listen on
+        port (int): Port to listen on
+        user_id (str | None): Steam user ID of the profile, the current profile of the application by default
+    """
+    if user_id is None:
+        user_id = QtCore.QSettings().value("steam_user_id", "", type=str)
+    with ApiServer((host, port), user_id) as server:
+        logger.info("Serve the cached library of %s on http://%s:%d", user_id, host, server.server_address[1])
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
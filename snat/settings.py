@@ -1,36 +1,77 @@
+import functools
 import logging
 from typing import TYPE_CHECKING, Callable, TypeVar, cast, overload
 
 from PyQt6 import QtCore, QtWidgets
 
+from .cache import save_cache
+
 if TYPE_CHECKING:
     from .input_dialog import AbstractInputDialog
+    from .steam_api import SteamApi
+
+logger = logging.getLogger(__name__)
 
 T = TypeVar("T")
 
+CACHE_BUDGETS = {
+    "icons": 16,
+    "pixmaps": 10,
+    "schemas": 64,
+    "disk": 100,
+}
+
 
 class Settings(QtCore.QSettings):
     """Provides access to the application settings
 
     Settings:
         steam_api_key (str): Steam API key
-        steam_user_id (str): Steam user ID
-        game_list_cache (str): Cached game list
-        selected_game (int): Selected game
+        steam_user_id (str): Steam user ID of the current profile
+        profiles (list): Steam user IDs of the profiles
+        profile/<steam_user_id>/game_names_cache (list): Cached game app_ids and names,
+            displayed before the game list cache is loaded
+        profile/<steam_user_id>/game_list_cache_time (float): Time of the game list caching
+        profile/<steam_user_id>/selected_game (int): Selected game
+        sort_order (str): Name of the achievements sort order
         position (QtCore.QPoint): Window position
         size (QtCore.QSize): Window size
-
-    Raises:
-        RuntimeError: If a setting is not found and the user rejects the dialog
+        close_to_tray (bool): Hide the window in the tray instead of quitting
+        watch_current_game (bool): Poll the achievements of the game currently played
+        cache_budget/icons (int): Memory budget of the achievement icons in MiB
+        cache_budget/pixmaps (int): Memory budget of the Qt pixmap cache in MiB
+        cache_budget/schemas (int): Memory budget of the game schemas in MiB,
+            only the schemas of games not owned by the current profile are evicted
+        cache_budget/disk (int): Disk budget of the HTTP cache in MiB
 
     Args:
         parent (QtWidgets.QWidget): Parent widget
     """
 
-    def __init__(self, parent: QtWidgets.QWidget | None = None):
-        super().__init__(parent)
-        self.define_if_not_exists("steam_api_key", self.steam_api_key_dialog_factory)
-        self.define_if_not_exists("steam_user_id", self.steam_user_id_dialog_factory)
+    def define_credentials(self, steam_api: "SteamApi") -> None:
+        """Prompt for the missing Steam API key and Steam user ID, then migrate the settings to the current profile
+
+        The dialogs validate the input through the SteamApi connection pool. The owned games of a new Steam user ID
+        are prefetched as soon as it is validated, so the library is already loading when the dialogs close.
+
+        Raises:
+            RuntimeError: If a dialog is rejected
+
+        Args:
+            steam_api (snat.steam_api.SteamApi): SteamApi instance
+        """
+        self.define_if_not_exists("steam_api_key", functools.partial(self.steam_api_key_dialog_factory, steam_api))
+        steam_api.api_key = self.typedValue("steam_api_key", str, "")
+        if not self.contains("steam_user_id"):
+            self.define_if_not_exists("steam_user_id",
+                                      functools.partial(self.steam_user_id_dialog_factory, steam_api))
+            steam_api.user_id = self.user_id()
+            steam_api.prefetch(steam_api.owned_games_url())
+
+        if not self.contains("profiles"):
+            self.setValue("profiles", [self.user_id()])
+        for key in ("game_names_cache", "game_list_cache_time", "selected_game"):
+            self.migrate_to_profile(key)
 
     def define_if_not_exists(self, key: str, dialog_factory: Callable[[], "AbstractInputDialog"]) -> None:
         """ Shows the dialog and sets the value if it is not already set
@@ -43,7 +84,7 @@ class Settings(QtCore.QSettings):
             dialog (AbstractRequestInputDialog): Dialog to show
         """
         if not self.contains(key):
-            logging.info(f"Setting {key} not found, prompting user")
+            logger.info(f"Setting {key} not found, prompting user")
             dialog = dialog_factory()
             dialog.exec()
             if dialog.result() == QtWidgets.QDialog.DialogCode.Accepted:
@@ -51,23 +92,99 @@ class Settings(QtCore.QSettings):
             else:
                 raise RuntimeError(f"No {key} provided")
 
-    def steam_api_key_dialog_factory(self) -> "AbstractInputDialog":
+    def steam_api_key_dialog_factory(self, steam_api: "SteamApi") -> "AbstractInputDialog":
         """Create the Steam API key dialog
 
+        Args:
+            steam_api (snat.steam_api.SteamApi): SteamApi instance validating the key
+
         Returns:
             AbstractInputDialog: Steam API key dialog
         """
         from .input_dialog import SteamAPIKeyDialog
-        return SteamAPIKeyDialog(self)
+        return SteamAPIKeyDialog(self, steam_api)
 
-    def steam_user_id_dialog_factory(self) -> "AbstractInputDialog":
+    def steam_user_id_dialog_factory(self, steam_api: "SteamApi") -> "AbstractInputDialog":
         """Create the Steam user ID dialog
 
+        Args:
+            steam_api (snat.steam_api.SteamApi): SteamApi instance validating the Steam user ID
+
         Returns:
             AbstractInputDialog: Steam user ID dialog
         """
         from .input_dialog import SteamUserIdDialog
-        return SteamUserIdDialog(self)
+        return SteamUserIdDialog(self, steam_api)
+
+    def migrate_to_cache(self, key: str) -> None:
+        """Move a value stored by an older version to its cache file
+
+        Args:
+            key (str): Key of the value, also used as cache name
+        """
+        if self.contains(key):
+            logger.info(f"Move {key} from settings to cache")
+            save_cache(key, self.value(key))
+            self.remove(key)
+
+    def user_id(self) -> str:
+        """Return the Steam user ID of the current profile
+
+        Returns:
+            str: Steam user ID
+        """
+        return self.typedValue("steam_user_id", str, "")
+
+    def profiles(self) -> list[str]:
+        """Return the Steam user IDs of the profiles
+
+        Returns:
+            list[str]: Steam user IDs, in creation order
+        """
+        return [str(user_id) for user_id in self.typedValue("profiles", list, [])]
+
+    def add_profile(self, user_id: str) -> None:
+        """Add a profile if it does not exist
+
+        Args:
+            user_id (str): Steam user ID
+        """
+        profiles = self.profiles()
+        if user_id not in profiles:
+            self.setValue("profiles", profiles + [user_id])
+
+    def profile_key(self, key: str) -> str:
+        """Return the key of a setting specific to the current profile
+
+        Args:
+            key (str): Setting name
+
+        Returns:
+            str: Key in the group of the current profile
+        """
+        return f"profile/{self.user_id()}/{key}"
+
+    def migrate_to_profile(self, key: str) -> None:
+        """Move a value stored by a version without profiles to the current profile
+
+        Args:
+            key (str): Setting name
+        """
+        if self.contains(key):
+            logger.info(f"Move {key} to profile {self.user_id()}")
+            self.setValue(self.profile_key(key), self.value(key))
+            self.remove(key)
+
+    def cache_budget(self, name: str) -> int:
+        """Return the budget of a cache, see CACHE_BUDGETS for the names and default values
+
+        Args:
+            name (str): Cache name
+
+        Returns:
+            int: Budget in bytes
+        """
+        return max(self.typedValue(f"cache_budget/{name}", int, CACHE_BUDGETS[name]), 1) * 1024 * 1024
 
     @overload
     def typedValue(self, key: str, expected_type: type[T], default_value: T) -> T:
@@ -88,6 +205,8 @@ class Settings(QtCore.QSettings):
         Returns:
             T: Value or default value if the key is not set
         """
+        if not self.contains(key):
+            return default_value
         value = self.value(key, type=expected_type)
         if value is None:
             return default_value
@@ -1,24 +1,67 @@
+import functools
 import json
 import logging
-from dataclasses import dataclass
+import time
+from dataclasses import dataclass, field
 from string import Template
 from typing import Any, Callable
 
 from PyQt6 import QtCore, QtNetwork, QtWidgets
 
+from .cache import CacheStats, cache_dir
+from .json_stream import JsonArrayStream
 from .settings import Settings
 
+logger = logging.getLogger(__name__)
+
 REPLY_FUNC = Callable[[Any, Any], None]
 ERROR_FUNC = Callable[[QtNetwork.QNetworkReply.NetworkError, Any], None]
 
+CONNECTION_ERRORS = (
+    QtNetwork.QNetworkReply.NetworkError.HostNotFoundError,
+    QtNetwork.QNetworkReply.NetworkError.ConnectionRefusedError,
+    QtNetwork.QNetworkReply.NetworkError.TimeoutError,
+    QtNetwork.QNetworkReply.NetworkError.TemporaryNetworkFailureError,
+    QtNetwork.QNetworkReply.NetworkError.NetworkSessionFailedError,
+    QtNetwork.QNetworkReply.NetworkError.UnknownNetworkError,
+)
+
 OWNED_GAMES_URL = Template("https://api.steampowered.com/IPlayerService/GetOwnedGames/v1"
                            "?key=$api_key&steamid=$user_id&include_appinfo=true&include_played_free_games=true")
-GAME_SCHEMA_URL = Template("http://api.steampowered.com/ISteamUserStats/GetSchemaForGame/v2"
-                           "?key=$api_key&steamid=$user_id&appid=$app_id")
+GAME_SCHEMA_URL = Template("https://api.steampowered.com/ISteamUserStats/GetSchemaForGame/v2"
+                           "?key=$api_key&appid=$app_id")
+API_HOST = "api.steampowered.com"
+API_HOST_URL = f"https://{API_HOST}/"
+ACHIEVEMENTS_PROGRESS_URL = Template("https://api.steampowered.com/IPlayerService/GetAchievementsProgress/v1"
+                                     "?key=$api_key&steamid=$user_id&$app_ids")
+GLOBAL_PERCENTAGES_URL = Template("https://api.steampowered.com/ISteamUserStats"
+                                  "/GetGlobalAchievementPercentagesForApp/v2?gameid=$app_id")
+PLAYER_SUMMARIES_URL = Template("https://api.steampowered.com/ISteamUser/GetPlayerSummaries/v2"
+                                "?key=$api_key&steamids=$user_id")
+FRIEND_LIST_URL = Template("https://api.steampowered.com/ISteamUser/GetFriendList/v1"
+                           "?key=$api_key&steamid=$user_id&relationship=friend")
 USER_ACHIEVEMENTS_URL = Template("https://api.steampowered.com/ISteamUserStats/GetPlayerAchievements/v1"
                                  "?key=$api_key&steamid=$user_id&appid=$app_id")
 
 
+def is_connection_failure(reply: QtNetwork.QNetworkReply) -> bool:
+    """Check if a reply failed to reach the API host
+
+    The transfer timeout of a stalled download ends like a connection timeout, or like an abort,
+    so a timeout only counts when no HTTP status was received.
+
+    Args:
+        reply (QtNetwork.QNetworkReply): Finished network reply
+
+    Returns:
+        bool: True if the host was not reached
+    """
+    if reply.error() in (QtNetwork.QNetworkReply.NetworkError.TimeoutError,
+                         QtNetwork.QNetworkReply.NetworkError.OperationCanceledError):
+        return reply.attribute(QtNetwork.QNetworkRequest.Attribute.HttpStatusCodeAttribute) is None
+    return reply.error() in CONNECTION_ERRORS
+
+
 @dataclass
 class RequestData:
     """Data class for storing request data
@@ -28,43 +71,223 @@ class RequestData:
         error (ERROR_FUNC): Function to call on error
         raw (bool): Whether the response should be parsed as JSON
         other (Any): Other data to pass to the functions
+        start (float): perf_counter value when the request was sent
+        stream (snat.json_stream.JsonArrayStream | None): Array stream of a streamed request
+        item (REPLY_FUNC | None): Function to call on each streamed element
+        generation (int | None): Profile generation of a profile specific request, None if shared by all profiles
     """
 
     func: REPLY_FUNC
     error: ERROR_FUNC
     raw: bool
     other: Any = None
+    start: float = field(default_factory=time.perf_counter)
+    stream: JsonArrayStream | None = None
+    item: REPLY_FUNC | None = None
+    generation: int | None = None
+
 
+class BudgetDiskCache(QtNetwork.QNetworkDiskCache):
+    """HTTP disk cache with a size budget
 
-class SteamApi:
+    Qt removes the least recently accessed files when an insertion exceeds the maximum cache size.
+    Counting them would need a scan of the cache directory on each expiration, so evictions are not counted.
+
+    Attributes:
+        stats (snat.cache.CacheStats): Usage counters, its budget is the maximum cache size
+
+    Args:
+        parent (PyQt6.QtCore.QObject | None): Parent object
+        budget (int): Maximum cache size in bytes
+    """
+
+    def __init__(self, parent: QtCore.QObject | None, budget: int) -> None:
+        super().__init__(parent)
+        self.stats = CacheStats("HTTP disk cache", budget, evictions_counted=False)
+        self.setCacheDirectory(str(cache_dir() / "http"))
+        self.setMaximumCacheSize(budget)
+
+
+class SteamApi(QtCore.QObject):
     """Provides access to the Steam API
 
+    Signals:
+        online_changed (bool): Emitted when the network reachability changes
+
+    Constants:
+        TRANSFER_TIMEOUT (int): Milliseconds before a stalled request is aborted
+        PROBE_INTERVAL (int): Milliseconds between two connectivity probes while offline
+        KEEP_ALIVE (int): Seconds an idle connection is kept open for reuse
+        BATCH_SIZE (int): Maximum number of app IDs per batched request
+
     Attributes:
         requests (dict[QtNetwork.QNetworkReply, RequestData]): Map of requests to their data
-        api_key (str): Steam API key
-        user_id (str): Steam user ID
+        api_key (str): Steam API key, empty until defined
+        user_id (str): Steam user ID of the current profile, empty until defined
+        generation (int): Number of profile switches, the profile specific requests of a previous one are stale
+        prefetched (dict[str, QtNetwork.QNetworkReply]): Replies sent ahead of their request by URL
         manager (QtNetwork.QNetworkAccessManager): Network access manager
+        network_information (QtNetwork.QNetworkInformation | None): Reachability backend, None if unavailable
+        unreachable (bool): Whether a request failed to connect since the last successful probe
+        probe_timer (QtCore.QTimer): Timer that probes the API host while unreachable
+        disk_budget (int): Maximum size of the HTTP disk cache in bytes
+        disk_cache (BudgetDiskCache | None): HTTP disk cache, None until started
 
     Args:
         parent (QtWidgets.QWidget): Parent widget
         settings (snat.settings.Settings): Settings instance
     """
 
+    online_changed = QtCore.pyqtSignal(bool)
+
+    TRANSFER_TIMEOUT = 10000
+    PROBE_INTERVAL = 30000
+    KEEP_ALIVE = 120
+    BATCH_SIZE = 100
+
     def __init__(self, parent: QtWidgets.QWidget, settings: Settings) -> None:
+        super().__init__(parent)
         self.requests: dict[QtNetwork.QNetworkReply, RequestData] = {}
 
-        self.api_key = settings.typedValue("steam_api_key", str)
-        if self.api_key is None:
-            raise RuntimeError("No Steam API key found")
-        self.user_id = settings.typedValue("steam_user_id", str)
-        if self.user_id is None:
-            raise RuntimeError("No Steam user ID found")
+        self.api_key = settings.typedValue("steam_api_key", str, "")
+        self.user_id = settings.typedValue("steam_user_id", str, "")
+        self.generation = 0
+        self.prefetched: dict[str, QtNetwork.QNetworkReply] = {}
 
-        self.manager = QtNetwork.QNetworkAccessManager(parent)
+        self.manager = QtNetwork.QNetworkAccessManager(self)
         self.manager.finished.connect(self.handle_response)
+        self.network_information: QtNetwork.QNetworkInformation | None = None
+
+        self.unreachable = False
+        self.probe_timer = QtCore.QTimer(self)
+        self.probe_timer.setInterval(self.PROBE_INTERVAL)
+        self.probe_timer.timeout.connect(self.probe)
+
+        self.disk_budget = settings.cache_budget("disk")
+        self.disk_cache: BudgetDiskCache | None = None
+
+    def start(self) -> None:
+        """Load the reachability backend, pre-connect to the API host and enable the HTTP disk cache
+
+        The disk cache lets Qt revalidate responses with conditional requests when the server sends validators,
+        the requests that carry the API key never use it.
+        Deferred after the first paint because loading the backend can be slow.
+        """
+        self.network_information = self.load_network_information()
+        self.preconnect()
+
+        self.disk_cache = BudgetDiskCache(self, self.disk_budget)
+        self.manager.setCache(self.disk_cache)
+
+    def preconnect(self) -> None:
+        """Open the TLS connection to the API host ahead of the first request"""
+        if self.is_online():
+            self.manager.connectToHostEncrypted(API_HOST)
+
+    def create_request(self, url: str) -> QtNetwork.QNetworkRequest:
+        """Create a request that shares the tuned connection pool
+
+        HTTP/2 lets every request to the API host multiplex on one connection.
+        Qt negotiates gzip and decompresses transparently as long as Accept-Encoding is not set manually.
+        A request whose URL carries the API key bypasses the disk cache, so the key is never written to disk
+        where the cache files are measured and exported.
+
+        Args:
+            url (str): URL of the request
+
+        Returns:
+            QtNetwork.QNetworkRequest: Configured request
+        """
+        request = QtNetwork.QNetworkRequest(QtCore.QUrl(url))
+        request.setTransferTimeout(self.TRANSFER_TIMEOUT)
+        request.setAttribute(QtNetwork.QNetworkRequest.Attribute.Http2AllowedAttribute, True)
+        request.setAttribute(QtNetwork.QNetworkRequest.Attribute.ConnectionCacheExpiryTimeoutSecondsAttribute,
+                             self.KEEP_ALIVE)
+        if QtCore.QUrlQuery(request.url()).hasQueryItem("key"):
+            request.setAttribute(QtNetwork.QNetworkRequest.Attribute.CacheSaveControlAttribute, False)
+            request.setAttribute(QtNetwork.QNetworkRequest.Attribute.CacheLoadControlAttribute,
+                                 QtNetwork.QNetworkRequest.CacheLoadControl.AlwaysNetwork)
+        return request
+
+    def load_network_information(self) -> QtNetwork.QNetworkInformation | None:
+        """Load a reachability backend and listen to its changes
+
+        Returns:
+            QtNetwork.QNetworkInformation | None: Backend instance, None if no backend supports reachability
+        """
+        feature = QtNetwork.QNetworkInformation.Feature.Reachability
+        if not QtNetwork.QNetworkInformation.loadBackendByFeatures(feature):
+            logger.info("No network reachability backend available")
+            return None
+
+        network_information = QtNetwork.QNetworkInformation.instance()
+        if network_information is not None:
+            network_information.reachabilityChanged.connect(self.handle_reachability_changed)
+        return network_information
+
+    def is_online(self) -> bool:
+        """Check if the Steam API is likely to be reachable
+
+        Returns:
+            bool: False if the system reports no internet access or the API host is unreachable, True otherwise
+        """
+        if self.unreachable:
+            return False
+        if self.network_information is None:
+            return True
+        return self.network_information.reachability() in (
+            QtNetwork.QNetworkInformation.Reachability.Online,
+            QtNetwork.QNetworkInformation.Reachability.Unknown,
+        )
+
+    def handle_reachability_changed(self, reachability: QtNetwork.QNetworkInformation.Reachability) -> None:
+        """Emit the online_changed signal once, leaving the unreachable state emits it already
+
+        Args:
+            reachability (QtNetwork.QNetworkInformation.Reachability): New reachability
+        """
+        logger.info("Network reachability changed to %s", reachability.name)
+        if reachability == QtNetwork.QNetworkInformation.Reachability.Online and self.set_unreachable(False):
+            return
+        self.online_changed.emit(self.is_online())
+
+    def set_unreachable(self, unreachable: bool) -> bool:
+        """Update the unreachable state, probe the API host while it is unreachable
+
+        Args:
+            unreachable (bool): Whether the API host is unreachable
+
+        Returns:
+            bool: True if the state changed and the online_changed signal was emitted
+        """
+        if unreachable == self.unreachable:
+            return False
+
+        self.unreachable = unreachable
+        if unreachable:
+            logger.warning("Steam API unreachable, switch to offline mode")
+            self.probe_timer.start()
+        else:
+            logger.info("Steam API reachable again")
+            self.probe_timer.stop()
+        self.online_changed.emit(self.is_online())
+        return True
+
+    def probe(self) -> None:
+        """Send a lightweight HEAD request to the API host"""
+        self.manager.head(self.create_request(API_HOST_URL))
+
+    def handle_probe_response(self, reply: QtNetwork.QNetworkReply) -> None:
+        """Leave the offline mode if the API host answered
+
+        Args:
+            reply (QtNetwork.QNetworkReply): Probe reply
+        """
+        if not is_connection_failure(reply):
+            self.set_unreachable(False)
 
     def make_get_request(self, url: str, func: REPLY_FUNC, error: ERROR_FUNC,
-                         raw: bool = False, other: Any = None) -> None:
+                         raw: bool = False, other: Any = None, user_specific: bool = False) -> None:
         """Make a GET request to the given URL
 
         Args:
@@ -73,64 +296,322 @@ class SteamApi:
             error (ERROR_FUNC): Function to call on error
             raw (bool, optional): Whether the response should be parsed as JSON.
             other (Any, optional): Other data to pass to the functions.
+            user_specific (bool, optional): Whether the functions are skipped if the user changes before the response.
+
+        If offline, the error function is called on the next event loop iteration without any network access.
 
         Raises:
             RuntimeError: If the request creation fails
         """
-        request = QtNetwork.QNetworkRequest(QtCore.QUrl(url))
-        reply = self.manager.get(request)
+        generation = self.generation if user_specific else None
+        self.send_get_request(url, RequestData(func, error, raw, other, generation=generation))
+
+    def make_stream_request(self, url: str, key: str, item: REPLY_FUNC, func: REPLY_FUNC, error: ERROR_FUNC,
+                            other: Any = None) -> None:
+        """Make a user specific GET request to the given URL and parse the elements of an array as they arrive
+
+        Args:
+            url (str): URL to make the request to
+            key (str): Key of the array to stream
+            item (REPLY_FUNC): Function to call on each element
+            func (REPLY_FUNC): Function to call on success, once all the elements are processed, with None as data
+            error (ERROR_FUNC): Function to call on error
+            other (Any, optional): Other data to pass to the functions.
+
+        Raises:
+            RuntimeError: If the request creation fails
+        """
+        request_data = RequestData(func, error, True, other, stream=JsonArrayStream(key), item=item,
+                                   generation=self.generation)
+        reply = self.send_get_request(url, request_data)
+        if reply is not None:
+            reply.readyRead.connect(lambda: self.handle_ready_read(reply))
+
+    def send_get_request(self, url: str, request_data: RequestData) -> QtNetwork.QNetworkReply | None:
+        """Send a GET request, adopt its prefetched reply or schedule its error function if offline
+
+        Args:
+            url (str): URL to make the request to
+            request_data (RequestData): Request data
+
+        Returns:
+            QtNetwork.QNetworkReply | None: Network reply, None if offline
+
+        Raises:
+            RuntimeError: If the request creation fails
+        """
+        reply = self.prefetched.pop(url, None)
+        if reply is not None:
+            logger.debug("Adopt prefetched GET %s", url)
+            self.requests[reply] = request_data
+            if reply.isFinished():
+                QtCore.QTimer.singleShot(0, functools.partial(self.handle_response, reply))
+            return reply
+
+        if not self.is_online():
+            logger.debug("Offline, skip GET %s", url)
+            QtCore.QTimer.singleShot(0, lambda: self.fail_offline(request_data))
+            return None
+
+        reply = self.manager.get(self.create_request(url))
+        if reply is None:
+            raise RuntimeError("Network error")
+        self.requests[reply] = request_data
+        return reply
+
+    def prefetch(self, url: str) -> None:
+        """Send a GET request before anything needs it, its reply is kept until a request to the same URL adopts it
+
+        Args:
+            url (str): URL to prefetch
+        """
+        if url in self.prefetched or not self.is_online():
+            return
+        reply = self.manager.get(self.create_request(url))
         if reply is None:
             raise RuntimeError("Network error")
-        self.requests[reply] = RequestData(func, error, raw, other)
+        logger.debug("Prefetch GET %s", url)
+        self.prefetched[url] = reply
+
+    def drop_prefetched(self) -> None:
+        """Abort and delete the prefetched replies that were not adopted
+
+        Their signals are blocked first, so an abort is never handled as a response.
+        """
+        for reply in self.prefetched.values():
+            reply.blockSignals(True)
+            reply.abort()
+            reply.deleteLater()
+        self.prefetched.clear()
+
+    def fail_offline(self, request_data: RequestData) -> None:
+        """Call the error function of a request skipped while offline, unless the user changed
+
+        Args:
+            request_data (RequestData): Request data
+        """
+        if not self.is_stale(request_data):
+            request_data.error(QtNetwork.QNetworkReply.NetworkError.NetworkSessionFailedError, request_data.other)
+
+    def handle_ready_read(self, reply: QtNetwork.QNetworkReply) -> None:
+        """Feed the received bytes to the stream and call the item function on each completed element
+
+        Args:
+            reply (QtNetwork.QNetworkReply): Network reply
+        """
+        request_data = self.requests.get(reply)
+        if request_data is None or request_data.stream is None or request_data.item is None:
+            return
+        if self.is_stale(request_data):
+            return
+        if reply.error() != QtNetwork.QNetworkReply.NetworkError.NoError:
+            return
+
+        for element in request_data.stream.feed(reply.readAll().data()):
+            request_data.item(element, request_data.other)
 
     def handle_response(self, reply: QtNetwork.QNetworkReply) -> None:
         """Process the response and call the appropriate functions
 
+        A prefetched reply only updates the reachability, it is processed when a request adopts it.
+
         Args:
             reply (QtNetwork.QNetworkReply): Network reply
         """
-        request_data = self.requests.pop(reply)
+        if reply in self.prefetched.values():
+            if is_connection_failure(reply):
+                self.set_unreachable(True)
+            return
+
+        reply.deleteLater()
+        request_data = self.requests.pop(reply, None)
+        if request_data is None:
+            self.handle_probe_response(reply)
+            return
+
+        if is_connection_failure(reply):
+            self.set_unreachable(True)
+
+        if self.is_stale(request_data):
+            logger.debug("Drop response of previous user %s", reply.url().toString())
+            return
+
+        if logger.isEnabledFor(logging.DEBUG):
+            http2 = reply.attribute(QtNetwork.QNetworkRequest.Attribute.Http2WasUsedAttribute)
+            elapsed = (time.perf_counter() - request_data.start) * 1000
+            logger.debug("GET %.1f ms (%s) %s", elapsed, "HTTP/2" if http2 else "HTTP/1.1", reply.url().toString())
+
+        cacheable = reply.request().attribute(QtNetwork.QNetworkRequest.Attribute.CacheSaveControlAttribute, True)
+        if self.disk_cache is not None and cacheable and reply.error() == QtNetwork.QNetworkReply.NetworkError.NoError:
+            if reply.attribute(QtNetwork.QNetworkRequest.Attribute.SourceIsFromCacheAttribute):
+                self.disk_cache.stats.hits += 1
+            else:
+                self.disk_cache.stats.misses += 1
+
         match reply.error():
+            case QtNetwork.QNetworkReply.NetworkError.NoError if request_data.stream is not None:
+                self.handle_ready_read(reply)
+                request_data.func(None, request_data.other)
             case QtNetwork.QNetworkReply.NetworkError.NoError:
                 data = reply.readAll().data()
                 if not request_data.raw:
-                    data = json.loads(data.decode())
+                    data = json.loads(data)
                 request_data.func(data, request_data.other)
             case _:
                 request_data.error(reply.error(), request_data.other)
                 status_code = reply.attribute(QtNetwork.QNetworkRequest.Attribute.HttpStatusCodeAttribute)
                 url = reply.url().toString()
-                logging.warning("GET Status ERROR (%d) %s", status_code, url)
+                logger.warning("GET Status ERROR (%s) %s", status_code, url)
+
+    def is_stale(self, request_data: RequestData) -> bool:
+        """Check if a request was made before the last profile switch
 
-    def get_owned_games(self, func: REPLY_FUNC, error: ERROR_FUNC) -> None:
-        """Get the list of owned games
+        Comparing generations rather than users also drops the requests of a profile switched away from and back to.
 
         Args:
+            request_data (RequestData): Request data
+
+        Returns:
+            bool: True if the user changed since the request
+        """
+        return request_data.generation is not None and request_data.generation != self.generation
+
+    def set_user_id(self, user_id: str) -> None:
+        """Change the current user, the pending user specific requests are dropped when answered
+
+        Args:
+            user_id (str): Steam user ID
+        """
+        logger.info("Switch to Steam user %s", user_id)
+        self.drop_prefetched()
+        self.user_id = user_id
+        self.generation += 1
+
+    def validate_credentials(self, api_key: str, user_id: str, func: REPLY_FUNC, error: ERROR_FUNC) -> None:
+        """Probe a Steam API key and a Steam user ID with a player summary request, a few hundred bytes at most
+
+        Steam answers 403 to an invalid key, and an empty players list to an empty or unknown Steam user ID.
+
+        Args:
+            api_key (str): Steam API key
+            user_id (str): Steam user ID, empty to only probe the key
             func (REPLY_FUNC): Function to call on success
             error (ERROR_FUNC): Function to call on error
         """
-        url = OWNED_GAMES_URL.substitute(api_key=self.api_key, user_id=self.user_id)
+        url = PLAYER_SUMMARIES_URL.substitute(api_key=api_key, user_id=user_id)
         self.make_get_request(url, func, error)
 
+    def get_owned_games(self, item: REPLY_FUNC, func: REPLY_FUNC, error: ERROR_FUNC) -> None:
+        """Stream the list of owned games
+
+        Args:
+            item (REPLY_FUNC): Function to call on each owned game as soon as it is received
+            func (REPLY_FUNC): Function to call once all the owned games are received
+            error (ERROR_FUNC): Function to call on error
+        """
+        self.make_stream_request(self.owned_games_url(), "games", item, func, error)
+
+    def owned_games_url(self) -> str:
+        """Return the URL of the owned games of the current user, used to prefetch them
+
+        Returns:
+            str: Owned games URL
+        """
+        return OWNED_GAMES_URL.substitute(api_key=self.api_key, user_id=self.user_id)
+
     def get_game_schemas(self, app_ids: list[int], func: REPLY_FUNC, error: ERROR_FUNC) -> None:
         """Get the schemas for the given app IDs
 
+        Schemas do not depend on the user, their URL is the same for every profile so the HTTP cache is shared,
+        the requests are still user specific because the functions fill the library of the current user.
+
         Args:
             app_ids (list[int]): App IDs to get the schemas for
             func (REPLY_FUNC): Function to call on success
             error (ERROR_FUNC): Function to call on error
         """
         for app_id in app_ids:
-            url = GAME_SCHEMA_URL.substitute(api_key=self.api_key, user_id=self.user_id, app_id=app_id)
-            self.make_get_request(url, func, error, other=app_id)
+            url = GAME_SCHEMA_URL.substitute(api_key=self.api_key, app_id=app_id)
+            self.make_get_request(url, func, error, other=app_id, user_specific=True)
 
-    def get_user_achievements(self, app_id: int, func: REPLY_FUNC, error: ERROR_FUNC) -> None:
+    def get_user_achievements(self, app_id: int, func: REPLY_FUNC, error: ERROR_FUNC,
+                              user_id: str | None = None) -> None:
         """Get the user achievements for the given app ID
 
         Args:
             app_id (int): App ID to get the achievements for
             func (REPLY_FUNC): Function to call on success
             error (ERROR_FUNC): Function to call on error
+            user_id (str | None, optional): Steam user ID, the current user by default
+        """
+        url = USER_ACHIEVEMENTS_URL.substitute(api_key=self.api_key, user_id=user_id or self.user_id, app_id=app_id)
+        self.make_get_request(url, func, error, other=app_id, user_specific=True)
+
+    def get_achievements_progress(self, app_ids: list[int], func: REPLY_FUNC, error: ERROR_FUNC,
+                                  user_id: str | None = None) -> int:
+        """Get the number of unlocked achievements of many games, with one request per chunk of app IDs
+
+        Args:
+            app_ids (list[int]): App IDs to get the progress for
+            func (REPLY_FUNC): Function to call on each chunk success, with the chunk app IDs
+            error (ERROR_FUNC): Function to call on each chunk error, with the chunk app IDs
+            user_id (str | None, optional): Steam user ID, the current user by default
+
+        Returns:
+            int: Number of requests
+        """
+        chunks = [app_ids[index:index + self.BATCH_SIZE] for index in range(0, len(app_ids), self.BATCH_SIZE)]
+        for chunk in chunks:
+            params = "&".join(f"appids[{index}]={app_id}" for index, app_id in enumerate(chunk))
+            url = ACHIEVEMENTS_PROGRESS_URL.substitute(api_key=self.api_key, user_id=user_id or self.user_id,
+                                                       app_ids=params)
+            self.make_get_request(url, func, error, other=chunk, user_specific=True)
+        return len(chunks)
+
+    def get_global_achievement_percentages(self, app_id: int, func: REPLY_FUNC, error: ERROR_FUNC) -> None:
+        """Get the global unlock percentages of the achievements of the given app ID
+
+        Args:
+            app_id (int): App ID to get the percentages for
+            func (REPLY_FUNC): Function to call on success
+            error (ERROR_FUNC): Function to call on error
         """
-        url = USER_ACHIEVEMENTS_URL.substitute(api_key=self.api_key, user_id=self.user_id, app_id=app_id)
+        url = GLOBAL_PERCENTAGES_URL.substitute(app_id=app_id)
         self.make_get_request(url, func, error, other=app_id)
+
+    def get_player_summary(self, func: REPLY_FUNC, error: ERROR_FUNC) -> None:
+        """Get the player summary of the user, including the game currently played
+
+        Args:
+            func (REPLY_FUNC): Function to call on success
+            error (ERROR_FUNC): Function to call on error
+        """
+        url = PLAYER_SUMMARIES_URL.substitute(api_key=self.api_key, user_id=self.user_id)
+        self.make_get_request(url, func, error, user_specific=True)
+
+    def get_player_summaries(self, user_ids: list[str], func: REPLY_FUNC, error: ERROR_FUNC) -> int:
+        """Get the player summaries of many users, with one request per chunk of Steam IDs
+
+        Args:
+            user_ids (list[str]): Steam user IDs
+            func (REPLY_FUNC): Function to call on each chunk success, with the chunk Steam IDs
+            error (ERROR_FUNC): Function to call on each chunk error, with the chunk Steam IDs
+
+        Returns:
+            int: Number of requests
+        """
+        chunks = [user_ids[index:index + self.BATCH_SIZE] for index in range(0, len(user_ids), self.BATCH_SIZE)]
+        for chunk in chunks:
+            url = PLAYER_SUMMARIES_URL.substitute(api_key=self.api_key, user_id=",".join(chunk))
+            self.make_get_request(url, func, error, other=chunk, user_specific=True)
+        return len(chunks)
+
+    def get_friend_list(self, func: REPLY_FUNC, error: ERROR_FUNC) -> None:
+        """Get the friend list of the user, the user profile must be public
+
+        Args:
+            func (REPLY_FUNC): Function to call on success
+            error (ERROR_FUNC): Function to call on error
+        """
+        url = FRIEND_LIST_URL.substitute(api_key=self.api_key, user_id=self.user_id)
+        self.make_get_request(url, func, error, user_specific=True)
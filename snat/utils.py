@@ -1,7 +1,58 @@
 from abc import ABCMeta
+from pathlib import Path
 
 from PyQt6 import QtCore, QtWidgets, sip
 
+from . import __version__
+
+
+def configure_application() -> None:
+    """Set the application informations used by QSettings and QStandardPaths."""
+    QtCore.QCoreApplication.setApplicationName("Snat")
+    QtCore.QCoreApplication.setOrganizationName("Theo Guerin")
+    QtCore.QCoreApplication.setApplicationVersion(__version__)
+
+
+def format_timestamp(timestamp: float) -> str:
+    """Format a POSIX timestamp as a local date and time.
+
+    Args:
+        timestamp (float): POSIX timestamp
+
+    Returns:
+        str: Formatted date and time
+    """
+    return QtCore.QDateTime.fromSecsSinceEpoch(int(timestamp)).toString("yyyy-MM-dd hh:mm")
+
+
+def format_size(size: int) -> str:
+    """Format a size in bytes with a binary unit.
+
+    Args:
+        size (int): Size in bytes
+
+    Returns:
+        str: Formatted size
+    """
+    value = float(size)
+    for unit in ("B", "KiB", "MiB"):
+        if value < 1024:
+            return f"{value:.0f} {unit}" if unit == "B" else f"{value:.1f} {unit}"
+        value /= 1024
+    return f"{value:.1f} GiB"
+
+
+def data_dir() -> Path:
+    """Return the data directory of the application, create it if needed.
+
+    Returns:
+        Path: Data directory
+    """
+    location = QtCore.QStandardPaths.writableLocation(QtCore.QStandardPaths.StandardLocation.AppDataLocation)
+    path = Path(location)
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
 
 class ABCQtMeta(sip.wrappertype, ABCMeta):
     """Metaclass for abstract classes using PyQt6."""
@@ -0,0 +1,150 @@
+import logging
+import time
+from typing import Any
+
+from PyQt6 import QtCore, QtNetwork
+
+from .achievement_list import UserAchievementsCache
+from .game_list import GameList
+from .steam_api import SteamApi
+
+logger = logging.getLogger(__name__)
+
+
+class UnlockWatcher(QtCore.QObject):
+    """Poll the achievements of the game currently played to detect new unlocks
+
+    The player summary is checked every SUMMARY_INTERVAL.
+    While a game is played, only its achievements are polled, the interval doubles after each poll without unlock,
+    from MIN_INTERVAL to MAX_INTERVAL, so the traffic stays below 3 requests per minute.
+
+    Signals:
+        achievements_received (object, int): Emitted with the achievements response and the app_id, if they changed
+        unlocked (int, list): Emitted with the app_id and the API names of the new unlocks
+
+    Constants:
+        MIN_INTERVAL (int): Milliseconds between two achievements polls after an unlock
+        MAX_INTERVAL (int): Maximum milliseconds between two achievements polls
+        SUMMARY_INTERVAL (int): Milliseconds between two player summary checks
+
+    Attributes:
+        steam_api (snat.steam_api.SteamApi): SteamApi instance
+        game_list (snat.game_list.GameList): Game list, games outside of it are not watched
+        user_achievements (snat.achievement_list.UserAchievementsCache): User achievements cache
+        active (bool): Whether the watcher is running
+        playing (int | None): app_id of the game currently played, None if not playing
+        interval (int): Current milliseconds between two achievements polls
+        summary_time (float): monotonic time of the last player summary check
+        timer (PyQt6.QtCore.QTimer): Timer of the next check
+
+    Args:
+        parent (PyQt6.QtCore.QObject): Parent object
+        steam_api (snat.steam_api.SteamApi): SteamApi instance
+        game_list (snat.game_list.GameList): Game list
+        user_achievements (snat.achievement_list.UserAchievementsCache): User achievements cache
+    """
+
+    achievements_received = QtCore.pyqtSignal(object, int)
+    unlocked = QtCore.pyqtSignal(int, list)
+
+    MIN_INTERVAL = 30000
+    MAX_INTERVAL = 240000
+    SUMMARY_INTERVAL = 120000
+
+    def __init__(self, parent: QtCore.QObject, steam_api: SteamApi, game_list: GameList,
+                 user_achievements: UserAchievementsCache) -> None:
+        super().__init__(parent)
+        self.steam_api = steam_api
+        self.game_list = game_list
+        self.user_achievements = user_achievements
+        self.active = False
+        self.playing: int | None = None
+        self.interval = self.MIN_INTERVAL
+        self.summary_time = 0.0
+        self.timer = QtCore.QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self.check)
+
+    def start(self) -> None:
+        """Start watching"""
+        logger.info("Start watching the current game")
+        self.active = True
+        self.summary_time = 0.0
+        self.check()
+
+    def stop(self) -> None:
+        """Stop watching, the requests already sent are ignored"""
+        logger.info("Stop watching the current game")
+        self.active = False
+        self.timer.stop()
+        self.playing = None
+
+    def check(self) -> None:
+        """Check the player summary if it is time to, otherwise poll the achievements of the game played"""
+        elapsed = (time.monotonic() - self.summary_time) * 1000
+        if self.playing is None or elapsed >= self.SUMMARY_INTERVAL:
+            self.summary_time = time.monotonic()
+            self.steam_api.get_player_summary(self.handle_summary_response, self.handle_error)
+        else:
+            self.steam_api.get_user_achievements(self.playing, self.handle_achievements_response, self.handle_error)
+
+    def handle_summary_response(self, data: Any, other: None) -> None:
+        """Update the game played and poll its achievements
+
+        Args:
+            data (Any): Response data
+            other (None): Unused
+        """
+        if not self.active:
+            return
+
+        players = data["response"]["players"]
+        playing = int(players[0].get("gameid", 0)) if players else 0
+        if playing not in self.game_list:
+            playing = 0
+        if (playing or None) != self.playing:
+            logger.info("Now playing app_id %d", playing)
+            self.playing = playing or None
+            self.interval = self.MIN_INTERVAL
+
+        if self.playing is None:
+            self.timer.start(self.SUMMARY_INTERVAL)
+        else:
+            self.steam_api.get_user_achievements(self.playing, self.handle_achievements_response, self.handle_error)
+
+    def handle_achievements_response(self, data: Any, app_id: int) -> None:
+        """Compare the achievements with the cache, emit the new unlocks and adapt the interval
+
+        Args:
+            data (Any): Response data
+            app_id (int): app_id of the game
+        """
+        if not self.active or app_id != self.playing:
+            return
+
+        cached = self.user_achievements.get(app_id)
+        locked = {raw["apiname"] for raw in data["playerstats"]["achievements"] if not raw["achieved"]}
+        new_unlocks = [] if cached is None else [name for name in cached.locked if name not in locked]
+
+        if cached is None or new_unlocks:
+            self.achievements_received.emit(data, app_id)
+        if new_unlocks:
+            self.unlocked.emit(app_id, new_unlocks)
+            self.interval = self.MIN_INTERVAL
+        else:
+            self.interval = min(self.interval * 2, self.MAX_INTERVAL)
+        self.timer.start(self.interval)
+
+    def handle_error(self, error: QtNetwork.QNetworkReply.NetworkError, other: Any) -> None:
+        """Retry later with the maximum interval
+
+        Args:
+            error (QtNetwork.QNetworkReply.NetworkError): Network error
+            other (Any): Unused
+        """
+        if not self.active:
+            return
+
+        logger.warning("Failed to watch the current game")
+        self.interval = self.MAX_INTERVAL
+        self.timer.start(self.interval)